@@ -0,0 +1,358 @@
+"""
+Benchmarks do launcher: despacho de comandos, listagem, interface e troca de tema.
+
+Gera diretórios `commands/` sintéticos (10, 1.000 e 10.000 arquivos por padrão),
+mede cada operação várias vezes e compara a mediana com o arquivo de referência
+(baseline). Sem DISPLAY no Linux, o script se executa novamente sob o `xvfb-run`;
+se ele não estiver instalado, apenas os benchmarks sem interface são executados.
+
+Uso:
+    python benchmarks/run_benchmarks.py                  # mede e compara com a referência
+    python benchmarks/run_benchmarks.py --save-baseline  # grava as medições como nova referência
+"""
+import os  # Importa a biblioteca os para manipular caminhos e variáveis de ambiente
+import sys  # Importa a biblioteca sys para localizar o main.py e reexecutar o script
+import json  # Importa a biblioteca json para ler e gravar a referência
+import time  # Importa a biblioteca time para medir as operações
+import shutil  # Importa a biblioteca shutil para localizar o xvfb-run
+import logging  # Importa a biblioteca logging para silenciar os logs da aplicação
+import argparse  # Importa a biblioteca argparse para ler os argumentos da linha de comando
+import platform  # Importa a biblioteca platform para registrar o ambiente da medição
+import tempfile  # Importa a biblioteca tempfile para criar os diretórios sintéticos
+import statistics  # Importa a biblioteca statistics para calcular a mediana
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_dir)
+import main  # pylint: disable=wrong-import-position
+
+baseline_path = os.path.join(repo_dir, "benchmarks", "baseline.json")
+baselineVersion = 1
+defaultSizes = (10, 1000, 10000)
+defaultRepeat = 20
+defaultThreshold = 0.25  # Aumento máximo da mediana (25%) antes de considerar uma regressão
+sampleCommands = 20  # Quantidade de comandos executados em cada medição de despacho
+xvfbEnvironmentFlag = "LAUNCHER_BENCHMARK_XVFB"
+
+# Conteúdo de cada arquivo de comando sintético
+syntheticCommand = '''"""
+Comando sintético {index} para os benchmarks.
+
+Tags: benchmark
+Timeout: 5
+"""
+app.hideWindowAfterCommand = False
+total = sum(range(100))
+'''
+
+
+def create_commands_tree(directory, size):
+    """
+    Cria `size` arquivos de comando sintéticos e retorna seus nomes.
+    """
+    os.makedirs(directory, exist_ok=True)
+    names = []
+    for index in range(size):
+        name = f"cmd{index:05d}"
+        with open(os.path.join(directory, f"{name}.py"), "w", encoding="utf-8") as file:
+            file.write(syntheticCommand.format(index=index))
+        names.append(name)
+    return names
+
+
+def sample(names, count=sampleCommands):
+    """
+    Retorna até `count` nomes distribuídos ao longo da lista.
+    """
+    step = max(1, len(names) // count)
+    return names[::step][:count]
+
+
+def measure(function, repeat, setup=None):
+    """
+    Executa a função `repeat` vezes (após `setup`, que não é medido) e retorna as estatísticas em segundos.
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        "median": statistics.median(timings),
+        "min": timings[0],
+        "p95": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "repeat": repeat,
+    }
+
+
+def headless_benchmarks(tree, names, work_dir, repeat):
+    """
+    Mede as operações que não dependem da interface: registro, despacho em lote e metadados.
+    """
+    results = {}
+    results["registry_build"] = measure(lambda: main.CommandRegistry(tree).build(), repeat)
+
+    runner = main.BatchRunner(open_links=False, directory=tree, extra_directories=())
+    runner.code_cache = main.CompiledCodeCache(disk_dir=None)
+    runner.metadata_index = main.CommandMetadataIndex(os.path.join(work_dir, "batch_index.json"))
+    runner.load()
+    chosen = sample(names)
+
+    def run_sample():
+        for name in chosen:
+            result = runner.run(name)
+            if result.status != "done":
+                raise RuntimeError(f"{name}: {result.status} {result.message}")
+
+    results["batch_lookup_exec"] = measure(run_sample, repeat)
+
+    registry = main.CommandRegistry(tree)
+    registry.build()
+    index_path = os.path.join(work_dir, "metadata_index.json")
+
+    def read_all_metadata(index):
+        for command_entry in registry.entries():
+            index.get(command_entry.path, command_entry.stat)
+
+    def cold_listing():
+        read_all_metadata(main.CommandMetadataIndex(index_path))
+
+    def remove_index():
+        if os.path.exists(index_path):
+            os.remove(index_path)
+
+    results["metadata_cold"] = measure(cold_listing, max(1, repeat // 4), setup=remove_index)
+
+    warm_index = main.CommandMetadataIndex(index_path)
+    read_all_metadata(warm_index)
+    warm_index.save()
+
+    def warm_listing():
+        index = main.CommandMetadataIndex(index_path)
+        index.load()
+        read_all_metadata(index)
+
+    results["metadata_warm"] = measure(warm_listing, repeat)
+    return results
+
+
+def create_app(work_dir):
+    """
+    Cria a aplicação com os caches, o histórico e os comandos em um diretório temporário.
+    """
+    app = main.AlwaysOnTopApp()
+    commands = os.path.join(work_dir, "app_commands")
+    os.makedirs(commands, exist_ok=True)
+    app.code_cache = main.CompiledCodeCache(disk_dir=None)
+    app.metadata_index = main.CommandMetadataIndex(os.path.join(work_dir, "app_index.json"))
+    app.metrics = main.MetricsRegistry(path=os.path.join(work_dir, "metrics.prom"))
+    app.history = main.CommandHistory(os.path.join(work_dir, "history.log"))
+    app.registry = main.CommandRegistry(commands, extra_directories=())
+    app.registry.add_listener(app.on_commands_changed)
+    app.link_manifest = main.LinkManifest([commands])
+    app.link_manifest.add_listener(app.sincronizar_atalhos)
+    app.load_services()
+    app.registry.stop()
+    app.theme_cache.stop()
+    app.root.update()
+    return app
+
+
+def use_commands_tree(app, tree):
+    """
+    Troca o registro de comandos da aplicação pelo diretório sintético.
+    """
+    app.registry = main.CommandRegistry(tree)
+    app.registry.build()
+    app.metadata_index = main.CommandMetadataIndex(os.path.join(os.path.dirname(tree), "app_index.json"))
+
+
+def gui_benchmarks(app, tree, names, repeat):
+    """
+    Mede as operações da interface para o diretório sintético.
+    """
+    results = {}
+    use_commands_tree(app, tree)
+    chosen = sample(names)
+
+    def execute_sample():
+        for name in chosen:
+            job = app.execute_command(name)
+            if not isinstance(job, main.CommandJob):
+                raise RuntimeError(f"{name}: comando não executado")
+            # Processa os eventos até o job ser concluído na thread do Tk
+            while job.id in app.scheduler.active:
+                app.root.update()
+            if job.state != "done":
+                raise RuntimeError(f"{name}: {job.state} {job.error}")
+
+    results["execute_command"] = measure(execute_sample, repeat)
+    results["list_commands"] = measure(app.list_commands, max(1, repeat // 4))
+
+    def open_palette():
+        app.show_commands_tooltip_handler()
+        app.root.update_idletasks()
+        app.command_palette.filter("cmd0")
+        app.root.update_idletasks()
+
+    results["command_palette"] = measure(open_palette, max(1, repeat // 4), setup=app.fechar_paleta)
+    app.fechar_paleta()
+    first_path = app.registry.lookup(names[0]).path
+    results["get_command_docstring"] = measure(lambda: app.get_command_docstring(first_path), repeat)
+    return results
+
+
+def interface_benchmarks(app, repeat):
+    """
+    Mede as operações da interface que não dependem da quantidade de comandos.
+    """
+    results = {}
+
+    def reset():
+        app.setup_interface()
+        app.root.update_idletasks()
+
+    def rebuild():
+        app.setup_interface(rebuild=True)
+        app.root.update_idletasks()
+
+    def new_entry():
+        app.create_new_entry("CNPJ", "cyan", lambda value: None)
+        app.root.update_idletasks()
+
+    results["setup_interface"] = measure(reset, repeat)
+    results["setup_interface_rebuild"] = measure(rebuild, repeat)
+    results["create_new_entry"] = measure(new_entry, repeat, setup=reset)
+    results["adjust_window_size"] = measure(app.adjust_window_size, repeat)
+
+    themes = iter(["green", "blue"] * repeat)
+
+    def switch_theme():
+        app.aplicar_novo_tema(next(themes))
+        app.root.update_idletasks()
+
+    results["theme_switch"] = measure(switch_theme, repeat)
+    reset()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Compara as medianas com a referência; retorna a lista de regressões.
+    """
+    regressions = []
+    reference = baseline.get("results", {})
+    print(f"{'benchmark':<36} {'mediana':>11} {'referência':>11} {'variação':>9}")
+    for name, result in results.items():
+        line = f"{name:<36} {result['median'] * 1000:>8.3f} ms"
+        if name in reference:
+            expected = reference[name]["median"]
+            limit = reference[name].get("threshold", baseline.get("threshold", threshold))
+            change = result["median"] / expected - 1 if expected else 0.0
+            line += f" {expected * 1000:>8.3f} ms {change:>+8.0%}"
+            if change > limit:
+                line += "  REGRESSÃO"
+                regressions.append(name)
+        print(line)
+    return regressions
+
+
+def parse_arguments(argv=None):
+    """
+    Lê os argumentos da linha de comando.
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks do launcher.")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in defaultSizes),
+                        help="quantidades de arquivos de comando, separadas por vírgula")
+    parser.add_argument("--repeat", type=int, default=defaultRepeat, help="repetições de cada medição")
+    parser.add_argument("--baseline", default=baseline_path, help="arquivo JSON de referência")
+    parser.add_argument("--threshold", type=float, default=defaultThreshold,
+                        help="aumento máximo da mediana em relação à referência (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="grava as medições como nova referência")
+    parser.add_argument("--output", help="grava as medições desta execução em um arquivo JSON")
+    parser.add_argument("--no-gui", action="store_true", help="executa apenas os benchmarks sem interface")
+    return parser.parse_args(argv)
+
+
+def ensure_display(args):
+    """
+    Reexecuta o script sob o xvfb-run quando não há DISPLAY; retorna False se a interface não estiver disponível.
+    """
+    if args.no_gui:
+        return False
+    if not sys.platform.startswith("linux") or os.environ.get("DISPLAY"):
+        return True
+    if os.environ.get(xvfbEnvironmentFlag) or not shutil.which("xvfb-run"):
+        print("Sem DISPLAY e sem xvfb-run: executando apenas os benchmarks sem interface.", file=sys.stderr)
+        return False
+    os.environ[xvfbEnvironmentFlag] = "1"
+    os.execvp("xvfb-run", ["xvfb-run", "-a", sys.executable, os.path.abspath(__file__), *sys.argv[1:]])
+    return True  # Não alcançado
+
+
+def main_benchmarks(argv=None):
+    """
+    Executa os benchmarks e retorna o código de saída (1 se houver regressão).
+    """
+    args = parse_arguments(argv)
+    logging.basicConfig(level=logging.CRITICAL)
+    gui = ensure_display(args)
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    results = {}
+
+    with tempfile.TemporaryDirectory(prefix="launcher-bench-") as work_dir:
+        # O cache de bytecode criado pelo app e pelo BatchRunner não deve ir para o repositório
+        main.bytecode_cache_dir = os.path.join(work_dir, "bytecode")
+        app = create_app(work_dir) if gui else None
+        for size in sizes:
+            size_dir = os.path.join(work_dir, str(size))
+            tree = os.path.join(size_dir, "commands")
+            names = create_commands_tree(tree, size)
+            for name, result in headless_benchmarks(tree, names, size_dir, args.repeat).items():
+                results[f"{name}[{size}]"] = result
+            if app is not None:
+                for name, result in gui_benchmarks(app, tree, names, args.repeat).items():
+                    results[f"{name}[{size}]"] = result
+        if app is not None:
+            results.update(interface_benchmarks(app, args.repeat))
+            app.scheduler.shutdown()
+            app.root.destroy()
+
+    record = {
+        "version": baselineVersion,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "threshold": args.threshold,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(record, file, indent=2)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.save_baseline:
+        # Mantém os limites ajustados manualmente para cada benchmark
+        for name, result in results.items():
+            previous = baseline.get("results", {}).get(name, {})
+            if "threshold" in previous:
+                result["threshold"] = previous["threshold"]
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(record, file, indent=2)
+        print(f"Referência gravada em {args.baseline}")
+        return 0
+    if regressions:
+        print(f"{len(regressions)} regressões: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_benchmarks())
@@ -2,5 +2,5 @@
 Comando de debug para testes de execução de comandos.
 """
 app.hideWindowAfterCommand = False  # Define a variável de instância hideWindowAfterCommand como False
-logging.debug(f"hideWindowAfterCommand set to: {app.hideWindowAfterCommand}")
-logging.debug(f"Comando {command} executado com sucesso!")
\ No newline at end of file
+logging.debug("hideWindowAfterCommand set to: %s", app.hideWindowAfterCommand)
+logging.debug("Comando %s executado com sucesso!", command)
\ No newline at end of file
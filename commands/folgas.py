@@ -1,5 +0,0 @@
-"""
-Abre a planilha de Folgas e oculta a janela do aplicativo.
-"""
-app.open_link("https://docs.google.com/spreadsheets/d/1rlUSeCJRYl7zTnf2jesXZdbsZ7iOBdsK/")
-app.hide_window()
\ No newline at end of file
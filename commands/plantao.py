@@ -1,5 +0,0 @@
-"""
-Abre a planilha de Plantões e oculta a janela do aplicativo.
-"""
-app.open_link("https://docs.google.com/spreadsheets/d/1jLOgrq3hnRTp3Og75cr2XG6Do8meGPj3/")
-app.hide_window()
\ No newline at end of file
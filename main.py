@@ -1,15 +1,50 @@
 import os  # Importa a biblioteca os para interações com o sistema operacional
 import logging  # Importa a biblioteca logging para logs apropriados
 import threading  # Importa a biblioteca threading para trabalhar com threads
-import webbrowser  # Importa a biblioteca webbrowser para abrir links no navegador
 import sys # Importa a biblioteca sys para obter informações sobre o sistema
+import hashlib  # Importa a biblioteca hashlib para gerar nomes de arquivos do cache
+import importlib.util  # Importa importlib.util para obter o número mágico do bytecode
+import marshal  # Importa a biblioteca marshal para serializar código compilado
+import struct  # Importa a biblioteca struct para montar o cabeçalho do cache em disco
+import ast  # Importa a biblioteca ast para extrair os metadados dos comandos
+import json  # Importa a biblioteca json para persistir o índice de comandos
+import re  # Importa a biblioteca re para separar os termos indexados
+import math  # Importa a biblioteca math para o cálculo da relevância das sugestões
+import heapq  # Importa a biblioteca heapq para selecionar as melhores sugestões
+import time  # Importa a biblioteca time para medir latências e registrar usos
+import queue  # Importa a biblioteca queue para enviar chamadas à thread da interface
+import itertools  # Importa a biblioteca itertools para numerar os jobs
+import concurrent.futures  # Importa concurrent.futures para o pool de execução de comandos
+import copy  # Importa a biblioteca copy para aplicar temas sem alterar o cache
+import select  # Importa a biblioteca select para aguardar eventos do inotify
+import ctypes  # Importa a biblioteca ctypes para acessar o inotify da libc
+import ctypes.util  # Importa ctypes.util para localizar a libc
+import argparse  # Importa a biblioteca argparse para ler os argumentos da linha de comando
+import contextlib  # Importa a biblioteca contextlib para medir as fases da inicialização
+import logging.handlers  # Importa logging.handlers para guardar os logs até o arquivo ser aberto
+import socket  # Importa a biblioteca socket para a comunicação entre instâncias
+import secrets  # Importa a biblioteca secrets para gerar o token da instância
+import tempfile  # Importa a biblioteca tempfile para localizar o diretório temporário
+import gzip  # Importa a biblioteca gzip para compactar os logs rotacionados
+import shutil  # Importa a biblioteca shutil para copiar o log rotacionado para o arquivo compactado
+import bisect  # Importa a biblioteca bisect para localizar o limite de cada latência nos histogramas
+import string  # Importa a biblioteca string para interpretar os campos das URLs dos comandos de link
+import functools  # Importa a biblioteca functools para guardar as URLs já compiladas
+import urllib.parse  # Importa urllib.parse para codificar os valores inseridos nas URLs
+import subprocess  # Importa a biblioteca subprocess para abrir vários links em uma única chamada ao navegador
+import multiprocessing  # Importa a biblioteca multiprocessing para executar comandos isolados em outros processos
+import pickle  # Importa a biblioteca pickle para identificar resultados que não podem ser enviados aos processos
+import traceback  # Importa a biblioteca traceback para registrar os erros dos comandos isolados
+from collections import OrderedDict, namedtuple, deque  # Importa OrderedDict para o controle LRU do cache, namedtuple para as entradas do registro e deque para o modo em lote
 
-import tkinter  # Importa a biblioteca tkinter para criar interfaces gráficas
-import customtkinter  # Importa a biblioteca customtkinter para widgets personalizados
-from customtkinter.windows.ctk_toplevel import ThemeManager  # Importado para gerenciar temas de cores
-import keyboard  # Importa a biblioteca keyboard para capturar eventos de teclado
-import pystray  # Importa a biblioteca pystray para criar ícones na bandeja do sistema
-from PIL import Image, ImageDraw  # Importa a biblioteca PIL para manipulação de imagens
+# Marca o início da inicialização, antes das bibliotecas da interface, para o perfil de startup
+startup_started = time.perf_counter()
+
+# tkinter e customtkinter são importados por load_interface_modules, apenas quando a janela é criada;
+# keyboard, pystray, PIL e webbrowser são importados sob demanda, após o primeiro quadro
+tkinter = None
+customtkinter = None
+ThemeManager = None
 
 # Obtém o diretório do script atual ou o diretório temporário do PyInstaller
 if getattr(sys, 'frozen', False):
@@ -23,28 +58,42 @@ theme_path = os.path.join(script_dir, "assets", "theme.json")
 # Constrói o caminho para o arquivo de tema
 theme_dir = os.path.join(script_dir, "assets", "themes")
 
-# Define o tema padrão do customtkinter usando o caminho do arquivo de tema
-customtkinter.set_default_color_theme(theme_path)  # Temas: "blue" (padrão), "green", "dark-blue", ("sweetkind?"")
-
 # Constrói o caminho para o diretório de logs
 log_dir = os.path.join(script_dir, "log")
 
-# Cria o diretório de logs se não existir
-os.makedirs(log_dir, exist_ok=True)
-
-# Configura o logger
-logging.basicConfig(
-    level=logging.ERROR,
-    format='%(asctime)s - [%(levelname)s] %(filename)s:%(lineno)d (%(name)s/%(funcName)s) --> %(message)s',
-    datefmt='%Y-%m-%d @ %H:%M:%S',
-    handlers=[
-        logging.FileHandler(f"{log_dir}/main.log", encoding="utf-8"),
-        logging.StreamHandler()
-    ]
-)
+# Formato das mensagens de log
+logFormat = '%(asctime)s - [%(levelname)s] %(filename)s:%(lineno)d (%(name)s/%(funcName)s) --> %(message)s'
+logDateFormat = '%Y-%m-%d @ %H:%M:%S'
+log_path = os.path.join(log_dir, "main.log")
+logRotateBytes = 1024 * 1024  # Tamanho máximo (em bytes) do arquivo de log antes da rotação
+logRotateInterval = 24 * 3600  # Intervalo máximo (em segundos) entre rotações do arquivo de log
+logBackupCount = 5  # Quantidade de arquivos de log antigos (compactados) mantidos
+defaultLogLevel = logging.ERROR
+# Nomes aceitos pelo comando "log" para alterar o nível em tempo de execução
+logLevelNames = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "aviso": logging.WARNING,
+    "warning": logging.WARNING,
+    "erro": logging.ERROR,
+    "error": logging.ERROR,
+}
+
+# Arquivo onde cada execução com --startup-profile acrescenta o tempo de cada fase
+startup_profile_path = os.path.join(log_dir, "startup_profile.jsonl")
+servicesStartupTimeout = 5.0  # Tempo máximo (em segundos) para aguardar os serviços carregados em segundo plano
+
+# Endereço da instância única: socket UNIX ou, onde ele não existe, arquivo com a porta TCP e o token
+instance_runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+instance_user = os.environ.get("USER") or os.environ.get("USERNAME") or "launcher"
+instance_socket_path = os.path.join(instance_runtime_dir, f"launcher-{instance_user}.sock")
+instance_info_path = os.path.join(instance_runtime_dir, f"launcher-{instance_user}.json")
+instanceTimeout = 5.0  # Tempo máximo (em segundos) de espera por uma resposta da instância
 
 # Define o diretório de comandos e ícones
 commands_dir = os.path.join(script_dir, "commands")
+# Diretórios de comandos extras (ex.: pastas compartilhadas de cada equipe), separados por os.pathsep
+extra_command_dirs = [path for path in os.environ.get("LAUNCHER_COMMAND_DIRS", "").split(os.pathsep) if path]
 icon_path = os.path.join(script_dir, "assets/icons", "icon.png")
 tray_icon_path = os.path.join(script_dir, "assets/icons", "trayicon.png")
 
@@ -53,250 +102,5267 @@ defaultWidth = 240
 defaultHeight = 100
 defaultGeometry = f"{defaultWidth}x{defaultHeight}" #Define a geometria padrão da janela em uma única variável, para facilitar o uso do tamanho final
 
+# Comandos internos e suas descrições, usados nas sugestões enquanto o usuário digita
+builtinCommands = {
+    "exit": "Encerra o aplicativo.",
+    "?": "Mostra a lista de comandos disponíveis.",
+    "dir": "Abre o diretório do aplicativo.",
+    "tema": "Abre a escolha de temas.",
+    "cancelar": "Cancela os comandos em execução.",
+    "log": "Altera o nível do log sem reiniciar (log debug, log info, log erro).",
+    "stats": "Mostra os comandos mais lentos.",
+}
 
-class AlwaysOnTopApp:
+# Texto padrão do rótulo acima do campo de entrada
+defaultLabelText = "\u00AF\\_(\u30C4)_/\u00AF"
+
+# Define os limites do cache de código compilado dos comandos
+codeCacheMaxEntries = 128  # Quantidade máxima de comandos compilados mantidos em memória
+codeCacheMaxBytes = 8 * 1024 * 1024  # Tamanho máximo (em bytes de bytecode) mantido em memória
+useBytecodeCache = True  # Persiste o bytecode em disco para que inicializações seguintes não recompilem
+bytecode_cache_dir = os.path.join(script_dir, "cache", "bytecode")
+
+
+class CompiledCodeCache:
     """
-    Classe para criar uma aplicação que permanece sempre no topo.
+    Cache LRU de objetos de código compilados a partir dos arquivos de comando.
+
+    As entradas são identificadas pelo caminho do arquivo junto com o mtime e o tamanho,
+    de forma que qualquer alteração no arquivo invalida automaticamente o código em cache.
+    Opcionalmente, o bytecode é gravado em disco para evitar recompilações entre execuções.
     """
-    def show_error(self, message):
+    _header = struct.Struct("<4sqQ")  # Número mágico, mtime (ns) e tamanho do arquivo de origem
+
+    def __init__(self, max_entries=codeCacheMaxEntries, max_bytes=codeCacheMaxBytes, disk_dir=None):
+        """
+        Inicializa o cache com os limites de entradas e de tamanho especificados.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()  # caminho -> (assinatura, código, tamanho)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        if self.disk_dir:
+            try:
+                os.makedirs(self.disk_dir, exist_ok=True)
+            except OSError as e:
+                logging.error(f"Erro ao criar o diretório do cache de bytecode, cache em disco desativado: {e}")
+                self.disk_dir = None
+
+    def get(self, path, stat_result=None):
+        """
+        Retorna o objeto de código do arquivo, compilando-o apenas se necessário.
+        """
+        if stat_result is None:
+            stat_result = os.stat(path)
+        signature = (stat_result.st_mtime_ns, stat_result.st_size)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        code, size = self._load_from_disk(path, signature)
+        if code is None:
+            logging.debug("Compilando arquivo de comando: %s", path)
+            with open(path, "r", encoding="utf-8") as file:
+                code = compile(file.read(), path, "exec", dont_inherit=True)
+            data = marshal.dumps(code)
+            size = len(data)
+            self._store_on_disk(path, signature, data)
+
+        self._put(path, signature, code, size)
+        return code
+
+    def invalidate(self, path):
+        """
+        Remove o código de um arquivo do cache em memória.
+        """
+        with self._lock:
+            entry = self._entries.pop(path, None)
+            if entry is not None:
+                self._total_bytes -= entry[2]
+
+    def clear(self):
+        """
+        Limpa todo o cache em memória.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self):
+        """
+        Retorna as estatísticas de uso do cache.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+            }
+
+    def _put(self, path, signature, code, size):
+        """
+        Insere o código no cache e remove as entradas menos usadas além dos limites.
+        """
+        with self._lock:
+            previous = self._entries.pop(path, None)
+            if previous is not None:
+                self._total_bytes -= previous[2]
+            self._entries[path] = (signature, code, size)
+            self._total_bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+            ):
+                evicted_path, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= evicted[2]
+                logging.debug("Removendo do cache de código: %s", evicted_path)
+
+    def _disk_path(self, path):
         """
-        Mostra uma mensagem de erro em uma nova janela.
+        Retorna o caminho do arquivo de bytecode correspondente ao arquivo de comando.
         """
+        digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir, f"{digest}.bin")
+
+    def _load_from_disk(self, path, signature):
+        """
+        Carrega o bytecode do disco se ele corresponder à versão atual do arquivo.
+        """
+        if not self.disk_dir:
+            return None, 0
         try:
-            logging.error(message)
-            error_window = customtkinter.CTkToplevel(self.root)
-            error_window.title("Error")
-            error_window.geometry((f"{defaultWidth}x{defaultHeight}"))
-            error_window.attributes('-topmost', True)
-            error_label = customtkinter.CTkLabel(error_window, text=message, text_color="red")
-            error_label.pack(pady=20)
-            error_button = customtkinter.CTkButton(error_window, text="OK", command=error_window.destroy)
-            error_button.pack(pady=10)
-            self.root.update_idletasks()
+            with open(self._disk_path(path), "rb") as file:
+                data = file.read()
+            magic, mtime_ns, size = self._header.unpack_from(data)
+            if magic != importlib.util.MAGIC_NUMBER or (mtime_ns, size) != signature:
+                return None, 0
+            code = marshal.loads(data[self._header.size:])
+            self.disk_hits += 1
+            return code, len(data) - self._header.size
+        except FileNotFoundError:
+            return None, 0
         except Exception as e:
-            logging.error(f"Erro ao mostrar a mensagem de erro: {e}")
-    def __init__(self):
+            logging.debug("Bytecode em disco ignorado para %s: %s", path, e)
+            return None, 0
+
+    def _store_on_disk(self, path, signature, data):
         """
-        Inicializa a aplicação, configurando a janela principal e a interface.
+        Grava o bytecode em disco de forma atômica.
         """
+        if not self.disk_dir:
+            return
+        target = self._disk_path(path)
+        temp = f"{target}.{os.getpid()}.tmp"
         try:
-            logging.info("Inicializando a aplicação...")
-            self.root = customtkinter.CTk()
-            self.root.geometry(defaultGeometry)
-            self.root.title("Launcher")
-            self.root.attributes('-topmost', True)
-            self.root.overrideredirect(True)
-            self.root.iconphoto(False, tkinter.PhotoImage(file=icon_path))
-            self.center_window()
-            self.root.protocol("WM_DELETE_WINDOW", self.hide_window)
+            with open(temp, "wb") as file:
+                file.write(self._header.pack(importlib.util.MAGIC_NUMBER, *signature))
+                file.write(data)
+            os.replace(temp, target)
+        except OSError as e:
+            logging.error(f"Erro ao gravar o cache de bytecode: {e}")
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
 
-            self.setup_interface()
 
-            self.visible = True
-            logging.debug(f"Estado inicial de visible: {self.visible}")
+# Extensões aceitas para arquivos de comando, em ordem de prioridade
+commandExtensions = ("py", "txt")
+watcherPollInterval = 2.0  # Intervalo (em segundos) do monitoramento por varredura
+watcherDebounce = 0.05  # Tempo (em segundos) para agrupar rajadas de eventos do inotify
 
-            self.commands = {
-                "dir": self.open_script_dir
-            }
-            self.hideWindowAfterCommand = True
-            logging.debug(f"Estado inicial de hideWindowAfterCommand: {self.hideWindowAfterCommand}")
-            self.entry_count = 0  # Initialize entry count
+# Entrada do registro de comandos: nome, caminho do arquivo e o stat obtido na última varredura
+CommandEntry = namedtuple("CommandEntry", ["name", "path", "stat"])
+
+
+class DirectoryWatcher:
+    """
+    Monitora diretórios em segundo plano e avisa quando o conteúdo deles muda.
+
+    No Linux utiliza o inotify (via ctypes); nos demais sistemas, ou se o inotify
+    não estiver disponível, recorre a uma varredura periódica.
+    """
+    _event_header = struct.Struct("iIII")  # wd, mask, cookie, len
+    _in_mask = (
+        0x00000002  # IN_MODIFY
+        | 0x00000004  # IN_ATTRIB
+        | 0x00000008  # IN_CLOSE_WRITE
+        | 0x00000040  # IN_MOVED_FROM
+        | 0x00000080  # IN_MOVED_TO
+        | 0x00000100  # IN_CREATE
+        | 0x00000200  # IN_DELETE
+        | 0x00000400  # IN_DELETE_SELF
+        | 0x00000800  # IN_MOVE_SELF
+    )
+    _in_ignored = 0x00008000  # IN_IGNORED: o diretório deixou de ser monitorado
+
+    def __init__(self, callback, poll_interval=watcherPollInterval):
+        """
+        Inicializa o monitor; o callback recebe o diretório que mudou.
+        """
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self.backend = None
+        self._paths = []
+        self._watch_descriptors = {}  # wd -> diretório
+        self._inotify_fd = None
+        self._libc = None
+        self._stop_event = threading.Event()
+        self._wake_pipe = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self, paths):
+        """
+        Inicia o monitoramento dos diretórios especificados.
+        """
+        self._paths = list(paths)
+        if sys.platform.startswith("linux") and self._init_inotify():
+            self.backend = "inotify"
+            target = self._inotify_loop
+        else:
+            self.backend = "polling"
+            target = self._polling_loop
+        logging.info("Monitorando diretórios de comandos via %s: %s", self.backend, self._paths)
+        self._thread = threading.Thread(target=target, name="DirectoryWatcher", daemon=True)
+        self._thread.start()
+
+    def add_path(self, path):
+        """
+        Adiciona um diretório ao monitoramento em andamento.
+        """
+        with self._lock:
+            if path in self._paths:
+                return
+            self._paths.append(path)
+            if self.backend == "inotify":
+                self._add_watch(path)
+
+    def remove_path(self, path):
+        """
+        Remove um diretório do monitoramento em andamento.
+        """
+        with self._lock:
+            if path not in self._paths:
+                return
+            self._paths.remove(path)
+            if self.backend == "inotify":
+                for wd, watched in list(self._watch_descriptors.items()):
+                    if watched == path:
+                        self._libc.inotify_rm_watch(self._inotify_fd, wd)
+                        del self._watch_descriptors[wd]
+
+    def stop(self):
+        """
+        Encerra o monitoramento.
+        """
+        self._stop_event.set()
+        if self._wake_pipe:
+            try:
+                os.write(self._wake_pipe[1], b"x")
+            except OSError:
+                pass
+
+    def _init_inotify(self):
+        """
+        Prepara o inotify; retorna False se ele não estiver disponível.
+        """
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(os.O_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1")
+            self._libc = libc
+            self._inotify_fd = fd
+            self._wake_pipe = os.pipe()
+            for path in self._paths:
+                self._add_watch(path)
+            return True
+        except (OSError, AttributeError) as e:
+            logging.warning("inotify indisponível, usando varredura periódica: %s", e)
+            return False
+
+    def _add_watch(self, path):
+        """
+        Registra um diretório no inotify.
+        """
+        wd = self._libc.inotify_add_watch(self._inotify_fd, os.fsencode(path), self._in_mask)
+        if wd < 0:
+            logging.error(f"Erro ao monitorar o diretório {path}: errno {ctypes.get_errno()}")
+            return
+        self._watch_descriptors[wd] = path
+
+    def _inotify_loop(self):
+        """
+        Aguarda eventos do inotify sem acordar enquanto nada muda.
+        """
+        try:
+            while not self._stop_event.is_set():
+                readable, _, _ = select.select([self._inotify_fd, self._wake_pipe[0]], [], [])
+                if self._stop_event.is_set():
+                    break
+                if self._inotify_fd not in readable:
+                    continue
+
+                # Agrupa rajadas de eventos (ex.: editor salvando o arquivo) em um único aviso
+                changed = self._read_events()
+                while select.select([self._inotify_fd], [], [], watcherDebounce)[0]:
+                    changed |= self._read_events()
+                for path in changed:
+                    self._notify(path)
         except Exception as e:
-            self.show_error(f"Erro ao inicializar a aplicação: {e}")
+            logging.error(f"Erro no monitoramento via inotify: {e}")
+        finally:
+            for fd in (self._inotify_fd, *(self._wake_pipe or ())):
+                try:
+                    os.close(fd)
+                except (OSError, TypeError):
+                    pass
 
-    def center_window(self):
+    def _read_events(self):
         """
-        Centraliza a janela na tela.
+        Lê os eventos pendentes e retorna os diretórios afetados.
+        """
+        data = os.read(self._inotify_fd, 64 * 1024)
+        changed = set()
+        offset = 0
+        while offset + self._event_header.size <= len(data):
+            wd, mask, _, name_len = self._event_header.unpack_from(data, offset)
+            offset += self._event_header.size + name_len
+            with self._lock:
+                path = self._watch_descriptors.get(wd)
+                if mask & self._in_ignored:
+                    self._watch_descriptors.pop(wd, None)
+            if path:
+                changed.add(path)
+        return changed
+
+    def _polling_loop(self):
+        """
+        Avisa periodicamente para que os diretórios sejam revarridos.
+        """
+        while not self._stop_event.wait(self.poll_interval):
+            with self._lock:
+                paths = list(self._paths)
+            for path in paths:
+                self._notify(path)
+
+    def _notify(self, path):
+        """
+        Chama o callback protegendo a thread de monitoramento contra erros.
         """
         try:
-            logging.info("Centralizando a janela...")
-            self.root.update_idletasks()
-            width = self.root.winfo_width()
-            height = self.root.winfo_height()
-            x = (self.root.winfo_screenwidth() // 2) - (width // 2)
-            y = (self.root.winfo_screenheight() // 2) - (height // 2)
-            self.root.geometry(f"{width}x{height}+{x}+{y}")
+            self.callback(path)
         except Exception as e:
-            self.show_error(f"Erro ao centralizar a janela: {e}")
+            logging.error(f"Erro ao processar alteração em {path}: {e}")
+
+
+class CommandRegistry:
+    """
+    Índice em memória dos arquivos de comando disponíveis.
+
+    Os comandos vêm do diretório principal e dos diretórios extras configurados, e
+    cada subdiretório forma um namespace (ex.: `rh/folgas` para `rh/folgas.py`).
+    Na inicialização apenas o primeiro nível de cada raiz é lido; um subdiretório
+    só é varrido na primeira vez em que um comando do seu namespace é usado, ou
+    quando a lista completa é pedida. Os níveis carregados são mantidos atualizados
+    por um DirectoryWatcher, e as buscas usam um único dicionário mesclado, em que
+    a primeira raiz configurada tem prioridade quando o mesmo nome existe em mais de uma.
+    """
+    def __init__(self, directory, extensions=commandExtensions, extra_directories=()):
+        """
+        Inicializa o registro para o diretório de comandos e os diretórios extras especificados.
+        """
+        self.directory = directory
+        self.roots = [directory, *extra_directories]
+        self.extensions = tuple(extensions)
+        self._entries = {}  # nome -> CommandEntry (substituído por inteiro a cada atualização)
+        self._names = ()
+        self._providers = {}  # nome -> {índice da raiz: CommandEntry}
+        self._levels = {}  # diretório carregado -> (índice da raiz, namespace, entradas, subdiretórios)
+        self._pending = {}  # namespace ainda não carregado -> [(índice da raiz, diretório)]
+        self._listeners = []
+        self._directory_listeners = []
+        self._lock = threading.RLock()
+        self.watcher = None
+
+    def build(self):
+        """
+        Varre o primeiro nível de cada raiz e monta o índice inicial.
+        """
+        for root_index, root in enumerate(self.roots):
+            if not os.path.isdir(root):
+                logging.warning("Diretório de comandos ignorado (não encontrado): %s", root)
+                continue
+            self._refresh_level(root_index, root, "", notify=False)
+        logging.info(
+            "Registro de comandos montado com %s comandos e %s namespaces pendentes",
+            len(self._entries), len(self._pending)
+        )
+
+    def start_watching(self, poll_interval=watcherPollInterval):
+        """
+        Inicia o monitoramento dos diretórios já carregados para manter o índice atualizado.
+        """
+        self.watcher = DirectoryWatcher(self._on_directory_changed, poll_interval)
+        self.watcher.start(list(self._levels))
+
+    def stop(self):
+        """
+        Encerra o monitoramento dos diretórios.
+        """
+        if self.watcher:
+            self.watcher.stop()
+
+    def lookup(self, name):
+        """
+        Retorna a entrada do comando ou None se ele não existir; carrega o namespace do nome, se preciso.
+        """
+        entry = self._entries.get(name)
+        if entry is not None or "/" not in name:
+            return entry
+        if self.ensure_loaded(name):
+            return self._entries.get(name)
+        return None
+
+    def ensure_loaded(self, name):
+        """
+        Carrega os namespaces pendentes que contêm o nome (ou prefixo) especificado.
+        Retorna True se algum namespace foi carregado.
+        """
+        parts = name.split("/")[:-1]
+        loaded = False
+        for depth in range(1, len(parts) + 1):
+            namespace = "/".join(parts[:depth])
+            if namespace in self._pending:
+                self.load_namespace(namespace)
+                loaded = True
+        return loaded
+
+    def load_namespace(self, namespace):
+        """
+        Varre os diretórios de um namespace pendente, em todas as raízes.
+        """
+        with self._lock:
+            pending = self._pending.pop(namespace, [])
+        for root_index, directory in pending:
+            logging.debug("Carregando namespace de comandos '%s' de %s", namespace, directory)
+            self._refresh_level(root_index, directory, namespace)
+
+    def load_all(self):
+        """
+        Carrega todos os namespaces pendentes (usado pela listagem completa).
+        """
+        while self._pending:
+            self.load_namespace(min(self._pending))
+
+    def namespaces(self):
+        """
+        Retorna os namespaces conhecidos, carregados ou não, em ordem alfabética.
+        """
+        with self._lock:
+            loaded = {namespace for _, namespace, _, _ in self._levels.values() if namespace}
+            return sorted(loaded | set(self._pending))
+
+    def names(self):
+        """
+        Retorna os nomes dos comandos já carregados em ordem alfabética.
+        """
+        return self._names
+
+    def entries(self):
+        """
+        Retorna as entradas dos comandos já carregados em ordem alfabética.
+        """
+        entries = self._entries
+        return [entries[name] for name in self._names if name in entries]
+
+    def add_listener(self, callback):
+        """
+        Registra um callback chamado com (adicionados, removidos, alterados) a cada mudança.
+        """
+        self._listeners.append(callback)
+
+    def add_directory_listener(self, callback):
+        """
+        Registra um callback chamado com o diretório a cada mudança percebida pelo monitor,
+        para que outros arquivos das raízes (como o links.json) não precisem de outro monitor.
+        """
+        self._directory_listeners.append(callback)
+
+    def _scan(self, directory, namespace):
+        """
+        Lê um nível de diretório e retorna (nome -> entrada, namespace filho -> subdiretório).
+        """
+        found = {}
+        subdirectories = {}
+        priority = {ext: index for index, ext in enumerate(self.extensions)}
+        prefix = f"{namespace}/" if namespace else ""
+        with os.scandir(directory) as iterator:
+            for dir_entry in iterator:
+                if dir_entry.is_dir():
+                    if not dir_entry.name.startswith((".", "__")):
+                        subdirectories[prefix + dir_entry.name.lower()] = dir_entry.path
+                    continue
+                name, _, ext = dir_entry.name.rpartition(".")
+                if not name or ext not in priority or not dir_entry.is_file():
+                    continue
+                name = prefix + name.lower()
+                current = found.get(name)
+                if current is not None and priority[current[0]] <= priority[ext]:
+                    continue
+                found[name] = (ext, CommandEntry(name, dir_entry.path, dir_entry.stat()))
+        return {name: entry for name, (_, entry) in found.items()}, subdirectories
+
+    def _refresh_level(self, root_index, directory, namespace, notify=True):
+        """
+        Revarre um nível de diretório e aplica as diferenças ao índice mesclado.
+        """
+        try:
+            entries, subdirectories = self._scan(directory, namespace)
+            exists = True
+        except FileNotFoundError:
+            entries, subdirectories, exists = {}, {}, False
+
+        with self._lock:
+            previous = self._levels.get(directory)
+            previous_entries, previous_subdirectories = (previous[2], previous[3]) if previous else ({}, {})
+            affected = set(previous_entries) | set(entries)
+
+            # Subdiretórios removidos levam junto os níveis já carregados abaixo deles
+            removed_levels = []
+            for child_namespace, child_directory in previous_subdirectories.items():
+                if subdirectories.get(child_namespace) == child_directory:
+                    continue
+                self._discard_pending(child_namespace, child_directory)
+                removed_levels.extend(
+                    path for path in self._levels
+                    if path == child_directory or path.startswith(child_directory + os.sep)
+                )
+            for path in removed_levels:
+                level_root, _, level_entries, level_subdirectories = self._levels.pop(path)
+                for child_namespace, child_directory in level_subdirectories.items():
+                    self._discard_pending(child_namespace, child_directory)
+                for name in level_entries:
+                    self._providers.get(name, {}).pop(level_root, None)
+                affected.update(level_entries)
+
+            if exists:
+                self._levels[directory] = (root_index, namespace, entries, subdirectories)
+                for child_namespace, child_directory in subdirectories.items():
+                    if child_directory not in self._levels and child_directory not in previous_subdirectories.values():
+                        self._pending.setdefault(child_namespace, []).append((root_index, child_directory))
+            else:
+                self._levels.pop(directory, None)
+                removed_levels.append(directory)
+            for name in previous_entries:
+                if name not in entries:
+                    self._providers.get(name, {}).pop(root_index, None)
+            for name, entry in entries.items():
+                self._providers.setdefault(name, {})[root_index] = entry
+
+            added, removed, changed = self._merge(affected)
+
+        if self.watcher:
+            if exists:
+                self.watcher.add_path(directory)
+            for path in removed_levels:
+                self.watcher.remove_path(path)
+        if notify and (added or removed or changed):
+            logging.info(
+                "Comandos atualizados: %s adicionados, %s removidos, %s alterados",
+                len(added), len(removed), len(changed)
+            )
+            for listener in list(self._listeners):
+                try:
+                    listener(added, removed, changed)
+                except Exception as e:
+                    logging.error(f"Erro ao notificar alteração de comandos: {e}")
+
+    def _merge(self, names):
+        """
+        Recalcula as entradas mescladas dos nomes afetados; retorna (adicionados, removidos, alterados).
+        """
+        entries = dict(self._entries)
+        added, removed, changed = [], [], []
+        for name in names:
+            providers = self._providers.get(name)
+            entry = providers[min(providers)] if providers else None
+            previous = entries.get(name)
+            if entry is None:
+                self._providers.pop(name, None)
+                if previous is not None:
+                    del entries[name]
+                    removed.append(previous)
+            elif previous is None:
+                entries[name] = entry
+                added.append(entry)
+            elif (
+                previous.path != entry.path
+                or previous.stat.st_mtime_ns != entry.stat.st_mtime_ns
+                or previous.stat.st_size != entry.stat.st_size
+            ):
+                entries[name] = entry
+                changed.append(entry)
+        if added or removed or changed:
+            self._entries = entries
+            if added or removed:
+                self._names = tuple(sorted(entries))
+        return added, removed, changed
+
+    def _discard_pending(self, namespace, directory):
+        """
+        Remove um subdiretório da lista de namespaces pendentes.
+        """
+        pending = [item for item in self._pending.get(namespace, []) if item[1] != directory]
+        if pending:
+            self._pending[namespace] = pending
+        else:
+            self._pending.pop(namespace, None)
+
+    def _on_directory_changed(self, directory):
+        """
+        Revarre o nível que mudou e avisa os ouvintes sobre as diferenças encontradas.
+        """
+        level = self._levels.get(directory)
+        if level is not None:
+            self._refresh_level(level[0], directory, level[1])
+        for listener in list(self._directory_listeners):
+            try:
+                listener(directory)
+            except Exception as e:
+                logging.error(f"Erro ao notificar a mudança no diretório {directory}: {e}")
+
+
+# Índice persistente com os metadados (descrição, parâmetros e tags) dos comandos
+command_index_path = os.path.join(script_dir, "cache", "commands_index.json")
+commandIndexVersion = 4
+
+# Metadados de um comando extraídos da docstring e de atribuições no nível do módulo
+CommandMetadata = namedtuple(
+    "CommandMetadata", ["description", "parameters", "tags", "timeout", "isolation", "hotkey"], defaults=(None, None)
+)
+
+
+class CommandMetadataIndex:
+    """
+    Índice dos metadados dos arquivos de comando, persistido em disco.
+
+    Cada arquivo é analisado com `ast` apenas uma vez por versão (mtime/tamanho,
+    com o hash do conteúdo como segunda verificação), de forma que a listagem
+    de comandos só reprocessa os arquivos que mudaram.
+    """
+    _field_aliases = {
+        "parâmetros": "parameters",
+        "parametros": "parameters",
+        "params": "parameters",
+        "tags": "tags",
+        "timeout": "timeout",
+        "tempo limite": "timeout",
+        "isolamento": "isolation",
+        "isolation": "isolation",
+        "atalho": "hotkey",
+        "hotkey": "hotkey",
+    }
+    _variable_aliases = {
+        "__parametros__": "parameters",
+        "__params__": "parameters",
+        "__tags__": "tags",
+        "__timeout__": "timeout",
+        "__isolamento__": "isolation",
+        "__atalho__": "hotkey",
+    }
+
+    def __init__(self, index_path=command_index_path):
+        """
+        Inicializa o índice vazio; os metadados persistidos são lidos por `load`.
+        """
+        self.index_path = index_path
+        self._records = {}  # caminho -> dicionário com assinatura, hash e metadados
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.parsed = 0
+
+    def get(self, path, stat_result=None):
+        """
+        Retorna os metadados do arquivo, analisando-o apenas se ele mudou.
+        """
+        if stat_result is None:
+            stat_result = os.stat(path)
+
+        with self._lock:
+            record = self._records.get(path)
+        if record and record["mtime_ns"] == stat_result.st_mtime_ns and record["size"] == stat_result.st_size:
+            return self._metadata(record)
+
+        with open(path, "rb") as file:
+            data = file.read()
+        digest = hashlib.sha1(data).hexdigest()
+
+        if record and record["sha1"] == digest:
+            # Conteúdo igual com mtime diferente (ex.: arquivo copiado): só atualiza a assinatura
+            record = dict(record, mtime_ns=stat_result.st_mtime_ns, size=stat_result.st_size)
+        else:
+            logging.debug("Extraindo metadados do comando: %s", path)
+            metadata = self.parse(data.decode("utf-8", errors="replace"), path)
+            self.parsed += 1
+            record = {
+                "mtime_ns": stat_result.st_mtime_ns,
+                "size": stat_result.st_size,
+                "sha1": digest,
+                "description": metadata.description,
+                "parameters": list(metadata.parameters),
+                "tags": list(metadata.tags),
+                "timeout": metadata.timeout,
+                "isolation": metadata.isolation,
+                "hotkey": metadata.hotkey,
+            }
+
+        with self._lock:
+            self._records[path] = record
+            self._dirty = True
+        return self._metadata(record)
+
+    def peek(self, path, stat_result):
+        """
+        Retorna os metadados já indexados do arquivo, sem acessar o disco (ou None).
+        """
+        with self._lock:
+            record = self._records.get(path)
+        if record and record["mtime_ns"] == stat_result.st_mtime_ns and record["size"] == stat_result.st_size:
+            return self._metadata(record)
+        return None
+
+    def discard(self, paths):
+        """
+        Remove do índice os arquivos especificados.
+        """
+        with self._lock:
+            for path in paths:
+                if self._records.pop(path, None) is not None:
+                    self._dirty = True
+
+    def save(self):
+        """
+        Grava o índice em disco se houver alterações pendentes.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {"version": commandIndexVersion, "files": dict(self._records)}
+            self._dirty = False
+
+        temp = f"{self.index_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            with open(temp, "w", encoding="utf-8") as file:
+                json.dump(payload, file, ensure_ascii=False)
+            os.replace(temp, self.index_path)
+        except OSError as e:
+            logging.error(f"Erro ao gravar o índice de comandos: {e}")
+            with self._lock:
+                self._dirty = True
+
+    @classmethod
+    def parse(cls, source, path="<comando>"):
+        """
+        Extrai descrição, parâmetros e tags do código-fonte de um comando.
+        """
+        fields = {"parameters": [], "tags": [], "timeout": None, "isolation": None, "hotkey": None}
+        try:
+            tree = ast.parse(source, path)
+        except SyntaxError:
+            # Arquivos .txt podem não ser Python válido; usa apenas a docstring textual
+            docstring = cls._legacy_docstring(source)
+        else:
+            docstring = ast.get_docstring(tree) or ""
+            for node in tree.body:
+                if not isinstance(node, ast.Assign) or len(node.targets) != 1:
+                    continue
+                target = node.targets[0]
+                field = isinstance(target, ast.Name) and cls._variable_aliases.get(target.id)
+                if not field:
+                    continue
+                try:
+                    value = ast.literal_eval(node.value)
+                except (ValueError, TypeError, SyntaxError):
+                    continue
+                cls._set_field(fields, field, value)
+
+        description = []
+        for line in docstring.splitlines():
+            key, separator, value = line.partition(":")
+            field = cls._field_aliases.get(key.strip().lower()) if separator else None
+            if field:
+                cls._set_field(fields, field, value)
+            elif line.strip():
+                description.append(line.strip())
+
+        return CommandMetadata(
+            " ".join(description) or "[Sem descrição]",
+            tuple(dict.fromkeys(fields["parameters"])),
+            tuple(dict.fromkeys(fields["tags"])),
+            fields["timeout"],
+            fields["isolation"],
+            fields["hotkey"],
+        )
+
+    @classmethod
+    def _set_field(cls, fields, field, value):
+        """
+        Acumula o valor de um campo de metadados, convertendo o tempo limite em segundos.
+        """
+        if field == "hotkey":
+            if not isinstance(value, str):
+                logging.warning("Atalho inválido ignorado: %r", value)
+                return
+            fields["hotkey"] = value.strip().lower() or None
+            return
+        if field == "isolation":
+            isolation = str(value).strip().lower()
+            if isolation in commandIsolationModes:
+                fields["isolation"] = isolation
+            else:
+                logging.warning("Modo de isolamento inválido ignorado: %r", value)
+            return
+        if field != "timeout":
+            fields[field].extend(cls._split_values(value))
+            return
+        try:
+            timeout = float(str(value).strip().rstrip("s"))
+        except ValueError:
+            logging.warning("Tempo limite inválido ignorado: %r", value)
+            return
+        fields["timeout"] = timeout if timeout > 0 else None
+
+    @staticmethod
+    def _split_values(value):
+        """
+        Normaliza uma lista ou texto separado por vírgulas em uma lista de valores.
+        """
+        if isinstance(value, str):
+            value = value.split(",")
+        elif not isinstance(value, (list, tuple, set, frozenset)):
+            logging.warning("Lista de valores inválida ignorada: %r", value)
+            return []
+        return [str(item).strip() for item in value if str(item).strip()]
+
+    @staticmethod
+    def _legacy_docstring(source):
+        """
+        Obtém o texto entre as primeiras aspas triplas de um arquivo que não é Python válido.
+        """
+        parts = source.split('"""')
+        return parts[1] if len(parts) >= 3 else ""
+
+    @staticmethod
+    def _metadata(record):
+        """
+        Converte um registro do índice em CommandMetadata.
+        """
+        return CommandMetadata(
+            record["description"], tuple(record["parameters"]), tuple(record["tags"]), record.get("timeout"),
+            record.get("isolation"), record.get("hotkey")
+        )
+
+    def load(self):
+        """
+        Carrega o índice persistido, ignorando arquivos ausentes ou de outra versão.
+        """
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as file:
+                payload = json.load(file)
+            if payload.get("version") == commandIndexVersion:
+                with self._lock:
+                    self._records = payload.get("files", {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning("Índice de comandos ignorado: %s", e)
+
+
+# Manifesto com os comandos de link, lido na raiz de cada diretório de comandos
+linkManifestName = "links.json"
+linkManifestVersion = 1
+linkCommandFields = {"description", "url", "prompts", "tags", "bulk", "hotkey"}
+linkPromptFields = {"name", "label", "color", "type"}
+linkNamePattern = re.compile(r"^[a-z0-9_\-]+(/[a-z0-9_\-]+)*$")
+linkBulkSeparators = re.compile(r"[\s,;]+")  # Separadores dos valores colados no modo em massa
+recentLinksSize = 512  # Quantidade de valores lembrados para descartar os abertos há pouco
+recentLinksTtl = 15 * 60  # Tempo (em segundos) durante o qual um valor aberto é descartado no modo em massa
+
+# Campo de entrada pedido por um comando de link antes de abrir a URL
+LinkPrompt = namedtuple("LinkPrompt", ["name", "label", "color", "type"], defaults=(None,))
+
+# CNPJ numérico ou alfanumérico: 12 caracteres (dígitos ou letras) e 2 dígitos verificadores
+cnpjPattern = re.compile(r"^[0-9A-Z]{12}[0-9]{2}$")
+
+
+def normalize_cnpj(value):
+    """
+    Remove a pontuação do CNPJ e confere os dígitos verificadores; lança ValueError se for inválido.
+    Aceita o CNPJ alfanumérico, em que cada caractere vale o seu código ASCII menos 48.
+    """
+    cnpj = re.sub(r"[.\-/\s]", "", value).upper()
+    if not cnpjPattern.match(cnpj) or len(set(cnpj)) == 1:
+        raise ValueError(f"CNPJ inválido: {value}")
+    digits = [ord(char) - 48 for char in cnpj]
+    for size in (12, 13):
+        total = sum(digit * (2 + (size - 1 - position) % 8) for position, digit in enumerate(digits[:size]))
+        if digits[size] != (0 if total % 11 < 2 else 11 - total % 11):
+            raise ValueError(f"CNPJ inválido: {value}")
+    return cnpj
+
+
+# Tipos de valor aceitos no campo "type" dos pedidos: nome -> função que normaliza e valida
+linkValueTypes = {
+    "cnpj": normalize_cnpj,
+}
+
+
+class RecentValues:
+    """
+    Conjunto LRU limitado dos valores usados recentemente, com prazo de validade.
+    """
+    def __init__(self, max_entries=recentLinksSize, ttl=recentLinksTtl):
+        """
+        Inicializa o conjunto com o limite de entradas e o prazo (em segundos) especificados.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # valor -> instante do último uso
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        """
+        Indica se o valor foi usado dentro do prazo.
+        """
+        with self._lock:
+            used_at = self._entries.get(key)
+            return used_at is not None and time.monotonic() - used_at < self.ttl
+
+    def add(self, key):
+        """
+        Registra o uso do valor, descartando o mais antigo se o limite for excedido.
+        """
+        with self._lock:
+            self._entries[key] = time.monotonic()
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class LinkTemplate:
+    """
+    URL com campos nomeados (ex.: `https://.../pesquisar/{cnpj}`), compilada uma única vez.
+
+    Os valores são codificados para URL ao montar o link, e campos não declarados
+    ou sem valor são erros detectados ao carregar, e não ao executar.
+    """
+    _formatter = string.Formatter()
+
+    def __init__(self, name, url, description="", prompts=(), tags=(), bulk=False, hotkey=None):
+        """
+        Compila a URL; lança ValueError se ela for inválida ou usar campos não declarados.
+        """
+        self.name = name
+        self.description = description
+        self.prompts = tuple(prompts)
+        self.tags = tuple(tags)
+        self.bulk = bulk  # Aceita vários valores de uma vez (apenas com um único pedido)
+        self.hotkey = hotkey  # Atalho global que executa o comando sem abrir a janela
+        self.url = url
+        self._parts = []  # (texto literal, nome do campo ou None)
+        if not url.startswith(("http://", "https://")):
+            raise ValueError("a URL deve começar com http:// ou https://")
+        try:
+            for literal, field, format_spec, conversion in self._formatter.parse(url):
+                if field is not None and (not field.isidentifier() or format_spec or conversion):
+                    raise ValueError(f"campo inválido na URL: {{{field}}}")
+                self._parts.append((literal, field))
+        except ValueError as e:
+            raise ValueError(f"URL inválida: {e}") from e
+        fields = [field for _, field in self._parts if field]
+        declared = [prompt.name for prompt in self.prompts]
+        if set(fields) != set(declared):
+            raise ValueError(f"os campos da URL {sorted(set(fields))} não correspondem aos pedidos {declared}")
+        for prompt in self.prompts:
+            if prompt.type is not None and prompt.type not in linkValueTypes:
+                raise ValueError(f"tipo desconhecido no pedido '{prompt.name}': {prompt.type}")
+        if bulk and len(self.prompts) != 1:
+            raise ValueError("o modo em massa exige exatamente um pedido")
+
+    def normalize(self, name, value):
+        """
+        Normaliza e valida o valor do pedido conforme o seu tipo; lança ValueError se for inválido.
+        """
+        value = value.strip()
+        for prompt in self.prompts:
+            if prompt.name == name and prompt.type is not None:
+                return linkValueTypes[prompt.type](value)
+        return value
+
+    def split_bulk(self, text):
+        """
+        Separa os valores colados (em linhas, ou separados por vírgula, ponto e vírgula ou espaço).
+        Retorna os valores válidos normalizados, sem repetições, e os valores inválidos.
+        """
+        name = self.prompts[0].name
+        values = {}
+        invalid = []
+        for value in linkBulkSeparators.split(text):
+            if not value:
+                continue
+            try:
+                values.setdefault(self.normalize(name, value), None)
+            except ValueError:
+                invalid.append(value)
+        return list(values), invalid
+
+    def render(self, values):
+        """
+        Monta a URL com os valores informados (nome do campo -> valor).
+        """
+        return "".join(
+            literal + (urllib.parse.quote(str(values[field]).strip(), safe="") if field else "")
+            for literal, field in self._parts
+        )
+
+    def urls_for(self, arguments):
+        """
+        Monta as URLs a partir de argumentos (um por pedido ou, no modo em massa, vários valores).
+        Retorna as URLs e os valores inválidos; lança ValueError se a quantidade de argumentos não servir.
+        """
+        if self.bulk and arguments:
+            values, invalid = self.split_bulk(" ".join(arguments))
+            return [self.render({self.prompts[0].name: value}) for value in values], invalid
+        if len(arguments) != len(self.prompts):
+            expected = " ".join(f"<{prompt.name}>" for prompt in self.prompts)
+            raise ValueError(f"uso: {self.name} {expected}".rstrip())
+        values = {}
+        for prompt, value in zip(self.prompts, arguments):
+            try:
+                values[prompt.name] = self.normalize(prompt.name, value)
+            except ValueError:
+                return [], [value]
+        return [self.render(values)], []
+
+    @classmethod
+    def from_manifest(cls, name, spec):
+        """
+        Valida a declaração de um comando do manifesto e retorna o template compilado.
+        """
+        if not isinstance(spec, dict):
+            raise ValueError("a declaração deve ser um objeto JSON")
+        unknown = set(spec) - linkCommandFields
+        if unknown:
+            raise ValueError(f"campos desconhecidos: {', '.join(sorted(unknown))}")
+        if not isinstance(spec.get("url"), str):
+            raise ValueError("o campo 'url' é obrigatório")
+        prompts = []
+        for prompt in spec.get("prompts", []):
+            if isinstance(prompt, str):
+                prompt = {"name": prompt}
+            if not isinstance(prompt, dict) or not isinstance(prompt.get("name"), str):
+                raise ValueError("cada item de 'prompts' deve ter um 'name'")
+            unknown = set(prompt) - linkPromptFields
+            if unknown:
+                raise ValueError(f"campos desconhecidos no pedido '{prompt['name']}': {', '.join(sorted(unknown))}")
+            prompts.append(LinkPrompt(
+                prompt["name"], prompt.get("label", prompt["name"].upper()), prompt.get("color", "cyan"),
+                prompt.get("type")
+            ))
+        tags = spec.get("tags", [])
+        if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+            raise ValueError("o campo 'tags' deve ser uma lista de textos")
+        if not isinstance(spec.get("bulk", False), bool):
+            raise ValueError("o campo 'bulk' deve ser true ou false")
+        hotkey = spec.get("hotkey")
+        if hotkey is not None and (not isinstance(hotkey, str) or not hotkey.strip()):
+            raise ValueError("o campo 'hotkey' deve ser um texto, como \"ctrl+alt+f\"")
+        return cls(
+            name, spec["url"], str(spec.get("description", "")), prompts, tags, spec.get("bulk", False),
+            hotkey.strip().lower() if hotkey else None
+        )
+
+    @staticmethod
+    def single_value(base_url):
+        """
+        Retorna a URL compilada com um único campo, usada por open_link_with_value.
+        """
+        return _single_value_template(base_url)
+
+    @staticmethod
+    def fill(base_url, value):
+        """
+        Preenche os campos da URL base (ex.: `{cnpj}` ou o antigo REPLACEME) com o valor codificado.
+        """
+        template = _single_value_template(base_url)
+        return template.render({prompt.name: value for prompt in template.prompts})
+
+
+@functools.lru_cache(maxsize=128)
+def _single_value_template(base_url):
+    """
+    Compila, uma única vez por URL, o template de LinkTemplate.single_value.
+
+    O marcador antigo REPLACEME continua aceito como o campo {valor}; em uma URL antiga
+    sem campos válidos, as chaves são mantidas como texto (ex.: `https://x/a}b`).
+    """
+    escaped = base_url.replace("{", "{{").replace("}", "}}")
+    if "REPLACEME" in base_url:
+        return LinkTemplate("", escaped.replace("REPLACEME", "{valor}"), prompts=[LinkPrompt("valor", "valor", "cyan")])
+    try:
+        fields = [field for _, field, _, _ in string.Formatter().parse(base_url) if field]
+        return LinkTemplate("", base_url, prompts=[LinkPrompt(field, field, "cyan") for field in dict.fromkeys(fields)])
+    except ValueError:
+        return LinkTemplate("", escaped)
+
+
+class LinkManifest:
+    """
+    Comandos de link e macros declarados nos arquivos links.json dos diretórios de comandos.
+
+    Cada manifesto é validado e compilado em LinkTemplates ao ser carregado; executar
+    um desses comandos não lê arquivos nem executa código. As macros (seção "macros")
+    são encadeamentos de comandos salvos com um nome. Os manifestos são recarregados
+    quando mudam, e a primeira raiz tem prioridade em nomes repetidos.
+    """
+    def __init__(self, directories):
+        """
+        Inicializa o manifesto para os diretórios de comandos especificados.
+        """
+        self.paths = [os.path.join(directory, linkManifestName) for directory in directories]
+        self._directories = {os.path.normpath(os.path.dirname(path)) for path in self.paths}
+        self._templates = {}  # nome -> LinkTemplate (substituído por inteiro a cada recarga)
+        self._macros = {}  # nome -> LinkMacro
+        self._signatures = {}
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """
+        Registra um callback chamado (na thread de monitoramento) após cada recarga dos manifestos.
+        """
+        self._listeners.append(callback)
+
+    def load(self):
+        """
+        Lê e compila todos os manifestos.
+        """
+        templates = {}
+        macros = {}
+        signatures = {}
+        for path in self.paths:
+            try:
+                stat_result = os.stat(path)
+            except OSError:
+                continue
+            signatures[path] = (stat_result.st_mtime_ns, stat_result.st_size)
+            file_templates, file_macros = self._load_file(path)
+            for name, template in file_templates.items():
+                templates.setdefault(name, template)
+            for name, macro in file_macros.items():
+                macros.setdefault(name, macro)
+        for name in set(macros) & set(templates):
+            logging.error(f"Macro '{name}' ignorada: já existe um comando de link com esse nome")
+            del macros[name]
+        with self._lock:
+            self._templates = templates
+            self._macros = macros
+            self._signatures = signatures
+        logging.info("%s comandos de link e %s macros carregados", len(templates), len(macros))
+
+    def watch(self, registry):
+        """
+        Passa a recarregar os manifestos quando algum deles muda, usando o monitor do
+        registro de comandos, que já acompanha as mesmas raízes.
+        """
+        registry.add_directory_listener(self._on_directory_changed)
+
+    def get(self, name):
+        """
+        Retorna o template do comando ou None se ele não existir.
+        """
+        return self._templates.get(name)
+
+    def templates(self):
+        """
+        Retorna os templates em ordem alfabética.
+        """
+        templates = self._templates
+        return [templates[name] for name in sorted(templates)]
+
+    def macro(self, name):
+        """
+        Retorna a macro com o nome especificado ou None se ela não existir.
+        """
+        return self._macros.get(name)
+
+    def macros(self):
+        """
+        Retorna as macros em ordem alfabética.
+        """
+        macros = self._macros
+        return [macros[name] for name in sorted(macros)]
+
+    def _load_file(self, path):
+        """
+        Lê um manifesto; declarações inválidas são ignoradas com um erro no log.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                manifest = json.load(file)
+            if not isinstance(manifest, dict) or not isinstance(manifest.get("commands", {}), dict):
+                raise ValueError("o manifesto deve ter um objeto 'commands'")
+            if not isinstance(manifest.get("macros", {}), dict):
+                raise ValueError("o campo 'macros' deve ser um objeto")
+            if manifest.get("version", linkManifestVersion) != linkManifestVersion:
+                raise ValueError(f"versão {manifest.get('version')} não suportada")
+        except Exception as e:
+            logging.error(f"Manifesto de links ignorado ({path}): {e}")
+            return {}, {}
+
+        templates = {}
+        for name, spec in manifest.get("commands", {}).items():
+            key = name.strip().lower()
+            try:
+                if not linkNamePattern.match(key):
+                    raise ValueError("nome inválido")
+                templates[key] = LinkTemplate.from_manifest(key, spec)
+            except ValueError as e:
+                logging.error(f"Comando de link '{name}' ignorado ({path}): {e}")
+
+        macros = {}
+        for name, spec in manifest.get("macros", {}).items():
+            key = name.strip().lower()
+            try:
+                if not linkNamePattern.match(key):
+                    raise ValueError("nome inválido")
+                macros[key] = LinkMacro.from_manifest(key, spec)
+            except ValueError as e:
+                logging.error(f"Macro '{name}' ignorada ({path}): {e}")
+        return templates, macros
+
+    def _on_directory_changed(self, directory):
+        """
+        Recarrega os manifestos se algum deles mudou.
+        """
+        if os.path.normpath(directory) not in self._directories:
+            return
+        signatures = {}
+        for path in self.paths:
+            try:
+                stat_result = os.stat(path)
+                signatures[path] = (stat_result.st_mtime_ns, stat_result.st_size)
+            except OSError:
+                pass
+        if signatures != self._signatures:
+            self.load()
+            for listener in list(self._listeners):
+                try:
+                    listener()
+                except Exception as e:
+                    logging.error(f"Erro ao notificar a recarga dos comandos de link: {e}")
+
+
+# Encadeamento de comandos: ";" separa etapas em sequência e "&" comandos em paralelo
+pipelineMaxSteps = 50  # Quantidade máxima de passos de um encadeamento, após expandir as macros
+pipelineMaxDepth = 8  # Quantidade máxima de macros usadas umas dentro das outras
+
+# Passo de um encadeamento: número, comando (com argumentos) e números dos passos dos quais depende
+PipelineStep = namedtuple("PipelineStep", ["id", "command", "depends_on"])
+
+
+class LinkMacro(namedtuple("LinkMacro", ["name", "steps", "description"])):
+    """
+    Encadeamento de comandos salvo com um nome na seção "macros" do links.json.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_manifest(cls, name, spec):
+        """
+        Valida a declaração de uma macro: um texto (`"folgas ; plantao"`), uma lista de
+        etapas executadas em sequência ou um objeto com "steps" e "description".
+        """
+        description = ""
+        if isinstance(spec, dict):
+            unknown = set(spec) - {"steps", "description"}
+            if unknown:
+                raise ValueError(f"campos desconhecidos: {', '.join(sorted(unknown))}")
+            description = str(spec.get("description", ""))
+            spec = spec.get("steps")
+        if isinstance(spec, list) and spec and all(isinstance(step, str) for step in spec):
+            spec = " ; ".join(spec)
+        if not isinstance(spec, str):
+            raise ValueError("a macro deve ser um texto, uma lista de textos ou um objeto com 'steps'")
+        CommandPipeline.split(spec)  # Erros de sintaxe aparecem ao carregar, e não ao executar
+        steps = spec.strip().lower()
+        return cls(name, steps, description or f"Executa {steps}.")
+
+
+class CommandPipeline:
+    """
+    Encadeamento de comandos organizado como um grafo de dependências.
+
+    `;` separa etapas executadas em sequência e `&` os comandos de uma etapa, executados
+    em paralelo. Macros são expandidas no lugar do nome, e cada passo depende apenas dos
+    passos finais do que vem antes dele: uma macro sequencial dentro de um grupo
+    paralelo mantém a sua ordem sem atrasar os outros comandos do grupo. Quando um
+    passo falha, os que dependem dele são pulados.
+    """
+    def __init__(self, text, macros=None):
+        """
+        Monta os passos do encadeamento; lança ValueError se ele for inválido.
+        """
+        self.text = text
+        self.steps = []
+        self.results = {}  # número do passo -> (estado, duração em segundos, mensagem)
+        self.started = set()
+        self.started_at = time.perf_counter()
+        self.hide_window = True  # Falso se algum comando pediu para manter a janela aberta
+        self.reported = False
+        self._expand(text, frozenset(), macros or {}, ())
+
+    @staticmethod
+    def matches(text):
+        """
+        Indica se o texto é um encadeamento (e não um único comando).
+        """
+        return ";" in text or "&" in text
+
+    @staticmethod
+    def names(text):
+        """
+        Retorna os nomes dos comandos (ou macros) citados no texto, sem os argumentos e sem repetições.
+        """
+        try:
+            stages = CommandPipeline.split(text)
+        except ValueError:
+            return []
+        return list(dict.fromkeys(command.split()[0] for stage in stages for command in stage))
+
+    @staticmethod
+    def split(text):
+        """
+        Separa o texto em etapas, cada uma com os comandos executados em paralelo.
+        """
+        stages = []
+        for stage in text.split(";"):
+            commands = [" ".join(command.split()) for command in stage.split("&")]
+            if not all(commands):
+                raise ValueError(f"comando vazio em '{text.strip()}'")
+            stages.append(commands)
+        return stages
+
+    def ready(self):
+        """
+        Retorna os passos que podem começar agora e marca como pulados os que dependem de uma falha.
+        """
+        ready = []
+        for step in self.steps:  # Dependências sempre têm números menores: uma passada basta
+            if step.id in self.started or step.id in self.results:
+                continue
+            states = [self.results[dependency][0] for dependency in step.depends_on if dependency in self.results]
+            if any(state != "done" for state in states):
+                self.results[step.id] = ("skipped", 0.0, "um passo anterior falhou")
+            elif len(states) == len(step.depends_on):
+                self.started.add(step.id)
+                ready.append(step)
+        return ready
+
+    def finish(self, step, state, elapsed, message=""):
+        """
+        Registra o resultado de um passo.
+        """
+        self.results[step.id] = (state, elapsed, message)
+
+    @property
+    def done(self):
+        """
+        Indica se todos os passos terminaram (ou foram pulados).
+        """
+        return len(self.results) == len(self.steps)
+
+    @property
+    def failed(self):
+        """
+        Indica se algum passo falhou ou foi pulado.
+        """
+        return any(state != "done" for state, _, _ in self.results.values())
+
+    def summary(self):
+        """
+        Retorna o resumo do encadeamento: o total e, por passo, o resultado e a duração.
+        """
+        succeeded = sum(1 for state, _, _ in self.results.values() if state == "done")
+        lines = [f"{succeeded}/{len(self.steps)} comandos em {time.perf_counter() - self.started_at:.2f}s"]
+        symbols = {"done": "\u2713", "failed": "\u2717", "skipped": "\u2013"}
+        for step in self.steps:
+            state, elapsed, message = self.results.get(step.id, ("failed", 0.0, "não executado"))
+            line = f"{symbols.get(state, '?')} {step.command}: {elapsed * 1000:.0f} ms"
+            lines.append(f"{line} ({message})" if message else line)
+        return "\n".join(lines)
+
+    def _expand(self, text, depends_on, macros, stack):
+        """
+        Acrescenta os passos do texto, dependentes de `depends_on`, e retorna os números dos passos finais.
+        """
+        if len(stack) > pipelineMaxDepth:
+            raise ValueError(f"mais de {pipelineMaxDepth} macros aninhadas")
+        terminals = depends_on
+        for stage in self.split(text):
+            current = set()
+            for command in stage:
+                macro = macros.get(command)
+                if macro is not None:
+                    if command in stack:
+                        raise ValueError(f"a macro '{command}' usa a si mesma")
+                    current |= self._expand(macro, terminals, macros, stack + (command,))
+                    continue
+                if len(self.steps) >= pipelineMaxSteps:
+                    raise ValueError(f"mais de {pipelineMaxSteps} comandos")
+                step = PipelineStep(len(self.steps), command, terminals)
+                self.steps.append(step)
+                current.add(step.id)
+            terminals = frozenset(current)
+        return terminals
+
+
+# Parâmetros do mecanismo de sugestões enquanto o usuário digita
+completionLimit = 3  # Quantidade de sugestões exibidas
+completionLatencyBudget = 0.005  # Tempo máximo (em segundos) esperado para cada atualização
+completionRecencyHalfLife = 7 * 24 * 3600  # Meia-vida (em segundos) do bônus por uso recente
+
+
+class CompletionIndex:
+    """
+    Índice em memória para sugerir comandos por prefixo e por similaridade.
+
+    Os nomes e as palavras das descrições ficam em uma trie (busca por prefixo) e em
+    um índice de trigramas (busca aproximada). O índice é atualizado incrementalmente
+    e os resultados são ordenados pela qualidade da correspondência, pela frequência
+    e pela recência de uso de cada comando.
+    """
+    def __init__(self):
+        """
+        Inicializa o índice vazio.
+        """
+        self._trie = {}  # caractere -> nó; cada nó guarda em "\0" os comandos alcançáveis
+        self._trigrams = {}  # trigrama -> conjunto de comandos
+        self._terms = {}  # comando -> termos indexados (para remoção incremental)
+        self._usage = {}  # comando -> (quantidade de usos, instante do último uso)
+        self._lock = threading.Lock()
+
+    def add(self, name, description=""):
+        """
+        Adiciona ou atualiza um comando no índice.
+        """
+        terms = self._extract_terms(name, description)
+        with self._lock:
+            if self._terms.get(name) == terms:
+                return
+            self._remove_locked(name)
+            self._terms[name] = terms
+            for term in terms:
+                node = self._trie
+                for char in term:
+                    node = node.setdefault(char, {})
+                    node.setdefault("\0", set()).add(name)
+            for trigram in self._name_trigrams(name):
+                self._trigrams.setdefault(trigram, set()).add(name)
+
+    def remove(self, name):
+        """
+        Remove um comando do índice.
+        """
+        with self._lock:
+            self._remove_locked(name)
+
+    def record_use(self, name, timestamp=None):
+        """
+        Registra o uso de um comando para a ordenação das sugestões.
+        """
+        with self._lock:
+            count, _ = self._usage.get(name, (0, 0))
+            self._usage[name] = (count + 1, timestamp or time.time())
+
+    def set_usage(self, name, count, last_used):
+        """
+        Define diretamente a frequência e o último uso de um comando.
+        """
+        with self._lock:
+            self._usage[name] = (count, last_used)
+
+    def complete(self, query, limit=completionLimit):
+        """
+        Retorna os comandos mais relevantes para o texto digitado.
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+        now = time.time()
+        with self._lock:
+            scores = {}
+            node = self._trie
+            for char in query:
+                node = node.get(char)
+                if node is None:
+                    break
+            else:
+                for name in node.get("\0", ()):
+                    # Prefixo do nome vale mais do que prefixo de uma palavra da descrição
+                    scores[name] = 3.0 if name.startswith(query) else 2.0
+
+            if len(scores) < limit and len(query) >= 3:
+                query_trigrams = self._name_trigrams(query)
+                overlap = {}
+                for trigram in query_trigrams:
+                    for name in self._trigrams.get(trigram, ()):
+                        overlap[name] = overlap.get(name, 0) + 1
+                for name, shared in overlap.items():
+                    similarity = shared / len(query_trigrams)
+                    if shared >= 3 and similarity >= 0.4 and name not in scores:
+                        scores[name] = similarity
+
+            if not scores:
+                return []
+            ranked = heapq.nlargest(
+                limit, scores, key=lambda name: (scores[name] + self._usage_score(name, now), -len(name))
+            )
+        return ranked
+
+    def __len__(self):
+        """
+        Retorna a quantidade de comandos indexados.
+        """
+        return len(self._terms)
+
+    def _usage_score(self, name, now):
+        """
+        Calcula o bônus de um comando pela frequência e recência de uso.
+        """
+        count, last_used = self._usage.get(name, (0, 0))
+        if not count:
+            return 0.0
+        recency = 0.5 ** ((now - last_used) / completionRecencyHalfLife)
+        return min(math.log1p(count) / 4, 1.0) + recency * 0.5
+
+    def _remove_locked(self, name):
+        """
+        Remove um comando das estruturas do índice (o lock já deve estar adquirido).
+        """
+        terms = self._terms.pop(name, None)
+        if terms is None:
+            return
+        for term in terms:
+            path = [self._trie]
+            for char in term:
+                child = path[-1].get(char)
+                if child is None:
+                    break
+                child.get("\0", set()).discard(name)
+                path.append(child)
+            # Poda os nós que ficaram vazios, do fim para o começo
+            for depth in range(len(path) - 1, 0, -1):
+                if path[depth].get("\0") or len(path[depth]) > 1:
+                    break
+                del path[depth - 1][term[depth - 1]]
+        for trigram in self._name_trigrams(name):
+            names = self._trigrams.get(trigram)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self._trigrams[trigram]
+
+    @staticmethod
+    def _extract_terms(name, description):
+        """
+        Retorna os termos indexados de um comando: o nome, suas partes e as palavras da descrição.
+        """
+        terms = {name.lower()}
+        terms.update(part for part in re.split(r"[\s/_\-.]+", name.lower()) if part)
+        terms.update(word for word in re.findall(r"\w{3,}", description.lower()))
+        return frozenset(terms)
+
+    @staticmethod
+    def _name_trigrams(text):
+        """
+        Retorna os trigramas do texto, com espaços nas bordas para valorizar o início.
+        """
+        padded = f"  {text.lower()} "
+        return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+# Histórico de comandos: arquivo somente de acréscimos, compactado ao dobrar de tamanho
+history_path = os.path.join(script_dir, "cache", "history.log")
+historyMaxEntries = 1000  # Usos mantidos em memória (e após cada compactação do arquivo)
+historyPrewarmCount = 3  # Comandos mais prováveis pré-compilados quando a interface fica ociosa
+
+
+class CommandHistory:
+    """
+    Histórico persistente dos comandos executados.
+
+    Cada uso é acrescentado ao arquivo como uma linha `<instante>\\t<comando>`. Em
+    memória ficam apenas os últimos `max_entries` usos (um buffer circular) e a
+    frecência de cada comando presente nele: a quantidade de usos com decaimento
+    exponencial pela idade, com a mesma meia-vida das sugestões. Quando o arquivo
+    passa do dobro desse limite, ele é regravado só com os usos em memória.
+    """
+    def __init__(self, path=history_path, max_entries=historyMaxEntries, half_life=completionRecencyHalfLife):
+        """
+        Inicializa o histórico vazio; os usos gravados são lidos por `load`.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.half_life = half_life
+        self._entries = deque(maxlen=max_entries)  # (instante, comando), do mais antigo ao mais recente
+        self._frecency = {}  # comando -> (pontuação, instante do último uso)
+        self._file = None
+        self._file_lines = 0
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Lê os usos gravados, ignorando linhas corrompidas, e compacta o arquivo se necessário.
+        """
+        entries = []
+        with self._lock:
+            # O lock é mantido durante a leitura (no máximo o dobro do limite de linhas)
+            # para que um uso registrado ao mesmo tempo não seja lido do arquivo em duplicidade
+            if self._file is not None:
+                self._file.flush()
+            try:
+                with open(self.path, "r", encoding="utf-8", errors="replace") as file:
+                    for line in file:
+                        timestamp, separator, command = line.rstrip("\n").partition("\t")
+                        if separator and command and timestamp.isdigit():
+                            entries.append((int(timestamp), command))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logging.warning("Histórico de comandos ignorado: %s", e)
+            self._entries.clear()
+            self._entries.extend(entries)
+            self._file_lines = len(entries)
+            self._rebuild_frecency()
+            if self._file_lines > self.max_entries * 2:
+                self._compact()
+        logging.info("%s usos carregados do histórico de comandos", len(entries))
+
+    def record(self, command, timestamp=None):
+        """
+        Registra o uso do comando na memória e no arquivo.
+        """
+        command = " ".join(command.split())  # Tabulações e quebras de linha não entram no arquivo
+        if not command:
+            return
+        timestamp = int(timestamp or time.time())
+        with self._lock:
+            self._entries.append((timestamp, command))
+            self._add_frecency(command, timestamp)
+            try:
+                if self._file is None:
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                    self._file = open(self.path, "a", encoding="utf-8")
+                self._file.write(f"{timestamp}\t{command}\n")
+                self._file.flush()
+                self._file_lines += 1
+            except OSError as e:
+                logging.warning("Não foi possível gravar o histórico de comandos: %s", e)
+            if self._file_lines > self.max_entries * 2:
+                self._compact()
+
+    def recent(self, prefix=""):
+        """
+        Retorna os comandos distintos do mais recente ao mais antigo, opcionalmente filtrados pelo prefixo.
+        """
+        with self._lock:
+            entries = list(self._entries)
+        seen = set()
+        commands = []
+        for _, command in reversed(entries):
+            if command not in seen and command.startswith(prefix):
+                seen.add(command)
+                commands.append(command)
+        return commands
+
+    def frecency(self, now=None):
+        """
+        Retorna a pontuação de frecência de cada comando, atualizada para o instante especificado.
+        """
+        now = now or time.time()
+        with self._lock:
+            return {
+                command: score * 0.5 ** (max(0.0, now - last_used) / self.half_life)
+                for command, (score, last_used) in self._frecency.items()
+            }
+
+    def usage(self):
+        """
+        Retorna os trios (comando, pontuação, último uso) para alimentar o índice de sugestões.
+        """
+        with self._lock:
+            return [(command, score, last_used) for command, (score, last_used) in self._frecency.items()]
+
+    def likely(self, after=None, limit=historyPrewarmCount):
+        """
+        Retorna os comandos mais prováveis de serem executados a seguir: primeiro os que
+        costumam vir depois de `after`, depois os de maior frecência.
+        """
+        with self._lock:
+            entries = list(self._entries)
+        followers = {}
+        if after:
+            for (_, previous), (_, command) in zip(entries, itertools.islice(entries, 1, None)):
+                if previous == after and command != after:
+                    followers[command] = followers.get(command, 0) + 1
+        ranked = sorted(followers, key=followers.get, reverse=True)
+        frecency = self.frecency()
+        ranked += [command for command in sorted(frecency, key=frecency.get, reverse=True) if command not in followers]
+        return ranked[:limit]
+
+    def close(self):
+        """
+        Fecha o arquivo do histórico.
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __len__(self):
+        """
+        Retorna a quantidade de usos em memória.
+        """
+        return len(self._entries)
+
+    def _add_frecency(self, command, timestamp):
+        """
+        Soma um uso à frecência do comando, decaindo a pontuação anterior (o lock já deve estar adquirido).
+        """
+        score, last_used = self._frecency.get(command, (0.0, timestamp))
+        decay = 0.5 ** (max(0, timestamp - last_used) / self.half_life)
+        self._frecency[command] = (score * decay + 1.0, max(timestamp, last_used))
+
+    def _rebuild_frecency(self):
+        """
+        Recalcula a frecência a partir dos usos em memória (o lock já deve estar adquirido).
+        """
+        self._frecency = {}
+        for timestamp, command in self._entries:
+            self._add_frecency(command, timestamp)
+
+    def _compact(self):
+        """
+        Regrava o arquivo apenas com os usos em memória (o lock já deve estar adquirido).
+        """
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(temporary_path, "w", encoding="utf-8") as file:
+                file.writelines(f"{timestamp}\t{command}\n" for timestamp, command in self._entries)
+            os.replace(temporary_path, self.path)
+            self._file_lines = len(self._entries)
+            self._rebuild_frecency()  # Comandos que saíram do buffer deixam de ocupar memória
+            logging.debug("Histórico de comandos compactado para %s usos", self._file_lines)
+        except OSError as e:
+            logging.warning("Não foi possível compactar o histórico de comandos: %s", e)
+
+
+# Parâmetros da execução de comandos fora da thread da interface
+jobMaxWorkers = 4  # Quantidade máxima de comandos executados em paralelo
+jobDefaultTimeout = 30.0  # Tempo limite padrão (em segundos) de um comando, contado desde o início da execução
+
+
+class JobCancelled(Exception):
+    """
+    Exceção lançada dentro de um comando que foi cancelado ou excedeu o tempo limite.
+    """
+
+
+class TkDispatcher:
+    """
+    Fila de chamadas executadas na thread do Tk.
+
+    Outras threads nunca manipulam widgets diretamente: elas enfileiram a chamada e
+    a fila é esvaziada pelo `root.after` na thread da interface, apenas quando há
+    algo pendente (sem acordar a aplicação enquanto está ociosa).
+    """
+    def __init__(self, root):
+        """
+        Inicializa a fila para a janela principal especificada.
+        """
+        self.root = root
+        self.thread_id = threading.get_ident()
+        self._queue = queue.SimpleQueue()
+        self._scheduled = False
+        self._lock = threading.Lock()
+
+    def in_tk_thread(self):
+        """
+        Indica se a chamada atual está na thread do Tk.
+        """
+        return threading.get_ident() == self.thread_id
+
+    def post(self, callback, *args):
+        """
+        Enfileira uma chamada para ser executada na thread do Tk.
+        """
+        self._queue.put((callback, args))
+        with self._lock:
+            if self._scheduled:
+                return
+            self._scheduled = True
+        try:
+            # Com o Tcl compilado com suporte a threads, o tkinter repassa o agendamento
+            # feito por outra thread para a thread do interpretador
+            self.root.after(0, self._drain)
+        except (RuntimeError, tkinter.TclError) as e:
+            logging.error(f"Erro ao agendar chamada na thread da interface: {e}")
+            with self._lock:
+                self._scheduled = False
+
+    def call(self, callback, *args, timeout=None):
+        """
+        Executa a chamada na thread do Tk e aguarda o resultado.
+        """
+        if self.in_tk_thread():
+            return callback(*args)
+        done = threading.Event()
+        outcome = {}
+
+        def run():
+            try:
+                outcome["result"] = callback(*args)
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                done.set()
+
+        self.post(run)
+        if not done.wait(timeout):
+            raise TimeoutError("A thread da interface não respondeu a tempo")
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome.get("result")
+
+    def _drain(self):
+        """
+        Executa todas as chamadas pendentes.
+        """
+        with self._lock:
+            self._scheduled = False
+        while True:
+            try:
+                callback, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except Exception as e:
+                logging.error(f"Erro ao executar chamada na thread da interface: {e}")
+
+
+# Links pedidos em sequência rápida são abertos juntos, em uma única chamada ao navegador
+browserCoalesceDelay = 0.05  # Tempo (em segundos) de espera por outros links antes de chamar o navegador
+browserCloseTimeout = 2.0  # Tempo máximo (em segundos) para abrir os links pendentes ao encerrar
+browserRateLimit = 4.0  # Links abertos por segundo, em média, quando muitos são pedidos de uma vez
+browserRateBurst = 8  # Links que podem ser abertos de uma vez antes de o limite ser aplicado
+browserMultiUrlControllers = {"Chrome", "Chromium", "Mozilla", "Firefox", "Opera", "Edge"}  # Aceitam vários links por processo
+
+
+class BrowserDispatcher:
+    """
+    Abre links no navegador a partir de uma thread própria.
+
+    O controlador do navegador é resolvido uma única vez (o `webbrowser` procura os
+    navegadores instalados na primeira chamada) e os links pedidos em sequência
+    rápida são agrupados: quando o navegador aceita vários links por chamada, todos
+    são abertos por um único processo. Um balde de fichas limita a quantidade de
+    links abertos por segundo, para que listas longas não sobrecarreguem o navegador
+    nem os sites. O resultado de cada link é entregue ao callback informado em
+    `open`, na thread do despachante.
+    """
+    def __init__(self, coalesce_delay=browserCoalesceDelay, rate=browserRateLimit, burst=browserRateBurst):
+        """
+        Inicializa o despachante; a thread só é criada no primeiro link.
+        """
+        self.coalesce_delay = coalesce_delay
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._queue = queue.SimpleQueue()
+        self._controller = None
+        self._resolve_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+    def resolve(self):
+        """
+        Retorna o controlador do navegador padrão, resolvido na primeira chamada.
+        """
+        with self._resolve_lock:
+            if self._controller is None:
+                import webbrowser  # Importado sob demanda para não atrasar a inicialização
+                self._controller = webbrowser.get()
+                logging.debug("Navegador padrão: %s", type(self._controller).__name__)
+            return self._controller
+
+    def open(self, url, callback=None):
+        """
+        Enfileira um link; `callback(url, erro)` recebe o resultado, com `erro` None em caso de sucesso.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("o despachante do navegador já foi encerrado")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="BrowserDispatcher", daemon=True)
+                self._thread.start()
+        self._queue.put((url, callback))
+
+    def close(self, timeout=browserCloseTimeout):
+        """
+        Abre os links pendentes e encerra a thread.
+        """
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def _run(self):
+        """
+        Agrupa os links recebidos dentro do intervalo de espera e os abre, respeitando o limite.
+        """
+        pending = deque()
+        stopping = False
+        while pending or not stopping:
+            if not pending:
+                item = self._queue.get()
+                if item is None:
+                    return
+                pending.append(item)
+            deadline = time.monotonic() + self.coalesce_delay
+            while not stopping:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                else:
+                    pending.append(item)
+            allowed = self._acquire(len(pending))
+            self._dispatch([pending.popleft() for _ in range(allowed)])
+
+    def _acquire(self, wanted):
+        """
+        Aguarda ao menos uma ficha e retorna quantos links podem ser abertos agora (até `wanted`).
+        """
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+            self._refilled_at = now
+            if self._tokens >= 1:
+                allowed = min(wanted, int(self._tokens))
+                self._tokens -= allowed
+                return allowed
+            time.sleep((1 - self._tokens) / self.rate)
+
+    def _dispatch(self, batch):
+        """
+        Abre os links do grupo (sem repetições) e entrega o resultado de cada um.
+        """
+        urls = list(dict.fromkeys(url for url, _ in batch))
+        try:
+            errors = self._launch(self.resolve(), urls)
+        except Exception as e:
+            errors = dict.fromkeys(urls, e)
+        for url, callback in batch:
+            error = errors.get(url)
+            if error is not None:
+                logging.warning("Não foi possível abrir o link %s: %s", url, error)
+            if callback is None:
+                continue
+            try:
+                callback(url, error)
+            except Exception as e:
+                logging.error(f"Erro ao informar o resultado do link: {e}")
+
+    @staticmethod
+    def _launch(controller, urls):
+        """
+        Abre os links com o controlador e retorna os erros, por link.
+        """
+        executable = getattr(controller, "name", None)
+        if len(urls) > 1 and executable and type(controller).__name__ in browserMultiUrlControllers:
+            try:
+                subprocess.Popen(
+                    [executable, *urls], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL, start_new_session=True
+                )
+                logging.debug("%d links abertos em uma única chamada ao navegador", len(urls))
+                return {}
+            except OSError as e:
+                logging.warning("Não foi possível abrir os links juntos, abrindo um por vez: %s", e)
+        errors = {}
+        for url in urls:
+            try:
+                if not controller.open(url):
+                    errors[url] = RuntimeError("o navegador não abriu o link")
+            except Exception as e:
+                errors[url] = e
+        return errors
+
+
+# Atalhos globais do teclado
+hotkeyToggle = "ctrl+capslock"  # Atalho que mostra e esconde a janela
+hotkeyDebounce = 0.3  # Intervalo (em segundos) em que repetições do mesmo atalho são descartadas
+
+# Ação associada a um atalho global: nome (para o log e as métricas), função executada na thread do Tk,
+# grupo (ex.: "comandos", substituído por inteiro a cada sincronização) e handle do `keyboard`
+HotkeyBinding = namedtuple("HotkeyBinding", ["action", "callback", "group", "handle"])
+
+
+class HotkeyDispatcher:
+    """
+    Atalhos globais do teclado, executados na thread do Tk.
+
+    O `keyboard` chama os atalhos a partir da thread do seu hook; ali apenas o instante
+    do disparo é registrado e a ação é enfileirada no TkDispatcher. Disparos repetidos
+    (tecla segurada ou pressionada duas vezes seguidas) dentro de `debounce` segundos,
+    ou enquanto o anterior ainda está na fila, são descartados. A latência entre o
+    disparo e o fim da ação é registrada por atalho.
+    """
+    def __init__(self, dispatcher, metrics, debounce=hotkeyDebounce):
+        """
+        Inicializa os atalhos; eles só são registrados no teclado por `start`.
+        """
+        self.dispatcher = dispatcher
+        self.metrics = metrics
+        self.debounce = debounce
+        self._bindings = {}  # atalho -> HotkeyBinding
+        self._last = {}  # atalho -> instante do último disparo aceito
+        self._pending = set()  # Atalhos enfileirados que ainda não foram executados
+        self._lock = threading.Lock()
+        self._keyboard = None
+
+    def start(self):
+        """
+        Importa o `keyboard` e registra os atalhos associados até aqui.
+        """
+        import keyboard  # Importado sob demanda; o hook do teclado não é necessário para exibir a janela
+        with self._lock:
+            self._keyboard = keyboard
+            for hotkey, binding in list(self._bindings.items()):
+                handle = self._register(hotkey)
+                if handle is None:
+                    del self._bindings[hotkey]
+                else:
+                    self._bindings[hotkey] = binding._replace(handle=handle)
+
+    def stop(self):
+        """
+        Remove todos os atalhos do teclado.
+        """
+        with self._lock:
+            for hotkey in list(self._bindings):
+                self._unbind(hotkey)
+
+    def bind(self, hotkey, action, callback, group=None):
+        """
+        Associa o atalho à ação; `callback(requested_at)` é executado na thread do Tk.
+        """
+        with self._lock:
+            self._bind(hotkey.strip().lower(), action, callback, group)
+
+    def replace(self, group, bindings):
+        """
+        Substitui os atalhos do grupo pelos de `bindings` (atalho -> (ação, callback)).
+        Atalhos já usados fora do grupo são mantidos e os novos repetidos são ignorados.
+        """
+        bindings = {hotkey.strip().lower(): value for hotkey, value in bindings.items()}
+        with self._lock:
+            for hotkey, binding in list(self._bindings.items()):
+                if binding.group == group and hotkey not in bindings:
+                    self._unbind(hotkey)
+            for hotkey, (action, callback) in bindings.items():
+                binding = self._bindings.get(hotkey)
+                if binding is not None and binding.group != group:
+                    logging.warning("Atalho %s de %s ignorado: já usado por %s", hotkey, action, binding.action)
+                elif binding is None or binding.action != action:
+                    self._bind(hotkey, action, callback, group)
+
+    def unbind(self, hotkey):
+        """
+        Remove o atalho especificado.
+        """
+        with self._lock:
+            self._unbind(hotkey.strip().lower())
+
+    def bindings(self):
+        """
+        Retorna os pares (atalho, ação) registrados.
+        """
+        with self._lock:
+            return sorted((hotkey, binding.action) for hotkey, binding in self._bindings.items())
+
+    def _bind(self, hotkey, action, callback, group):
+        """
+        Substitui a ação do atalho (chamado com o lock).
+        """
+        self._unbind(hotkey)
+        handle = None
+        if self._keyboard is not None:
+            handle = self._register(hotkey)
+            if handle is None:
+                return
+        self._bindings[hotkey] = HotkeyBinding(action, callback, group, handle)
+        logging.info("Atalho global %s associado a %s", hotkey, action)
+
+    def _register(self, hotkey):
+        """
+        Registra o atalho no `keyboard` (chamado com o lock) e retorna o handle para removê-lo (ou None).
+        """
+        try:
+            return self._keyboard.add_hotkey(hotkey, self._on_hotkey, args=(hotkey,))
+        except ValueError as e:
+            logging.error(f"Atalho global inválido '{hotkey}': {e}")
+            return None
+
+    def _unbind(self, hotkey):
+        """
+        Remove o atalho do `keyboard` e da tabela (chamado com o lock).
+        """
+        binding = self._bindings.pop(hotkey, None)
+        if binding is not None and binding.handle is not None:
+            try:
+                self._keyboard.remove_hotkey(binding.handle)
+            except (KeyError, ValueError) as e:
+                logging.debug("Atalho %s já removido: %s", hotkey, e)
+
+    def _on_hotkey(self, hotkey):
+        """
+        Recebe o disparo na thread do hook do teclado e o enfileira para a thread do Tk.
+        """
+        now = time.perf_counter()
+        with self._lock:
+            if hotkey in self._pending or now - self._last.get(hotkey, -math.inf) < self.debounce:
+                logging.debug("Disparo repetido do atalho %s descartado", hotkey)
+                return
+            self._last[hotkey] = now
+            self._pending.add(hotkey)
+        self.dispatcher.post(self._fire, hotkey, now)
+
+    def _fire(self, hotkey, requested_at):
+        """
+        Executa a ação do atalho na thread do Tk e registra a latência.
+        """
+        with self._lock:
+            self._pending.discard(hotkey)
+            binding = self._bindings.get(hotkey)
+        if binding is None:
+            return
+        queued = time.perf_counter() - requested_at
+        try:
+            result = binding.callback(requested_at)
+        except Exception as e:
+            logging.error(f"Erro ao executar o atalho {hotkey} ({binding.action}): {e}")
+            self._observe(hotkey, binding.action, requested_at, queued, True)
+            return
+        if isinstance(result, CommandJob):
+            # Arquivos de comando rodam no pool; a latência é medida quando o job termina
+            on_done = result.on_done
+
+            def finish(job):
+                try:
+                    if on_done:
+                        on_done(job)
+                finally:
+                    self._observe(hotkey, binding.action, requested_at, queued, job.state != "done")
+
+            result.on_done = finish
+            return
+        self._observe(hotkey, binding.action, requested_at, queued, False)
+
+    def _observe(self, hotkey, action, requested_at, queued, error):
+        """
+        Registra o tempo entre o pressionamento do atalho e o fim da sua ação.
+        """
+        elapsed = time.perf_counter() - requested_at
+        self.metrics.observe("launcher_hotkey_seconds", elapsed, error, hotkey=hotkey, action=action)
+        logging.info(
+            "Atalho %s (%s): %.1f ms até o fim da ação, %.1f ms na fila", hotkey, action, elapsed * 1000, queued * 1000
+        )
+
+
+class CommandJob:
+    """
+    Representa a execução de um comando no pool de threads.
+    """
+    _ids = itertools.count(1)
+
+    def __init__(self, name, timeout=None):
+        """
+        Inicializa o job com o nome do comando e o tempo limite.
+        """
+        self.id = next(self._ids)
+        self.name = name
+        self.timeout = timeout
+        self.state = "queued"  # queued, running, done, failed, cancelled, timeout
+        self.result = None
+        self.error = None
+        self.submitted_at = time.perf_counter()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self.future = None
+        self.thread_id = None
+        self.timer_id = None
+        self.on_done = None
+
+    @property
+    def elapsed(self):
+        """
+        Retorna o tempo de execução do job em segundos.
+        """
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    def check_cancelled(self):
+        """
+        Lança JobCancelled se o job foi cancelado.
+        """
+        if self.cancel_event.is_set():
+            raise JobCancelled(self.name)
+
+
+jobPlainTypes = (str, int, float, bool, bytes, type(None))  # Valores entregues aos comandos sem proxy
+
+
+class TkObjectProxy:
+    """
+    Substituto de um objeto da interface (janela, campo, rótulo...) entregue aos comandos.
+
+    Atributos e chamadas de métodos são resolvidos na thread do Tk; apenas valores
+    simples (texto, números, booleanos e None) chegam ao comando diretamente, os
+    demais objetos continuam protegidos por um proxy.
+    """
+    def __init__(self, target, dispatcher, job):
+        """
+        Inicializa o proxy para o objeto especificado.
+        """
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_dispatcher", dispatcher)
+        object.__setattr__(self, "_job", job)
+
+    @staticmethod
+    def wrap(value, dispatcher, job):
+        """
+        Retorna o valor como está, se for simples, ou protegido por um proxy.
+        """
+        if isinstance(value, jobPlainTypes):
+            return value
+        if isinstance(value, tuple):
+            return tuple(TkObjectProxy.wrap(item, dispatcher, job) for item in value)
+        if callable(value):
+            def call_in_tk_thread(*args, **kwargs):
+                job.check_cancelled()
+                return TkObjectProxy.wrap(dispatcher.call(lambda: value(*args, **kwargs)), dispatcher, job)
+
+            return call_in_tk_thread
+        return TkObjectProxy(value, dispatcher, job)
+
+    def __getattr__(self, name):
+        """
+        Obtém o atributo do objeto na thread do Tk.
+        """
+        self._job.check_cancelled()
+        value = self._dispatcher.call(getattr, self._target, name)
+        return self.wrap(value, self._dispatcher, self._job)
+
+    def __setattr__(self, name, value):
+        """
+        Define o atributo do objeto na thread do Tk.
+        """
+        self._job.check_cancelled()
+        self._dispatcher.call(setattr, self._target, name, value)
+
+    def __getitem__(self, key):
+        """
+        Lê um item (por exemplo, uma opção do widget) na thread do Tk.
+        """
+        self._job.check_cancelled()
+        value = self._dispatcher.call(lambda: self._target[key])
+        return self.wrap(value, self._dispatcher, self._job)
+
+    def __setitem__(self, key, value):
+        """
+        Altera um item na thread do Tk.
+        """
+        self._job.check_cancelled()
+        self._dispatcher.call(self._target.__setitem__, key, value)
+
+    def __repr__(self):
+        """
+        Representa o objeto protegido.
+        """
+        return f"<TkObjectProxy {self._target!r}>"
+
+
+class JobAppProxy:
+    """
+    Substituto do `app` entregue aos comandos executados fora da thread da interface.
+
+    Chamadas de métodos são repassadas para a thread do Tk e aguardam o resultado;
+    widgets e outros objetos do app são entregues dentro de um TkObjectProxy. O atributo `hideWindowAfterCommand` é mantido no próprio job, para que comandos
+    executados em paralelo não interfiram uns nos outros.
+    """
+    _local_attributes = {"hideWindowAfterCommand"}
+
+    def __init__(self, app, dispatcher, job):
+        """
+        Inicializa o proxy para o job especificado.
+        """
+        object.__setattr__(self, "_app", app)
+        object.__setattr__(self, "_dispatcher", dispatcher)
+        object.__setattr__(self, "_job", job)
+        object.__setattr__(self, "hideWindowAfterCommand", True)
+
+    def __getattr__(self, name):
+        """
+        Obtém um atributo do app; métodos são executados na thread do Tk.
+        """
+        self._job.check_cancelled()
+        return TkObjectProxy.wrap(getattr(self._app, name), self._dispatcher, self._job)
+
+    def __setattr__(self, name, value):
+        """
+        Define um atributo do app na thread do Tk (ou no próprio job, se for local).
+        """
+        self._job.check_cancelled()
+        if name in self._local_attributes:
+            object.__setattr__(self, name, value)
+        else:
+            self._dispatcher.call(setattr, self._app, name, value)
+
+
+class JobScheduler:
+    """
+    Executa comandos em um pool limitado de threads, fora da thread da interface.
+
+    Os resultados são entregues na thread do Tk pelo TkDispatcher. Cada job pode ter
+    um tempo limite e pode ser cancelado; o cancelamento é sinalizado ao comando na
+    próxima chamada ao `app` e também injetado como exceção na thread que o executa.
+    """
+    def __init__(self, dispatcher, max_workers=jobMaxWorkers):
+        """
+        Inicializa o pool de threads.
+        """
+        self.dispatcher = dispatcher
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="CommandJob"
+        )
+        self.active = {}  # id -> CommandJob
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def submit(self, name, function, timeout=jobDefaultTimeout, on_done=None):
+        """
+        Envia um job para o pool; `function(job)` roda no pool e `on_done(job)` na thread do Tk.
+        """
+        job = CommandJob(name, timeout)
+        job.on_done = on_done
+        self.active[job.id] = job
+        job.future = self.executor.submit(self._run, job, function)
+        logging.info("Comando '%s' enviado para execução (job %s)", name, job.id)
+        self._notify()
+        return job
+
+    def cancel(self, job, reason="cancelled"):
+        """
+        Cancela um job em andamento.
+        """
+        if job.id not in self.active or job.cancel_event.is_set():
+            return
+        logging.warning("Cancelando comando '%s' (job %s): %s", job.name, job.id, reason)
+        job.state = reason
+        job.cancel_event.set()
+        if job.future.cancel():
+            # O job ainda estava na fila e não chegou a rodar
+            self._finish(job)
+            return
+        with self._lock:
+            if job.thread_id is not None:
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                    ctypes.c_ulong(job.thread_id), ctypes.py_object(JobCancelled)
+                )
+
+    def cancel_all(self):
+        """
+        Cancela todos os jobs em andamento.
+        """
+        for job in list(self.active.values()):
+            self.cancel(job)
+
+    def add_listener(self, callback):
+        """
+        Registra um callback chamado na thread do Tk sempre que a lista de jobs muda.
+        """
+        self._listeners.append(callback)
+
+    def shutdown(self):
+        """
+        Cancela os jobs pendentes e encerra o pool sem aguardar.
+        """
+        self.cancel_all()
+        self.executor.shutdown(wait=False)
+
+    def _run(self, job, function):
+        """
+        Executa o job em uma thread do pool.
+        """
+        try:
+            try:
+                with self._lock:
+                    job.check_cancelled()
+                    job.thread_id = threading.get_ident()
+                job.state = "running"
+                job.started_at = time.perf_counter()
+                if job.timeout:
+                    # O tempo na fila, com todas as threads ocupadas, não conta para o limite
+                    self.dispatcher.post(self._start_timer, job)
+                job.result = function(job)
+            finally:
+                with self._lock:
+                    job.thread_id = None
+            if not job.cancel_event.is_set():
+                job.state = "done"
+        except JobCancelled:
+            pass
+        except Exception as e:
+            job.state = "failed"
+            job.error = e
+        job.finished_at = time.perf_counter()
+        self.dispatcher.post(self._finish, job)
+
+    def _start_timer(self, job):
+        """
+        Agenda, na thread do Tk, o cancelamento do job ao atingir o tempo limite.
+        """
+        if job.id in self.active and not job.cancel_event.is_set():
+            job.timer_id = self.dispatcher.root.after(int(job.timeout * 1000), self.cancel, job, "timeout")
+
+    def _finish(self, job):
+        """
+        Conclui o job na thread do Tk.
+        """
+        if self.active.pop(job.id, None) is None:
+            return
+        if job.timer_id is not None:
+            try:
+                self.dispatcher.root.after_cancel(job.timer_id)
+            except tkinter.TclError:
+                pass
+        logging.info("Comando '%s' (job %s) terminou como %s em %.3fs", job.name, job.id, job.state, job.elapsed)
+        if job.on_done:
+            try:
+                job.on_done(job)
+            except Exception as e:
+                logging.error(f"Erro ao concluir o comando '{job.name}': {e}")
+        self._notify()
+
+    def _notify(self):
+        """
+        Avisa os ouvintes que a lista de jobs mudou.
+        """
+        for listener in list(self._listeners):
+            try:
+                listener(list(self.active.values()))
+            except Exception as e:
+                logging.error(f"Erro ao notificar jobs em andamento: {e}")
+
+
+# Isolamento de comandos em processos separados, reaproveitados entre execuções
+commandIsolationModes = ("thread", "processo")
+commandIsolation = os.environ.get("LAUNCHER_ISOLATION", "thread").strip().lower()  # Modo padrão dos comandos
+processPoolSize = 2  # Quantidade de processos mantidos prontos para executar comandos isolados
+processWorkerMaxRuns = 50  # Execuções após as quais o processo é substituído por um novo
+processWorkerMaxMemory = 256 * 1024 * 1024  # Memória (em bytes) acima da qual o processo é substituído
+processPollInterval = 0.1  # Intervalo (em segundos) entre as verificações de cancelamento durante a execução
+processStopTimeout = 1.0  # Tempo máximo (em segundos) para um processo encerrar antes de ser finalizado
+
+
+def process_memory():
+    """
+    Retorna a memória residente do processo atual em bytes (ou None, se não for possível obtê-la).
+    """
+    try:
+        if sys.platform == "win32":
+            class ProcessMemoryCounters(ctypes.Structure):
+                _fields_ = [
+                    ("cb", ctypes.c_ulong), ("PageFaultCount", ctypes.c_ulong),
+                    ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+            counters = ProcessMemoryCounters()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if not ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return None
+            return counters.WorkingSetSize
+        with open("/proc/self/statm", "r", encoding="ascii") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class WorkerAppProxy:
+    """
+    Substituto do `app` dentro de um processo de comando isolado.
+
+    Atributos e chamadas de métodos são enviados ao launcher pela conexão do
+    processo e resolvidos lá pelo JobAppProxy do job; por isso os argumentos e os
+    resultados precisam ser serializáveis (callbacks não podem ser passados).
+    """
+    def __init__(self, connection):
+        """
+        Inicializa o proxy para a conexão com o launcher.
+        """
+        object.__setattr__(self, "_connection", connection)
+
+    def __getattr__(self, name):
+        """
+        Obtém um atributo do app; métodos retornam uma função que os executa no launcher.
+        """
+        if name.startswith("__"):
+            raise AttributeError(name)
+        reply = self._request(("getattr", name))
+        if reply is not WorkerAppProxy:
+            return reply
+
+        def call_in_launcher(*args, **kwargs):
+            return self._request(("call", name, args, kwargs))
+
+        return call_in_launcher
+
+    def __setattr__(self, name, value):
+        """
+        Define um atributo do app no launcher.
+        """
+        self._request(("setattr", name, value))
+
+    def _request(self, message):
+        """
+        Envia um pedido ao launcher e aguarda a resposta.
+        """
+        self._connection.send(message)
+        kind, value = self._connection.recv()
+        if kind == "raise":
+            raise value
+        if kind == "method":
+            return WorkerAppProxy
+        return value
+
+
+def process_worker_main(connection, log_records):
+    """
+    Laço de um processo de comandos: recebe os caminhos dos arquivos e os executa.
+    Os registros de log seguem pela fila `log_records` para o launcher, que os grava.
+    """
+    root_logger = logging.getLogger()
+    root_logger.handlers = [logging.handlers.QueueHandler(log_records)]
+    root_logger.setLevel(defaultLogLevel)
+    code_cache = CompiledCodeCache(disk_dir=bytecode_cache_dir if useBytecodeCache else None)
+    while True:
+        try:
+            message = connection.recv()
+        except (EOFError, OSError):
+            return
+        if message[0] != "run":
+            return
+        _, path, command, level = message
+        root_logger.setLevel(level)  # Acompanha o nível alterado com o comando "log"
+        proxy = WorkerAppProxy(connection)
+        try:
+            code = code_cache.get(path)
+            exec(code, command_namespace(app=proxy, self=proxy, command=command, __file__=path))
+            connection.send(("done", None, process_memory()))
+        except Exception as e:
+            connection.send(("error", (f"{type(e).__name__}: {e}", traceback.format_exc()), process_memory()))
+
+
+class ProcessWorker:
+    """
+    Processo reutilizável que executa arquivos de comando isolados do launcher.
+    """
+    def __init__(self, context, log_records):
+        """
+        Inicia o processo; ele importa este módulo uma única vez e aguarda comandos.
+        """
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=process_worker_main, args=(child_connection, log_records), name="CommandWorker", daemon=True
+        )
+        self.process.start()
+        child_connection.close()
+        self.runs = 0
+        self.memory = None
+
+    def stop(self):
+        """
+        Pede ao processo que encerre e o finaliza se ele não responder.
+        """
+        try:
+            self.connection.send(("stop",))
+        except (OSError, ValueError):
+            pass
+        self.process.join(processStopTimeout)
+        self.kill()
+
+    def kill(self):
+        """
+        Finaliza o processo imediatamente.
+        """
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(processStopTimeout)
+        self.connection.close()
+
+
+class ProcessLogForwarder(logging.Handler):
+    """
+    Entrega aos loggers do launcher os registros recebidos dos processos de comandos.
+
+    Os registros passam pelos mesmos manipuladores das mensagens do próprio launcher
+    (a fila gravada em log/main.log na interface, o stderr no modo em lote).
+    """
+    def emit(self, record):
+        """
+        Repassa o registro ao logger de mesmo nome.
+        """
+        logging.getLogger(record.name).handle(record)
+
+
+class ProcessPool:
+    """
+    Conjunto de processos pré-iniciados que executam comandos isolados.
+
+    Um comando isolado não disputa o GIL com a interface e, se travar, vazar
+    memória ou encerrar o processo, não afeta o launcher. As chamadas ao `app`
+    feitas pelo comando voltam pela conexão do processo e são executadas pelo
+    JobAppProxy do job. Cada processo é substituído após `max_runs` execuções,
+    ao passar de `max_memory` bytes ou quando o job é cancelado.
+    """
+    def __init__(self, size=processPoolSize, max_runs=processWorkerMaxRuns, max_memory=processWorkerMaxMemory):
+        """
+        Inicializa o conjunto; os processos são criados por `start` ou no primeiro comando.
+        """
+        self.size = size
+        self.max_runs = max_runs
+        self.max_memory = max_memory
+        # "spawn" em todas as plataformas: copiar (fork) um processo com o Tk e várias threads não é seguro
+        self._context = multiprocessing.get_context("spawn")
+        self._idle = queue.Queue()
+        self._workers = set()
+        self._log_records = None  # Fila (entre processos) dos registros de log dos comandos isolados
+        self._log_listener = None
+        self._lock = threading.Lock()
+        self._stopped = False
+
+    def start(self):
+        """
+        Inicia os processos que ainda faltam para completar o conjunto.
+        """
+        while True:
+            with self._lock:
+                if self._stopped or len(self._workers) >= self.size:
+                    return
+                if self._log_listener is None:
+                    self._log_records = self._context.Queue()
+                    self._log_listener = logging.handlers.QueueListener(self._log_records, ProcessLogForwarder())
+                    self._log_listener.start()
+                worker = ProcessWorker(self._context, self._log_records)
+                self._workers.add(worker)
+            self._idle.put(worker)
+
+    def stop(self):
+        """
+        Encerra todos os processos.
+        """
+        with self._lock:
+            self._stopped = True
+            workers = list(self._workers)
+            self._workers.clear()
+            log_listener, self._log_listener = self._log_listener, None
+        for worker in workers:
+            worker.stop()
+        if log_listener is not None:
+            # Grava o que os processos ainda enviaram antes de encerrar
+            log_listener.stop()
+
+    def run(self, job, path, command, proxy):
+        """
+        Executa o arquivo de comando em um processo do conjunto, atendendo às chamadas ao `app`.
+        Deve ser chamado por uma thread do JobScheduler; retorna o proxy do job.
+        """
+        worker = self._acquire(job)
+        healthy = False
+        try:
+            worker.connection.send(("run", path, command, logging.getLogger().getEffectiveLevel()))
+            while True:
+                if not worker.connection.poll(processPollInterval):
+                    job.check_cancelled()
+                    if not worker.process.is_alive():
+                        raise RuntimeError(
+                            f"o processo do comando terminou inesperadamente (código {worker.process.exitcode})"
+                        )
+                    continue
+                try:
+                    message = worker.connection.recv()
+                except EOFError:
+                    worker.process.join(processStopTimeout)
+                    raise RuntimeError(
+                        f"o processo do comando terminou inesperadamente (código {worker.process.exitcode})"
+                    ) from None
+                if message[0] in ("done", "error"):
+                    healthy = True
+                    worker.runs += 1
+                    worker.memory = message[2]
+                    if message[0] == "error":
+                        error, details = message[1]
+                        logging.error(f"Erro no comando isolado '{command}':\n{details}")
+                        raise RuntimeError(error)
+                    return proxy
+                self._answer(worker, proxy, message)
+        finally:
+            self._release(worker, healthy)
+
+    def _answer(self, worker, proxy, message):
+        """
+        Atende a um pedido do processo (atributo, chamada de método ou atribuição) usando o proxy do job.
+        """
+        try:
+            if message[0] == "getattr":
+                value = getattr(proxy, message[1])
+                reply = ("method", None) if callable(value) else ("return", value)
+            elif message[0] == "call":
+                _, name, args, kwargs = message
+                reply = ("return", getattr(proxy, name)(*args, **kwargs))
+            else:
+                setattr(proxy, message[1], message[2])
+                reply = ("return", None)
+        except JobCancelled:
+            raise
+        except Exception as e:
+            reply = ("raise", e)
+        try:
+            worker.connection.send(reply)
+        except (TypeError, AttributeError, pickle.PicklingError) as e:
+            # Resultados que não podem ser enviados (ex.: widgets) chegam ao comando como None
+            logging.debug("Resultado de '%s' não enviado ao comando isolado: %s", message[1], e)
+            worker.connection.send(("return", None) if reply[0] == "return" else ("raise", RuntimeError(str(reply[1]))))
+
+    def _acquire(self, job):
+        """
+        Aguarda um processo livre, verificando o cancelamento do job.
+        """
+        self.start()
+        while True:
+            job.check_cancelled()
+            try:
+                return self._idle.get(timeout=processPollInterval)
+            except queue.Empty:
+                continue
+
+    def _release(self, worker, healthy):
+        """
+        Devolve o processo ao conjunto ou o substitui, se ele falhou ou atingiu os limites.
+        """
+        recycle = not healthy or worker.runs >= self.max_runs or (
+            worker.memory is not None and worker.memory > self.max_memory
+        )
+        if not recycle:
+            self._idle.put(worker)
+            return
+        logging.info(
+            "Substituindo processo de comandos após %d execuções (%s bytes)", worker.runs, worker.memory
+        )
+        with self._lock:
+            self._workers.discard(worker)
+        # O processo saudável encerra sozinho; um interrompido no meio do comando é finalizado
+        threading.Thread(target=worker.stop if healthy else worker.kill, daemon=True).start()
+        threading.Thread(target=self.start, name="ProcessPoolRefill", daemon=True).start()
+
+
+class EventBindingManager:
+    """
+    Gerencia os manipuladores de eventos de um widget.
+
+    Cada sequência recebe um único bind no Tk, que despacha para os manipuladores
+    registrados por nome. Registrar novamente o mesmo nome substitui o manipulador
+    anterior, de modo que eles não se acumulam ao longo da sessão.
+    """
+    def __init__(self, widget):
+        """
+        Inicializa o gerenciador para o widget especificado.
+        """
+        self.widget = widget
+        self._handlers = {}  # sequência -> OrderedDict(nome -> (manipulador, executar uma única vez))
+
+    def bind(self, sequence, name, handler, once=False):
+        """
+        Registra (ou substitui) um manipulador nomeado para a sequência.
+        """
+        handlers = self._handlers.get(sequence)
+        if handlers is None:
+            handlers = self._handlers[sequence] = OrderedDict()
+            self.widget.bind(sequence, lambda event: self._dispatch(sequence, event), add="+")
+        handlers[name] = (handler, once)
+        logging.debug("Manipulador '%s' registrado em %s (%s ativos)", name, sequence, self.count())
+
+    def unbind(self, sequence, name=None):
+        """
+        Remove um manipulador nomeado, ou todos os manipuladores da sequência.
+        """
+        handlers = self._handlers.get(sequence)
+        if not handlers:
+            return
+        if name is None:
+            handlers.clear()
+        else:
+            handlers.pop(name, None)
+
+    def clear(self):
+        """
+        Remove todos os manipuladores e os binds criados no widget.
+        """
+        for sequence in self._handlers:
+            try:
+                self.widget.unbind(sequence)
+            except tkinter.TclError:
+                pass
+        self._handlers.clear()
+
+    def count(self, sequence=None):
+        """
+        Retorna a quantidade de manipuladores ativos (em uma sequência ou no total).
+        """
+        if sequence is not None:
+            return len(self._handlers.get(sequence, ()))
+        return sum(len(handlers) for handlers in self._handlers.values())
+
+    def _dispatch(self, sequence, event):
+        """
+        Chama os manipuladores da sequência, na ordem em que foram registrados.
+        """
+        handlers = self._handlers.get(sequence)
+        if not handlers:
+            return None
+        for name, (handler, once) in list(handlers.items()):
+            # Um manipulador anterior pode ter removido ou substituído este
+            if handlers.get(name) != (handler, once):
+                continue
+            if once:
+                del handlers[name]
+            if handler(event) == "break":
+                return "break"
+        return None
+
+
+# Seções obrigatórias de um tema e as opções de cor reaplicadas em cada tipo de widget
+themeRequiredSections = ("CTk", "CTkToplevel", "CTkFrame", "CTkButton", "CTkLabel", "CTkEntry", "CTkFont")
+themeWidgetOptions = {
+    "CTk": ("fg_color",),
+    "CTkToplevel": ("fg_color",),
+    "CTkFrame": ("fg_color", "border_color"),
+    "CTkButton": ("fg_color", "hover_color", "border_color", "text_color", "text_color_disabled"),
+    "CTkLabel": ("fg_color", "text_color"),
+    "CTkEntry": ("fg_color", "border_color", "text_color", "placeholder_text_color"),
+}
+
+
+class ThemeCache:
+    """
+    Cache em memória dos temas disponíveis, já lidos e validados.
+
+    Os temas padrões do customtkinter, o tema do aplicativo e os temas personalizados
+    são lidos uma única vez; os arquivos do diretório de temas são relidos apenas
+    quando mudam, avisados por um DirectoryWatcher.
+    """
+    def __init__(self, default_path=theme_path, custom_dir=theme_dir):
+        """
+        Inicializa o cache com o tema padrão e o diretório de temas personalizados.
+        """
+        self.default_path = default_path
+        self.custom_dir = custom_dir
+        self._themes = {}  # nome -> (origem, tema)
+        self._custom = {}  # nome -> mtime do arquivo
+        self._lock = threading.Lock()
+        self.watcher = None
+
+    def load_all(self):
+        """
+        Lê e valida todos os temas disponíveis.
+        """
+        builtin_dir = os.path.join(os.path.dirname(customtkinter.__file__), "assets", "themes")
+        for name in ThemeManager._built_in_themes:
+            self._load(name, os.path.join(builtin_dir, f"{name}.json"), source=name)
+        self._load("theme", self.default_path)
+        self._scan_custom()
+        logging.info("%s temas carregados no cache", len(self._themes))
+
+    def start_watching(self):
+        """
+        Passa a monitorar o diretório de temas personalizados.
+        """
+        self.watcher = DirectoryWatcher(lambda path: self._scan_custom())
+        self.watcher.start([self.custom_dir])
+
+    def stop(self):
+        """
+        Encerra o monitoramento do diretório de temas.
+        """
+        if self.watcher:
+            self.watcher.stop()
+
+    def get(self, name):
+        """
+        Retorna a origem e o tema já processado; lança KeyError se ele não existir.
+        """
+        with self._lock:
+            return self._themes[name]
+
+    def custom_names(self):
+        """
+        Retorna os nomes dos temas personalizados válidos.
+        """
+        with self._lock:
+            return sorted(self._custom)
+
+    def _scan_custom(self):
+        """
+        Relê apenas os temas personalizados novos ou alterados e descarta os removidos.
+        """
+        found = {}
+        try:
+            with os.scandir(self.custom_dir) as iterator:
+                for dir_entry in iterator:
+                    if dir_entry.name.endswith(".json") and dir_entry.is_file():
+                        found[dir_entry.name[:-len(".json")]] = (dir_entry.path, dir_entry.stat().st_mtime_ns)
+        except FileNotFoundError:
+            pass
+
+        with self._lock:
+            removed = [name for name in self._custom if name not in found]
+            for name in removed:
+                del self._custom[name]
+                self._themes.pop(name, None)
+        for name, (path, mtime_ns) in found.items():
+            if self._custom.get(name) == mtime_ns:
+                continue
+            if name in ThemeManager._built_in_themes or name == "theme":
+                logging.warning("Tema personalizado '%s' ignorado: nome reservado", name)
+                continue
+            if self._load(name, path):
+                with self._lock:
+                    self._custom[name] = mtime_ns
+
+    def _load(self, name, path, source=None):
+        """
+        Lê, valida e normaliza um tema para a plataforma atual.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                theme = json.load(file)
+            self.validate(theme)
+        except Exception as e:
+            logging.error(f"Tema '{name}' ignorado ({path}): {e}")
+            return False
+
+        # Mesmos ajustes feitos por ThemeManager.load_theme
+        for key, value in theme.items():
+            if isinstance(value, dict) and "macOS" in value:
+                if sys.platform == "darwin":
+                    theme[key] = value["macOS"]
+                elif sys.platform.startswith("win"):
+                    theme[key] = value["Windows"]
+                else:
+                    theme[key] = value["Linux"]
+        if "CTkCheckbox" in theme:
+            theme["CTkCheckBox"] = theme.pop("CTkCheckbox")
+        if "CTkRadiobutton" in theme:
+            theme["CTkRadioButton"] = theme.pop("CTkRadiobutton")
+        theme["CTkLabel"].setdefault("border_width", 0)
+        theme["CTkLabel"].setdefault("border_color", ["black", "white"])
+
+        with self._lock:
+            self._themes[name] = (source or path, theme)
+        return True
+
+    @staticmethod
+    def validate(theme):
+        """
+        Verifica se o tema possui as seções e cores usadas pela interface.
+        """
+        if not isinstance(theme, dict):
+            raise ValueError("o tema deve ser um objeto JSON")
+        for section in themeRequiredSections:
+            if not isinstance(theme.get(section), dict):
+                raise ValueError(f"seção '{section}' ausente")
+        for section, options in themeWidgetOptions.items():
+            missing = [option for option in options if option not in theme[section]]
+            if missing:
+                raise ValueError(f"opções ausentes em '{section}': {', '.join(missing)}")
+
+
+class AttachedPopup:
+    """
+    Mantém uma janela secundária ancorada à janela principal.
+
+    A posição é recalculada apenas quando a janela principal gera eventos
+    <Configure> (movida ou redimensionada) ou <Map>, sem nenhum temporizador;
+    enquanto nada muda, o launcher não acorda.
+    """
+    _ids = itertools.count(1)
+
+    def __init__(self, root, root_bindings, popup, position, follow_visibility=True):
+        """
+        Ancora `popup` à janela principal; `position(root)` retorna as coordenadas (x, y) da janela.
+        """
+        self.root = root
+        self.root_bindings = root_bindings
+        self.popup = popup
+        self.position = position
+        self.follow_visibility = follow_visibility
+        self.name = f"attached-popup-{next(self._ids)}"
+        self._last_geometry = None
+
+        self.root_bindings.bind("<Configure>", self.name, self._on_root_configure)
+        self.root_bindings.bind("<Map>", self.name, self._on_root_map)
+        if self.follow_visibility:
+            self.root_bindings.bind("<Unmap>", self.name, self._on_root_unmap)
+        self.popup.bind("<Destroy>", self._on_popup_destroy, add="+")
+        self.reposition()
+
+    def reposition(self):
+        """
+        Move a janela secundária para a posição calculada, se ela mudou.
+        """
+        try:
+            x, y = self.position(self.root)
+            geometry = f"+{x}+{y}"
+            if geometry != self._last_geometry:
+                self.popup.geometry(geometry)
+                self._last_geometry = geometry
+        except tkinter.TclError as e:
+            logging.debug("Não foi possível reposicionar %s: %s", self.name, e)
+
+    def detach(self):
+        """
+        Remove os manipuladores registrados na janela principal.
+        """
+        for sequence in ("<Configure>", "<Map>", "<Unmap>"):
+            self.root_bindings.unbind(sequence, self.name)
+
+    def _on_root_configure(self, event):
+        """
+        Reposiciona a janela quando a principal (e não um widget filho) muda.
+        """
+        if event.widget is self.root:
+            self.reposition()
+
+    def _on_root_map(self, event):
+        """
+        Mostra e reposiciona a janela quando a principal volta a ser exibida.
+        """
+        if event.widget is not self.root:
+            return
+        if self.follow_visibility:
+            self.popup.deiconify()
+        self.reposition()
+
+    def _on_root_unmap(self, event):
+        """
+        Esconde a janela junto com a principal.
+        """
+        if event.widget is self.root:
+            self.popup.withdraw()
+
+    def _on_popup_destroy(self, event):
+        """
+        Desfaz a ancoragem quando a janela secundária é destruída.
+        """
+        if event.widget is self.popup:
+            self.detach()
+
+
+errorPanelInterval = 0.5  # Intervalo mínimo (em segundos) entre atualizações do painel de erros
+errorPanelRows = 5  # Quantidade de erros distintos exibidos no painel
+errorPanelRowChars = 60  # Quantidade máxima de caracteres exibidos de cada erro
+errorReporterMaxEntries = 50  # Erros distintos lembrados até o painel ser fechado
+
+
+ErrorSummary = namedtuple("ErrorSummary", ["message", "count", "last_seen"])
+
+
+class ErrorReporter:
+    """
+    Fila de erros agrupados pela mensagem.
+
+    Cada erro distinto é registrado no log com o traceback completo apenas na
+    primeira ocorrência; as repetições só incrementam o contador. Os ouvintes são
+    avisados no máximo uma vez por `interval`, de modo que uma rajada de erros
+    custa uma única atualização da interface.
+    """
+    def __init__(self, schedule, interval=errorPanelInterval, max_entries=errorReporterMaxEntries):
+        """
+        Inicializa a fila; `schedule(delay, callback)` agenda a notificação dos ouvintes.
+        """
+        self.schedule = schedule
+        self.interval = interval
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # Mensagem -> [ocorrências, ocorrências já registradas no log, último horário]
+        self._dropped = 0
+        self._scheduled = False
+        self._last_flush = 0.0
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, callback):
+        """
+        Registra uma função chamada com (erros, descartados) a cada atualização.
+        """
+        self._listeners.append(callback)
+
+    def report(self, message, error=None):
+        """
+        Registra uma ocorrência do erro; sem `error`, usa a exceção sendo tratada.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(message)
+            first = entry is None
+            if first:
+                self._entries[message] = [1, 1, now]
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._dropped += 1
+            else:
+                entry[0] += 1
+                entry[2] = now
+                self._entries.move_to_end(message)
+            delay = None
+            if not self._scheduled:
+                self._scheduled = True
+                delay = max(0.0, self._last_flush + self.interval - now)
+        if first:
+            logging.error(message, exc_info=error if error is not None else sys.exc_info()[1])
+        if delay is not None:
+            self.schedule(delay, self.flush)
+
+    def flush(self):
+        """
+        Avisa os ouvintes com os erros atuais, do mais recente para o mais antigo.
+        """
+        with self._lock:
+            self._scheduled = False
+            self._last_flush = time.monotonic()
+            repeated = []
+            errors = []
+            for message, entry in reversed(self._entries.items()):
+                if entry[0] > entry[1]:
+                    repeated.append((message, entry[0] - entry[1]))
+                    entry[1] = entry[0]
+                errors.append(ErrorSummary(message, entry[0], entry[2]))
+            dropped = self._dropped
+        for message, count in repeated:
+            logging.warning("Erro repetido %d vezes desde a última atualização: %s", count, message)
+        for listener in self._listeners:
+            try:
+                listener(errors, dropped)
+            except Exception as e:
+                logging.error(f"Erro ao notificar ouvinte da fila de erros: {e}")
+
+    def clear(self):
+        """
+        Esquece os erros registrados; a próxima ocorrência volta a ir para o log completa.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._dropped = 0
+
+
+class ErrorPanel:
+    """
+    Painel único de erros, ancorado abaixo da janela principal.
+
+    A janela e suas linhas são criadas uma única vez e reaproveitadas: cada
+    atualização apenas altera o texto das linhas cujo conteúdo mudou. Ao fechar, a
+    janela é escondida e os erros exibidos são esquecidos.
+    """
+    def __init__(self, root, root_bindings, reporter):
+        """
+        Inicializa o painel e o registra como ouvinte da fila de erros.
+        """
+        self.root = root
+        self.root_bindings = root_bindings
+        self.reporter = reporter
+        self.window = None
+        self.rows = []
+        self._row_state = [None] * errorPanelRows
+        self._footer_state = None
+        reporter.add_listener(self.render)
+
+    def build(self):
+        """
+        Cria a janela do painel, escondida.
+        """
+        self.window = customtkinter.CTkToplevel(self.root)
+        self.window.withdraw()
+        self.window.title("Error")
+        self.window.attributes('-topmost', True)
+        self.window.protocol("WM_DELETE_WINDOW", self.dismiss)
+        self.rows = []
+        for index in range(errorPanelRows):
+            row = customtkinter.CTkLabel(
+                self.window, text="", text_color="red", anchor="w", justify="left",
+                wraplength=defaultWidth * 2
+            )
+            row.grid(row=index, column=0, padx=10, pady=(10 if index == 0 else 0, 0), sticky="w")
+            self.rows.append(row)
+        self.footer = customtkinter.CTkLabel(self.window, text="", font=("Arial", 10))
+        self.footer.grid(row=errorPanelRows, column=0, padx=10, sticky="w")
+        button = customtkinter.CTkButton(self.window, text="OK", command=self.dismiss)
+        button.grid(row=errorPanelRows + 1, column=0, pady=10)
+        self._row_state = [False] * errorPanelRows  # Força o desenho de todas as linhas na primeira atualização
+        self._footer_state = None
+        # Abaixo da janela principal; continua visível mesmo com o launcher escondido
+        AttachedPopup(
+            self.root, self.root_bindings, self.window,
+            lambda root: (root.winfo_x(), root.winfo_y() + root.winfo_height() + 5),
+            follow_visibility=False
+        )
+
+    def render(self, errors, dropped):
+        """
+        Exibe os erros mais recentes, com a quantidade de ocorrências de cada um.
+        """
+        if not errors:
+            return
+        if self.window is None or not self.window.winfo_exists():
+            self.build()
+        for position, row in enumerate(self.rows):
+            state = None
+            if position < len(errors):
+                error = errors[position]
+                text = error.message.splitlines()[0] if error.message else ""
+                if len(text) > errorPanelRowChars:
+                    text = text[:errorPanelRowChars - 1] + "…"
+                state = f"{text} (×{error.count})" if error.count > 1 else text
+            if self._row_state[position] != state:
+                if state is None:
+                    row.grid_remove()
+                else:
+                    row.configure(text=state)
+                    row.grid()
+                self._row_state[position] = state
+        hidden = len(errors) - len(self.rows) + dropped
+        footer = f"+{hidden} outros erros (detalhes no log)" if hidden > 0 else "Detalhes no log"
+        if footer != self._footer_state:
+            self.footer.configure(text=footer)
+            self._footer_state = footer
+        if self.window.state() == "withdrawn":
+            self.window.deiconify()
+
+    def dismiss(self):
+        """
+        Esconde o painel e esquece os erros exibidos.
+        """
+        self.reporter.clear()
+        if self.window is not None and self.window.winfo_exists():
+            self.window.withdraw()
+
+
+paletteVisibleRows = 12  # Quantidade de linhas criadas na paleta; apenas elas são desenhadas
+paletteRowChars = 52  # Quantidade máxima de caracteres exibidos em cada linha
+paletteRowWidth = 340  # Largura (em pixels) de cada linha da paleta
+
+
+class CommandPalette:
+    """
+    Paleta de comandos pesquisável, aberta pelo comando "?".
+
+    A lista completa fica apenas em memória; a janela possui um número fixo de linhas
+    que são reaproveitadas ao filtrar ou rolar, de modo que o custo de desenho não
+    cresce com a quantidade de comandos. As setas, PageUp/PageDown e Enter navegam
+    e executam o comando selecionado.
+    """
+    _navigation_keys = {"Up", "Down", "Prior", "Next", "Return", "Escape"}
+
+    def __init__(self, app, entries):
+        """
+        Cria a paleta ancorada à janela principal; `entries` é uma lista de (nome, texto).
+        """
+        self.app = app
+        self.entries = entries
+        self._haystacks = [(name.lower(), text.lower()) for name, text in entries]
+        self.matches = list(range(len(entries)))  # Índices de `entries` que passam pelo filtro
+        self.offset = 0  # Primeira linha visível
+        self.selected = 0  # Posição selecionada em `matches`
+        self._row_state = [None] * paletteVisibleRows
+        self._highlight = ThemeManager.theme["CTkButton"]["fg_color"]
+
+        self.window = customtkinter.CTkToplevel(app.root)
+        self.window.overrideredirect(True)
+        frame = customtkinter.CTkFrame(self.window)
+        frame.pack(fill="both", expand=True, padx=1, pady=1)
+        frame.columnconfigure(0, weight=1)
+
+        self.search = customtkinter.CTkEntry(
+            frame, placeholder_text="Filtrar comandos...", fg_color="#282a2e", text_color="white"
+        )
+        self.search.grid(row=0, column=0, columnspan=2, padx=10, pady=(10, 5), sticky="ew")
+        self.search_bindings = EventBindingManager(self.search)
+        self.search_bindings.bind("<KeyRelease>", "filtrar", self._on_key_release)
+        self.search_bindings.bind("<Down>", "descer", lambda event: self.move(1))
+        self.search_bindings.bind("<Up>", "subir", lambda event: self.move(-1))
+        self.search_bindings.bind("<Next>", "pagina_abaixo", lambda event: self.move(paletteVisibleRows))
+        self.search_bindings.bind("<Prior>", "pagina_acima", lambda event: self.move(-paletteVisibleRows))
+        self.search_bindings.bind("<Return>", "executar", lambda event: self.launch())
+        self.search_bindings.bind("<Escape>", "fechar", lambda event: self.close())
+
+        self.rows = []
+        for index in range(paletteVisibleRows):
+            row = customtkinter.CTkLabel(
+                frame, text="", anchor="w", width=paletteRowWidth, corner_radius=4, fg_color="transparent"
+            )
+            row.grid(row=index + 1, column=0, padx=(10, 0), sticky="ew")
+            row.bind("<Button-1>", lambda event, position=index: self.launch(self.offset + position))
+            for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                row.bind(sequence, self._on_wheel)
+            self.rows.append(row)
+
+        self.scrollbar = customtkinter.CTkScrollbar(frame, command=self._on_scrollbar)
+        self.scrollbar.grid(row=1, column=1, rowspan=paletteVisibleRows, padx=(0, 5), sticky="ns")
+        self.count_label = customtkinter.CTkLabel(frame, text="", font=("Arial", 10))
+        self.count_label.grid(row=paletteVisibleRows + 1, column=0, columnspan=2, pady=(0, 5))
+
+        # À direita da janela principal
+        AttachedPopup(
+            app.root, app.root_bindings, self.window,
+            lambda root: (root.winfo_x() + root.winfo_width() + 5, root.winfo_y())
+        )
+        self.window.bind("<Destroy>", self._on_destroy, add="+")
+        self.render()
+        self.search.focus_force()
+
+    def filter(self, query):
+        """
+        Filtra a lista: nomes que começam com o texto, depois nomes e descrições que o contêm.
+        """
+        query = query.strip().lower()
+        if not query:
+            self.matches = list(range(len(self.entries)))
+        else:
+            prefix, in_name, in_text = [], [], []
+            for index, (name, text) in enumerate(self._haystacks):
+                if name.startswith(query):
+                    prefix.append(index)
+                elif query in name:
+                    in_name.append(index)
+                elif query in text:
+                    in_text.append(index)
+            self.matches = prefix + in_name + in_text
+        self.offset = 0
+        self.selected = 0
+        self.render()
+
+    def move(self, delta):
+        """
+        Move a seleção, rolando a lista para mantê-la visível.
+        """
+        if self.matches:
+            self.selected = max(0, min(len(self.matches) - 1, self.selected + delta))
+            if self.selected < self.offset:
+                self.offset = self.selected
+            elif self.selected >= self.offset + paletteVisibleRows:
+                self.offset = self.selected - paletteVisibleRows + 1
+            self.render()
+        return "break"
+
+    def scroll(self, rows):
+        """
+        Rola a lista sem alterar a seleção.
+        """
+        self.offset = max(0, min(max(0, len(self.matches) - paletteVisibleRows), self.offset + rows))
+        self.render()
+
+    def render(self):
+        """
+        Atualiza apenas as linhas visíveis cujo conteúdo mudou.
+        """
+        for position, row in enumerate(self.rows):
+            index = self.offset + position
+            if index < len(self.matches):
+                text = self.entries[self.matches[index]][1]
+                if len(text) > paletteRowChars:
+                    text = text[:paletteRowChars - 1] + "…"
+                state = (text, index == self.selected)
+            else:
+                state = ("", False)
+            if self._row_state[position] != state:
+                row.configure(text=state[0], fg_color=self._highlight if state[1] else "transparent")
+                self._row_state[position] = state
+        total = len(self.matches)
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + paletteVisibleRows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        self.count_label.configure(text=f"{total} de {len(self.entries)} comandos")
+
+    def launch(self, position=None):
+        """
+        Fecha a paleta e executa o comando selecionado (ou o da posição especificada).
+        """
+        position = self.selected if position is None else position
+        if 0 <= position < len(self.matches):
+            name = self.entries[self.matches[position]][0]
+            self.close()
+            self.app.executar_da_paleta(name)
+        return "break"
+
+    def close(self):
+        """
+        Fecha a janela da paleta.
+        """
+        if self.window.winfo_exists():
+            self.window.destroy()
+        if self.app.command_palette is self:
+            self.app.command_palette = None
+        self.app.entry.focus_force()
+        return "break"
+
+    def _on_destroy(self, event):
+        """
+        Esquece a paleta quando a janela é destruída por outro caminho (reconstrução da interface).
+        """
+        if event.widget is self.window and self.app.command_palette is self:
+            self.app.command_palette = None
+
+    def _on_key_release(self, event):
+        """
+        Filtra a lista a cada tecla digitada no campo de busca.
+        """
+        if event.keysym not in self._navigation_keys:
+            self.filter(self.search.get())
+
+    def _on_wheel(self, event):
+        """
+        Rola a lista com a roda do mouse.
+        """
+        if event.num == 5 or getattr(event, "delta", 0) < 0:
+            self.scroll(3)
+        else:
+            self.scroll(-3)
+
+    def _on_scrollbar(self, action, value, unit=None):
+        """
+        Rola a lista a partir da barra de rolagem.
+        """
+        if action == "moveto":
+            self.offset = 0
+            self.scroll(int(float(value) * len(self.matches)))
+        elif action == "scroll":
+            self.scroll(int(value) * (paletteVisibleRows if unit == "pages" else 1))
+
+
+class InstanceServer:
+    """
+    Servidor local que garante uma única instância do launcher.
+
+    A primeira instância escuta em um socket UNIX (ou, onde ele não existe, em uma
+    porta TCP local protegida por um token) e as invocações seguintes apenas
+    encaminham o pedido (mostrar a janela, executar um comando...) e encerram.
+    O protocolo é uma linha JSON de pedido e uma linha JSON de resposta.
+    """
+    def __init__(self, handler, socket_path=instance_socket_path, info_path=instance_info_path):
+        """
+        Inicializa o servidor; `handler(pedido)` retorna o dicionário de resposta.
+        """
+        self.handler = handler
+        self.socket_path = socket_path
+        self.info_path = info_path
+        self.token = None
+        self._socket = None
+        self._owned_path = None
+        self._thread = None
+        self._stopped = threading.Event()
+        self.busy = False  # Outra instância existe, mas não respondeu a tempo
+
+    def claim(self):
+        """
+        Tenta se tornar a instância principal; retorna False se outra já estiver ativa
+        (com `busy` indicando que ela existe, mas não respondeu a tempo).
+        """
+        try:
+            if hasattr(socket, "AF_UNIX"):
+                return self._claim_unix()
+            return self._claim_tcp()
+        except OSError as e:
+            logging.error(f"Erro ao iniciar o servidor da instância única: {e}")
+            return True  # Sem o servidor, a aplicação continua funcionando normalmente
+
+    def serve(self):
+        """
+        Começa a atender os pedidos em uma thread (após a interface estar pronta).
+        """
+        if self._socket is None:
+            return
+        self._thread = threading.Thread(target=self._accept_loop, name="InstanceServer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Encerra o servidor e remove os arquivos da instância.
+        """
+        self._stopped.set()
+        if self._socket is not None:
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._socket.close()
+            self._socket = None
+        if self._owned_path is not None:
+            try:
+                os.remove(self._owned_path)
+            except OSError:
+                pass
+            self._owned_path = None
+
+    def _claim_unix(self):
+        """
+        Cria o socket UNIX, removendo um socket abandonado por uma instância que terminou.
+        """
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            server.bind(self.socket_path)
+        except OSError:
+            if not self._is_stale():
+                server.close()
+                return False
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self.socket_path)
+            server.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        server.listen(16)
+        self._socket = server
+        self._owned_path = self.socket_path
+        return True
+
+    def _claim_tcp(self):
+        """
+        Escuta em uma porta TCP local e publica a porta e o token em um arquivo exclusivo.
+        """
+        for _ in range(2):
+            try:
+                fd = os.open(self.info_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+            except FileExistsError:
+                if not self._is_stale():
+                    return False
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(self.info_path)  # Arquivo de uma instância que terminou
+                continue
+            server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server.bind(("127.0.0.1", 0))
+            server.listen(16)
+            self.token = secrets.token_hex(16)
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump({"port": server.getsockname()[1], "token": self.token}, file)
+            self._socket = server
+            self._owned_path = self.info_path
+            return True
+        return False
+
+    def _is_stale(self):
+        """
+        Indica se o socket (ou arquivo) existente foi abandonado por uma instância que terminou.
+        Uma instância que demora a responder continua sendo a principal.
+        """
+        state = probe_instance()
+        self.busy = state is None
+        return state is False
+
+    def _accept_loop(self):
+        """
+        Atende as conexões, uma de cada vez.
+        """
+        while not self._stopped.is_set():
+            try:
+                connection, _ = self._socket.accept()
+            except OSError:
+                break
+            with connection:
+                try:
+                    connection.settimeout(instanceTimeout)
+                    request = json.loads(_read_line(connection))
+                    if self.token is not None and request.get("token") != self.token:
+                        response = {"ok": False, "message": "Token inválido"}
+                    else:
+                        response = self.handler(request)
+                except Exception as e:
+                    logging.error(f"Erro ao atender pedido de outra instância: {e}")
+                    response = {"ok": False, "message": str(e)}
+                try:
+                    connection.sendall(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                except OSError:
+                    pass
+
+
+def _read_line(connection):
+    """
+    Lê uma linha (terminada em \\n) da conexão.
+    """
+    data = b""
+    while not data.endswith(b"\n"):
+        chunk = connection.recv(4096)
+        if not chunk:
+            break
+        data += chunk
+    return data.decode("utf-8")
+
+
+def send_to_instance(request, timeout=instanceTimeout):
+    """
+    Envia um pedido à instância em execução; retorna a resposta ou None se não houver instância.
+    """
+    try:
+        return _exchange_with_instance(request, timeout)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def probe_instance(timeout=instanceTimeout):
+    """
+    Verifica a instância em execução: retorna True se ela respondeu, False se não há
+    nenhuma (socket ou arquivo abandonado) e None se ela existe, mas não respondeu a tempo.
+    """
+    try:
+        _exchange_with_instance({"action": "ping"}, timeout)
+        return True
+    except (ConnectionRefusedError, FileNotFoundError):
+        return False
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _exchange_with_instance(request, timeout):
+    """
+    Envia o pedido e lê a resposta, propagando os erros de conexão.
+    """
+    if hasattr(socket, "AF_UNIX"):
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        address = instance_socket_path
+    else:
+        with open(instance_info_path, "r", encoding="utf-8") as file:
+            info = json.load(file)
+        request = dict(request, token=info["token"])
+        client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        address = ("127.0.0.1", info["port"])
+    with client:
+        client.settimeout(timeout)
+        client.connect(address)
+        client.sendall(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+        return json.loads(_read_line(client))
+
+
+class HeadlessApp:
+    """
+    Substituto do `app` entregue aos comandos executados em lote, sem interface gráfica.
+
+    Implementa os métodos que os comandos costumam chamar. As ações que dependem da
+    janela são apenas registradas, e os links só são abertos no navegador se houver
+    um `browser` (BrowserDispatcher).
+    """
+    def __init__(self, job, browser=None):
+        """
+        Inicializa o substituto para o job especificado.
+        """
+        self._job = job
+        self.browser = browser
+        self.hideWindowAfterCommand = True
+        self.visible = False
+        self.actions = []  # Ações executadas pelo comando, na ordem em que ocorreram
+        self.errors = []
+
+    def open_link(self, url="https://www.google.com"):
+        """
+        Abre o link especificado no navegador padrão (ou apenas o registra).
+        """
+        self._job.check_cancelled()
+        self.actions.append(f"open_link {url}")
+        if self.browser is not None:
+            self.browser.open(url)  # Falhas são registradas no log pelo despachante
+
+    def open_link_with_value(self, base_url, value):
+        """
+        Abre um link substituindo um valor na URL base.
+        """
+        self.open_link(LinkTemplate.fill(base_url, value))
+
+    def open_link_with_value_and_reset(self, base_url, value):
+        """
+        Abre um link substituindo um valor na URL base (não há interface para resetar).
+        """
+        self.open_link_with_value(base_url, value)
+
+    def open_file(self, file_path=script_dir):
+        """
+        Registra o arquivo que seria aberto.
+        """
+        self._job.check_cancelled()
+        self.actions.append(f"open_file {file_path}")
+
+    def show_window(self):
+        """
+        Registra o pedido para mostrar a janela.
+        """
+        self._job.check_cancelled()
+        self.actions.append("show_window")
+
+    def hide_window(self):
+        """
+        Registra o pedido para esconder a janela.
+        """
+        self._job.check_cancelled()
+        self.actions.append("hide_window")
+
+    def toggle_window(self):
+        """
+        Registra o pedido para alternar a janela.
+        """
+        self._job.check_cancelled()
+        self.actions.append("toggle_window")
+
+    def reset_input_placeholder(self, text="Digite o comando...", color="white"):
+        """
+        Registra o texto que seria exibido no campo de entrada.
+        """
+        self._job.check_cancelled()
+        self.actions.append(f"placeholder {text}")
+
+    def show_error(self, message):
+        """
+        Registra a mensagem de erro, que faz o comando terminar como falha.
+        """
+        logging.error(message)
+        self.errors.append(message)
+
+    def __getattr__(self, name):
+        """
+        Falha com uma mensagem clara para métodos que só existem na interface.
+        """
+        if name.startswith("_"):
+            raise AttributeError(name)
+        raise AttributeError(f"'{name}' não está disponível no modo em lote")
+
+
+BatchResult = namedtuple("BatchResult", ["command", "status", "elapsed", "message"])
+
+
+class BatchRunner:
+    """
+    Executa comandos em lote, sem importar a interface gráfica.
+
+    Usa o mesmo registro, cache de código e índice de metadados da interface e
+    entrega a cada comando um HeadlessApp. Os resultados são devolvidos na ordem
+    de entrada, mesmo quando os comandos rodam em paralelo.
+    """
+    def __init__(self, jobs=1, open_links=True, directory=commands_dir, extra_directories=None):
+        """
+        Inicializa o executor com a quantidade de comandos executados em paralelo.
+        """
+        self.jobs = max(1, jobs)
+        self.open_links = open_links
+        self.browser = BrowserDispatcher() if open_links else None
+        self.code_cache = CompiledCodeCache(disk_dir=bytecode_cache_dir if useBytecodeCache else None)
+        self.metadata_index = CommandMetadataIndex()
+        if extra_directories is None:
+            extra_directories = extra_command_dirs
+        self.registry = CommandRegistry(directory, extra_directories=extra_directories)
+        self.link_manifest = LinkManifest([directory, *extra_directories])
+        self.recent_links = RecentValues()
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Carrega o índice de metadados, os comandos de link e monta o registro de comandos.
+        """
+        self.metadata_index.load()
+        self.link_manifest.load()
+        self.registry.build()
+
+    def run_all(self, commands):
+        """
+        Executa os comandos (um iterável, lido aos poucos) e gera um BatchResult para cada um.
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="BatchJob") as executor:
+            pending = deque()
+            for command in commands:
+                pending.append(executor.submit(self.run, command))
+                # Limita a quantidade de comandos lidos à frente dos que já terminaram
+                while len(pending) > self.jobs * 2 or (pending and pending[0].done()):
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def run(self, command):
+        """
+        Executa um único comando e retorna o BatchResult.
+        """
+        started = time.perf_counter()
+        name, _, arguments = command.partition(" ")
+        name = name.lower()
+        if name in builtinCommands:
+            return BatchResult(command, "unsupported", 0.0, "comando interno da interface")
+        template = self.link_manifest.get(name)
+        if template:
+            return self.run_link(command, template, arguments.split(), started)
+        command = command.lower()
+        command_entry = self.registry.lookup(command)
+        if command_entry is None:
+            return BatchResult(command, "not_found", 0.0, "comando não encontrado")
+
+        metadata = self.metadata_index.get(command_entry.path, command_entry.stat)
+        timeout = metadata.timeout if metadata and metadata.timeout else jobDefaultTimeout
+        job = CommandJob(command, timeout)
+        job.thread_id = threading.get_ident()
+        job.started_at = started
+        app = HeadlessApp(job, self.browser)
+        timer = threading.Timer(timeout, self._expire, (job,))
+        timer.daemon = True
+        timer.start()
+        try:
+            try:
+                job.state = "running"
+                code = self.code_cache.get(command_entry.path, command_entry.stat)
+                exec(code, command_namespace(app=app, self=app, command=command, __file__=command_entry.path))
+                job.state = "failed" if app.errors else "done"
+                message = "; ".join(app.errors or app.actions)
+            finally:
+                timer.cancel()
+                with self._lock:
+                    job.thread_id = None
+        except JobCancelled:
+            message = f"excedeu o tempo limite de {timeout:g}s"
+        except Exception as e:
+            job.state = "failed"
+            message = f"{type(e).__name__}: {e}"
+        job.finished_at = time.perf_counter()
+        return BatchResult(command, job.state, job.elapsed, message)
+
+    def run_link(self, command, template, arguments, started):
+        """
+        Executa um comando de link; os valores pedidos vêm dos argumentos, na ordem declarada.
+        """
+        app = HeadlessApp(CommandJob(template.name), self.browser)
+        if template.bulk and arguments:
+            # Cada argumento é um valor; os repetidos e os já abertos neste lote são descartados
+            prompt = template.prompts[0]
+            values, invalid = template.split_bulk(" ".join(arguments))
+            skipped = []
+            for value in values:
+                key = (template.name, ((prompt.name, value),))
+                if key in self.recent_links:
+                    skipped.append(value)
+                    continue
+                self.recent_links.add(key)
+                app.open_link(template.render({prompt.name: value}))
+            notes = [f"já abertos: {', '.join(skipped)}"] if skipped else []
+            if invalid:
+                message = "; ".join(app.actions + notes + [f"inválidos: {', '.join(invalid)}"])
+                return BatchResult(command, "failed", time.perf_counter() - started, message)
+            return BatchResult(command, "done", time.perf_counter() - started, "; ".join(app.actions + notes))
+        if len(arguments) != len(template.prompts):
+            expected = " ".join(f"<{prompt.name}>" for prompt in template.prompts)
+            return BatchResult(command, "failed", 0.0, f"uso: {template.name} {expected}".rstrip())
+        try:
+            values = {prompt.name: template.normalize(prompt.name, value) for prompt, value in zip(template.prompts, arguments)}
+            app.open_link(template.render(values))
+        except Exception as e:
+            return BatchResult(command, "failed", time.perf_counter() - started, f"{type(e).__name__}: {e}")
+        return BatchResult(command, "done", time.perf_counter() - started, "; ".join(app.actions))
+
+    def close(self):
+        """
+        Aguarda a abertura dos links pendentes.
+        """
+        if self.browser is not None:
+            self.browser.close(timeout=None)  # Com o limite de taxa, listas longas levam alguns segundos
+
+    def _expire(self, job):
+        """
+        Interrompe um job que excedeu o tempo limite.
+        """
+        with self._lock:
+            if job.thread_id is None:
+                return
+            job.state = "timeout"
+            job.cancel_event.set()
+            ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                ctypes.c_ulong(job.thread_id), ctypes.py_object(JobCancelled)
+            )
+
+
+# Arquivo de métricas no formato de texto do Prometheus, regravado periodicamente
+metrics_path = os.path.join(log_dir, "metrics.prom")
+metricsFlushInterval = 60.0  # Intervalo (em segundos) entre as gravações do arquivo de métricas
+metricsBuckets = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+statsLimit = 10  # Quantidade de comandos exibidos pelo comando "stats"
+metricDescriptions = {
+    "launcher_window_seconds": "Tempo para mostrar ou esconder a janela, desde o atalho global.",
+    "launcher_dispatch_seconds": "Tempo de execute_command na thread da interface.",
+    "launcher_command_seconds": "Tempo de execução dos arquivos de comando.",
+    "launcher_palette_render_seconds": "Tempo para abrir a paleta de comandos do '?'.",
+    "launcher_browser_open_seconds": "Tempo desde o pedido até o navegador abrir o link.",
+    "launcher_hotkey_seconds": "Tempo desde o atalho global até o fim da ação associada.",
+}
+
+
+class LatencyHistogram:
+    """
+    Histograma de latências com limites fixos, no modelo do Prometheus.
+    """
+    def __init__(self, buckets=metricsBuckets):
+        """
+        Inicializa o histograma com os limites superiores especificados.
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # O último contador é o +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.errors = 0
+
+    def observe(self, seconds, error=False):
+        """
+        Registra uma observação.
+        """
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+        if error:
+            self.errors += 1
+
+    def quantile(self, q):
+        """
+        Estima o quantil q (entre 0 e 1) interpolando dentro do limite correspondente.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                if index == len(self.buckets):
+                    return lower  # Acima do maior limite não há como interpolar
+                return lower + (self.buckets[index] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """
+    Guarda em memória os histogramas de latência da aplicação.
+
+    Cada métrica é separada por rótulos (por exemplo, o nome do comando). Uma thread
+    regrava periodicamente o arquivo de métricas no formato de texto do Prometheus.
+    """
+    def __init__(self, path=metrics_path, flush_interval=metricsFlushInterval):
+        """
+        Inicializa o registro de métricas.
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self._histograms = {}  # (métrica, rótulos) -> LatencyHistogram
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def observe(self, metric, seconds, error=False, **labels):
+        """
+        Registra uma latência (em segundos) na métrica com os rótulos especificados.
+        """
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram()
+            histogram.observe(seconds, error)
+            self._dirty = True
+
+    @contextlib.contextmanager
+    def timer(self, metric, **labels):
+        """
+        Mede a duração do bloco; uma exceção conta como erro.
+        """
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(metric, time.perf_counter() - start, error, **labels)
+
+    def histograms(self, metric):
+        """
+        Retorna os pares (rótulos, histograma) da métrica especificada.
+        """
+        with self._lock:
+            return [(dict(labels), copy.deepcopy(histogram))
+                    for (name, labels), histogram in self._histograms.items() if name == metric]
+
+    def render(self):
+        """
+        Retorna as métricas no formato de texto do Prometheus.
+        """
+        with self._lock:
+            items = sorted(self._histograms.items())
+            items = [(key, copy.deepcopy(histogram)) for key, histogram in items]
+        lines = []
+        families = {}
+        for (metric, labels), histogram in items:
+            families.setdefault(metric, []).append((labels, histogram))
+        for metric, entries in families.items():
+            lines.append(f"# HELP {metric} {metricDescriptions.get(metric, metric)}")
+            lines.append(f"# TYPE {metric} histogram")
+            for labels, histogram in entries:
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + (math.inf,), histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == math.inf else repr(bound)
+                    lines.append(f"{metric}_bucket{self._labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{metric}_sum{self._labels(labels)} {histogram.sum!r}")
+                lines.append(f"{metric}_count{self._labels(labels)} {histogram.count}")
+            errors = metric[:-len("_seconds")] if metric.endswith("_seconds") else metric
+            lines.append(f"# TYPE {errors}_errors_total counter")
+            for labels, histogram in entries:
+                lines.append(f"{errors}_errors_total{self._labels(labels)} {histogram.errors}")
+        return "\n".join(lines) + "\n"
+
+    def flush(self):
+        """
+        Regrava o arquivo de métricas, se houve novas observações.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temporary_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temporary_path, "w", encoding="utf-8") as file:
+                file.write(self.render())
+            os.replace(temporary_path, self.path)
+        except OSError as e:
+            logging.warning("Não foi possível gravar as métricas: %s", e)
+
+    def start_flushing(self):
+        """
+        Inicia a thread que grava o arquivo de métricas periodicamente.
+        """
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._flush_loop, name="MetricsFlush", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Encerra a thread de gravação e grava as métricas pendentes.
+        """
+        self._stopped.set()
+        self.flush()
+
+    def _flush_loop(self):
+        """
+        Grava o arquivo de métricas a cada intervalo.
+        """
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
+
+    @staticmethod
+    def _labels(labels):
+        """
+        Formata os rótulos de uma série do Prometheus.
+        """
+        if not labels:
+            return ""
+        pairs = []
+        for name, value in labels:
+            value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            pairs.append(f'{name}="{value}"')
+        return "{" + ",".join(pairs) + "}"
+
+
+class StartupProfiler:
+    """
+    Mede o tempo de cada fase da inicialização até o primeiro quadro da janela.
+    """
+    def __init__(self, started=startup_started):
+        """
+        Inicializa o perfil a partir do instante de início especificado.
+        """
+        self.started = started
+        self.phases = []  # (nome, início, fim, thread) em segundos desde o início
+        self.marks = {}  # nome -> instante em segundos desde o início
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        Mede a duração do bloco como uma fase da inicialização.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self.phases.append(
+                    (name, start - self.started, end - self.started, threading.current_thread().name)
+                )
+
+    def mark(self, name):
+        """
+        Registra um marco da inicialização (ex.: primeiro quadro).
+        """
+        with self._lock:
+            self.marks[name] = time.perf_counter() - self.started
+
+    def report(self):
+        """
+        Retorna o relatório das fases em texto e acrescenta-o ao arquivo de perfis.
+        """
+        with self._lock:
+            phases = sorted(self.phases, key=lambda phase: phase[1])
+            marks = dict(self.marks)
+
+        lines = ["Perfil de inicialização (ms desde o início):"]
+        for name, start, end, thread_name in phases:
+            lines.append(f"  {name:<24} {start * 1000:8.1f} -> {end * 1000:8.1f}  ({(end - start) * 1000:7.1f} ms) [{thread_name}]")
+        for name, instant in sorted(marks.items(), key=lambda mark: mark[1]):
+            lines.append(f"  {name:<24} {instant * 1000:8.1f}")
+
+        record = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "frozen": bool(getattr(sys, "frozen", False)),
+            "executable": os.path.basename(sys.executable),
+            "python": sys.version.split()[0],
+            "platform": sys.platform,
+            "phases": {name: round((end - start) * 1000, 2) for name, start, end, _ in phases},
+            "marks": {name: round(instant * 1000, 2) for name, instant in marks.items()},
+        }
+        try:
+            os.makedirs(os.path.dirname(startup_profile_path), exist_ok=True)
+            with open(startup_profile_path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logging.error(f"Erro ao gravar o perfil de inicialização: {e}")
+        return "\n".join(lines)
+
+
+startup_profiler = StartupProfiler()
+
+class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Arquivo de log rotacionado por tamanho ou por tempo, o que vier primeiro.
+
+    Os arquivos antigos são compactados com gzip (main.log.1.gz, main.log.2.gz...).
+    Roda apenas na thread do QueueListener, fora da thread da interface.
+    """
+    def __init__(self, filename, max_bytes=logRotateBytes, interval=logRotateInterval, backup_count=logBackupCount):
+        """
+        Inicializa o arquivo com o tamanho máximo, o intervalo e a quantidade de cópias mantidas.
+        """
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.interval = interval
+        # O início do arquivo atual fica em um arquivo ao lado: o mtime avança a cada gravação e
+        # um arquivo criado em uma execução anterior deve continuar contando a partir do seu início
+        self.start_path = f"{self.baseFilename}.start"
+        self.rollover_at = self._read_start() + interval
+        self.namer = lambda name: f"{name}.gz"
+        self.rotator = self._compress
+
+    def shouldRollover(self, record):
+        """
+        Verifica se o arquivo excedeu o tamanho máximo ou o intervalo de rotação.
+        """
+        if super().shouldRollover(record):
+            return True
+        if time.time() < self.rollover_at:
+            return False
+        if self.stream is None:
+            self.stream = self._open()
+        return self.stream.tell() > 0  # Não rotaciona um arquivo vazio
+
+    def doRollover(self):
+        """
+        Rotaciona o arquivo e agenda a próxima rotação por tempo.
+        """
+        super().doRollover()
+        self.rollover_at = self._write_start(time.time()) + self.interval
+
+    def _read_start(self):
+        """
+        Obtém o horário de início do arquivo atual, registrando-o se ainda não existir.
+        """
+        try:
+            with open(self.start_path, "r", encoding="utf-8") as file:
+                return float(file.read().strip())
+        except (OSError, ValueError):
+            pass
+        try:
+            # Arquivo anterior ao registro do início: a última gravação é a melhor estimativa
+            started = os.path.getmtime(self.baseFilename)
+        except OSError:
+            started = time.time()
+        return self._write_start(started)
+
+    def _write_start(self, started):
+        """
+        Registra o horário de início do arquivo atual; retorna o próprio horário.
+        """
+        try:
+            with open(self.start_path, "w", encoding="utf-8") as file:
+                file.write(f"{started:.3f}\n")
+        except OSError as e:
+            logging.debug("Não foi possível registrar o início do arquivo de log: %s", e)
+        return started
+
+    @staticmethod
+    def _compress(source, destination):
+        """
+        Compacta o arquivo rotacionado e remove o original.
+        """
+        with open(source, "rb") as original, gzip.open(destination, "wb") as compressed:
+            shutil.copyfileobj(original, compressed)
+        os.remove(source)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Entrega os registros de log à fila sem formatá-los.
+
+    O QueueHandler padrão formata a mensagem na thread que fez a chamada; aqui a
+    mensagem e os argumentos seguem como estão e só são combinados na thread do
+    QueueListener, de modo que a thread da interface apenas enfileira o registro.
+    """
+    def prepare(self, record):
+        """
+        Retorna o registro sem formatação.
+        """
+        return record
+
+
+
+class AlwaysOnTopApp:
+    """
+    Classe para criar uma aplicação que permanece sempre no topo.
+    """
+    def show_error(self, message, error=None):
+        """
+        Registra o erro e o exibe no painel de erros.
+
+        Repetições da mesma mensagem são agrupadas e o painel é atualizado no máximo
+        uma vez por `errorPanelInterval`; o traceback completo fica no log.
+        """
+        try:
+            reporter = getattr(self, "error_reporter", None)
+            if reporter is None:
+                # A interface ainda não existe (falha durante a inicialização)
+                logging.error(message, exc_info=error if error is not None else sys.exc_info()[1])
+            else:
+                reporter.report(message, error)
+        except Exception as e:
+            logging.error(f"Erro ao mostrar a mensagem de erro: {e}")
+
+    def agendar_painel_erros(self, delay, callback):
+        """
+        Agenda, na thread da interface, a atualização do painel de erros.
+        """
+        self.dispatcher.post(self.root.after, int(delay * 1000), callback)
+
+    def __init__(self):
+        """
+        Inicializa a aplicação, configurando a janela principal e a interface.
+        """
+        try:
+            logging.info("Inicializando a aplicação...")
+            self.instance_server = None
+            with startup_profiler.phase("importações da interface"):
+                load_interface_modules()
+
+            with startup_profiler.phase("tema"):
+                # Define o tema padrão do customtkinter usando o caminho do arquivo de tema
+                customtkinter.set_default_color_theme(theme_path)
+
+            with startup_profiler.phase("janela"):
+                self.root = customtkinter.CTk()
+                self.root.geometry(defaultGeometry)
+                self.root.title("Launcher")
+                self.root.attributes('-topmost', True)
+                self.root.overrideredirect(True)
+                self.root.iconphoto(False, tkinter.PhotoImage(file=icon_path))
+                self.center_window()
+                self.root.protocol("WM_DELETE_WINDOW", self.hide_window)
+                self.root_bindings = EventBindingManager(self.root)
+
+            self.dispatcher = TkDispatcher(self.root)
+            self.error_reporter = ErrorReporter(self.agendar_painel_erros)
+            self.error_panel = ErrorPanel(self.root, self.root_bindings, self.error_reporter)
+
+            # Estruturas em memória; o conteúdo é carregado em segundo plano por start_services
+            self.completion_index = CompletionIndex()
+            self.scheduler = JobScheduler(self.dispatcher)
+            self.scheduler.add_listener(self.update_jobs_indicator)
+            self.code_cache = CompiledCodeCache(
+                disk_dir=bytecode_cache_dir if useBytecodeCache else None
+            )
+            self.metadata_index = CommandMetadataIndex()
+            self.registry = CommandRegistry(commands_dir, extra_directories=extra_command_dirs)
+            self.link_manifest = LinkManifest([commands_dir, *extra_command_dirs])
+            self.link_manifest.add_listener(self.sincronizar_atalhos)
+            self.registry.add_listener(self.on_commands_changed)
+            self.theme_cache = ThemeCache()
+            self.metrics = MetricsRegistry()
+            self.hotkeys = HotkeyDispatcher(self.dispatcher, self.metrics)
+            self.browser = BrowserDispatcher()
+            self.recent_links = RecentValues()
+            self.process_pool = ProcessPool()
+            self.history = CommandHistory()
+            self.history_matches = []
+            self.history_prefix = ""
+            self.history_text = ""
+            self.command_palette = None
+            self.services_ready = threading.Event()
+
+            with startup_profiler.phase("interface"):
+                self.setup_interface()
+
+            self.visible = True
+            logging.debug("Estado inicial de visible: %s", self.visible)
+
+            self.commands = {
+                "dir": self.open_script_dir
+            }
+            self.hideWindowAfterCommand = True
+            logging.debug("Estado inicial de hideWindowAfterCommand: %s", self.hideWindowAfterCommand)
+            self.entry_count = 0  # Initialize entry count
+        except Exception as e:
+            self.show_error(f"Erro ao inicializar a aplicação: {e}")
+
+    def start_services(self):
+        """
+        Carrega em segundo plano os serviços que não são necessários para exibir a janela.
+        """
+        threading.Thread(target=self.load_services, name="StartupServices", daemon=True).start()
+        self.metrics.start_flushing()
+
+    def load_services(self):
+        """
+        Monta os índices de comandos e o cache de temas e inicia os monitoramentos.
+        """
+        try:
+            with startup_profiler.phase("registro de comandos"):
+                self.metadata_index.load()
+                self.registry.build()
+                self.link_manifest.load()
+                self.link_manifest.watch(self.registry)
+                self.registry.start_watching()
+                for name, description in builtinCommands.items():
+                    self.completion_index.add(name, description)
+                for template in self.link_manifest.templates():
+                    self.completion_index.add(template.name, template.description)
+                for macro in self.link_manifest.macros():
+                    self.completion_index.add(macro.name, macro.description)
+                for command_entry in self.registry.entries():
+                    self.completion_index.add(command_entry.name)
+
+            with startup_profiler.phase("histórico de comandos"):
+                self.history.load()
+                # Encadeamentos contam como um uso de cada comando ou macro que citam
+                usage = {}
+                for command, score, last_used in self.history.usage():
+                    for name in CommandPipeline.names(command):
+                        total, last = usage.get(name, (0, 0))
+                        usage[name] = (total + score, max(last, last_used))
+                for name, (score, last_used) in usage.items():
+                    self.completion_index.set_usage(name, score, last_used)
+
+            with startup_profiler.phase("temas"):
+                self.theme_cache.load_all()
+                self.theme_cache.start_watching()
+        except Exception as e:
+            logging.error(f"Erro ao carregar os serviços da aplicação: {e}")
+        finally:
+            self.services_ready.set()
+
+        with startup_profiler.phase("descrições dos comandos"):
+            self.index_command_descriptions()
+        self.dispatcher.post(self.agendar_preaquecimento)
+
+        with startup_profiler.phase("processos de comandos"):
+            if self.needs_process_pool():
+                self.process_pool.start()  # Os processos importam o módulo agora, e não no primeiro comando
+
+        with startup_profiler.phase("navegador"):
+            try:
+                self.browser.resolve()  # A procura pelos navegadores não atrasa o primeiro link
+            except Exception as e:
+                logging.warning("Nenhum navegador encontrado: %s", e)
+
+    def needs_process_pool(self):
+        """
+        Indica se o modo padrão ou algum comando já indexado usa isolamento em processo.
+        """
+        if commandIsolation == "processo":
+            return True
+        for command_entry in self.registry.entries():
+            metadata = self.metadata_index.peek(command_entry.path, command_entry.stat)
+            if metadata and metadata.isolation == "processo":
+                return True
+        return False
+
+    def wait_for_services(self):
+        """
+        Aguarda os serviços carregados em segundo plano (apenas logo após a inicialização).
+        """
+        if not self.services_ready.is_set():
+            logging.info("Aguardando o carregamento dos serviços...")
+            self.services_ready.wait(servicesStartupTimeout)
+
+    def center_window(self):
+        """
+        Centraliza a janela na tela.
+        """
+        try:
+            logging.info("Centralizando a janela...")
+            self.root.update_idletasks()
+            width = self.root.winfo_width()
+            height = self.root.winfo_height()
+            x = (self.root.winfo_screenwidth() // 2) - (width // 2)
+            y = (self.root.winfo_screenheight() // 2) - (height // 2)
+            self.root.geometry(f"{width}x{height}+{x}+{y}")
+        except Exception as e:
+            self.show_error(f"Erro ao centralizar a janela: {e}")
+
+    def setup_interface(self, rebuild=False):
+        """
+        Configura a interface inicial da aplicação.
+
+        Os widgets são criados apenas na primeira chamada ou quando `rebuild` é True;
+        nas demais chamadas, o estado inicial é restaurado nos widgets existentes.
+        """
+        try:
+            if not rebuild and getattr(self, "entry", None) is not None and self.entry.winfo_exists():
+                self.reset_interface()
+                return
+
+            logging.debug("Configurando a interface...")
+            if getattr(self, "entry_bindings", None) is not None:
+                self.entry_bindings.clear()
+            for widget in self.root.winfo_children():
+                widget.destroy()
+
+            self.background_frame = customtkinter.CTkFrame(self.root)#, bg="#646464")
+            self.background_frame.pack(fill="both", expand=True, padx=1, pady=1)
+
+            self.content_frame = customtkinter.CTkFrame(self.background_frame)#, bg="#1d1f21")
+            self.content_frame.pack(fill="both", expand=True, padx=0, pady=0)
+
+            self.content_frame.columnconfigure(0, weight=1)
+            self.content_frame.rowconfigure(1, weight=1)
+
+            self.label = customtkinter.CTkLabel(
+                self.content_frame,
+                text=defaultLabelText,
+                font=("Arial", 16)#,
+                #text_color="white"
+            )
+            #if 
+            self.label.grid(row=0, column=0, pady=(10, 5), sticky="ew")
+
+            self.entry_frame = customtkinter.CTkFrame(self.content_frame, height=defaultHeight)#, bg="#1d1f21")
+            self.entry_frame.grid(row=1, column=0, padx=10, pady=(5, 10), sticky="nsew")
+            self.entry_frame.columnconfigure(0, weight=1)
+
+            self.entry = customtkinter.CTkEntry(
+                self.entry_frame, placeholder_text="Digite o comando...", fg_color="#282a2e", text_color="white"
+            )
+            self.entry.grid(row=0, column=0, sticky="nsew")
+            self.entry_bindings = EventBindingManager(self.entry)
+            self.entry_bindings.bind("<Return>", "check_exit", self.check_exit)
+            self.entry_bindings.bind("<KeyRelease>", "completion", self.update_completion)
+            self.entry_bindings.bind("<Tab>", "accept_completion", self.accept_completion)
+            self.entry_bindings.bind("<Escape>", "cancel_jobs", lambda event: self.scheduler.cancel_all())
+            self.entry_bindings.bind("<Up>", "history_previous", lambda event: self.navegar_historico(1))
+            self.entry_bindings.bind("<Down>", "history_next", lambda event: self.navegar_historico(-1))
+            self.entry_bindings.bind("<KeyRelease>", "history_reset", self.reiniciar_navegacao_historico)
+            self.entry.focus_set()
+            self.completions = []
+            self.history_position = None  # Posição na lista de recuperação do histórico (None: fora dela)
+
+            # Indicador dos comandos em execução, exibido apenas enquanto houver algum
+            self.jobs_label = customtkinter.CTkLabel(self.content_frame, text="", font=("Arial", 10))
+            self.update_jobs_indicator(list(self.scheduler.active.values()))
+
+            self.entry_count = 0  # Initialize/Reset entry count
+            self.dynamic_widgets = []  # Widgets criados por create_new_entry, removidos ao restaurar a interface
+
+            self.root.update_idletasks()
+            self.root.geometry(f"{defaultWidth}x{defaultHeight}")
+        except Exception as e:
+            self.show_error(f"Erro ao configurar a interface: {e}")
+
+    def reset_interface(self):
+        """
+        Restaura o estado inicial da interface sem recriar os widgets.
+        """
+        try:
+            logging.debug("Restaurando a interface...")
+            for widget in self.dynamic_widgets:
+                widget.destroy()
+            self.dynamic_widgets = []
+            for row in range(1, self.entry_frame.grid_size()[1] + 1):
+                self.entry_frame.rowconfigure(row, weight=0)
+            self.entry_count = 0
+
+            # Fecha as janelas temporárias que antes eram destruídas junto com a interface
+            self.hide_tooltip(None)
+            self.fechar_paleta()
+            self.fechar_escolha_tema()
+
+            # Remove os manipuladores temporários de <Key> (placeholder e tooltip)
+            self.entry_bindings.unbind("<Key>")
+            logging.debug("Manipuladores ativos no campo de entrada: %s", self.entry_bindings.count())
+            self.entry.delete(0, 'end')
+            self.entry.configure(
+                placeholder_text="Digite o comando...",
+                placeholder_text_color=ThemeManager.theme["CTkEntry"]["placeholder_text_color"]
+            )
+            self.label.configure(text=defaultLabelText)
+            self.completions = []
+            self.entry.focus_set()
+
+            self.root.geometry(defaultGeometry)
+        except Exception as e:
+            self.show_error(f"Erro ao restaurar a interface: {e}")
+
+    def toggle_window(self, requested_at=None):
+        """
+        Alterna a visibilidade da janela. `requested_at` é o instante do atalho global,
+        usado para medir a latência até a janela aparecer.
+        """
+        try:
+            logging.debug("Alternando a visibilidade da janela...")
+            if self.visible:
+                self.hide_window(requested_at)
+            else:
+                self.show_window(requested_at)
+            logging.debug("Estado de visible alternado: %s", self.visible)
+        except Exception as e:
+            self.show_error(f"Erro ao alternar a visibilidade da janela: {e}")
+
+    def show_window(self, requested_at=None):
+        """
+        Mostra a janela e a centraliza na tela.
+        """
+        try:
+            logging.debug("Mostrando a janela...")
+            start = requested_at or time.perf_counter()
+            self.center_window()
+            self.root.deiconify()
+            self.visible = True
+            logging.debug("Mostrar janela, estado de visible: %s", self.visible)
+            self.entry.focus_force()
+            self.root.update_idletasks()
+            self.metrics.observe("launcher_window_seconds", time.perf_counter() - start, action="show")
+        except Exception as e:
+            self.show_error(f"Erro ao mostrar a janela: {e}")
+
+    def hide_window(self, requested_at=None):
+        """
+        Oculta a janela.
+        """
+        try:
+            logging.debug("Escondendo a janela...")
+            start = requested_at or time.perf_counter()
+            self.root.withdraw()
+            self.visible = False
+            self.metrics.observe("launcher_window_seconds", time.perf_counter() - start, action="hide")
+            logging.debug("Esconder janela, estado de visible: %s", self.visible)
+        except Exception as e:
+            self.show_error(f"Erro ao esconder a janela: {e}")
+
+    def handle_instance_request(self, request):
+        """
+        Atende um pedido encaminhado por outra instância (executado na thread do Tk).
+        """
+        try:
+            action = request.get("action")
+            logging.debug("Pedido de outra instância: %s", request)
+            if action == "ping":
+                return {"ok": True}
+            if action in {"show", "hide", "toggle"}:
+                getattr(self, f"{action}_window")()
+                return {"ok": True}
+            if action == "run":
+                command = str(request.get("command") or "").strip().lower()
+                if not self.command_exists(command):
+                    return {"ok": False, "message": f"Comando '{command}' não encontrado."}
+                self.mostrar_janela_para_pedidos(command)
+                self.entry.delete(0, 'end')
+                self.entry.insert(0, command)
+                self.check_exit(None)
+                return {"ok": True, "message": f"Comando '{command}' enviado."}
+            return {"ok": False, "message": f"Ação desconhecida: {action}"}
+        except Exception as e:
+            logging.error(f"Erro ao atender o pedido de outra instância: {e}")
+            return {"ok": False, "message": str(e)}
+
+    def check_exit(self, event):
+        """
+        Verifica o comando de saída e executa a ação correspondente.
+        """
+        try:
+            command = self.entry.get().strip().lower()
+            logging.debug("Comando recebido: %s", command)
+            if command == "exit":
+                self.cleanup()
+            elif command == "?":
+                self.show_commands_tooltip_handler()
+                self.entry.delete(0, 'end')
+                self.reset_input_placeholder("Digite o comando...", color="lime")
+            else:
+                start = time.perf_counter()
+                result = self.execute_command(command)
+                self.metrics.observe(
+                    "launcher_dispatch_seconds", time.perf_counter() - start,
+                    error=not result, command=self.metric_label(command)
+                )
+                if result:
+                    for name in CommandPipeline.names(command):
+                        self.completion_index.record_use(name)
+                    self.history.record(command)  # O texto completo, para ser recuperado com as setas
+                    self.history_position = None
+                    self.agendar_preaquecimento(command)
+                    self.entry.delete(0, 'end')
+                    self.entry.configure(placeholder_text="Digite o comando...")
+                    logging.debug("hideWindowAfterCommand em check_exit: %s", self.hideWindowAfterCommand)
+                    # Comandos em arquivo escondem a janela ao terminar, em finish_command_job
+                    if self.hideWindowAfterCommand and not isinstance(result, CommandJob):
+                        self.hide_window()
+                    self.hideWindowAfterCommand = True
+        except Exception as e:
+            self.show_error(f"Erro ao verificar o comando de saída: {e}")
+
+    def update_completion(self, event=None):
+        """
+        Atualiza as sugestões de comandos conforme o usuário digita.
+        """
+        try:
+            if event is not None and event.keysym in {"Return", "Tab"}:
+                return
+            query = self.entry.get()
+            start = time.perf_counter()
+            if "/" in query:
+                # Ao digitar um namespace (ex.: "rh/"), carrega os comandos dele para as sugestões
+                self.registry.ensure_loaded(query.lower())
+            self.completions = self.completion_index.complete(query)
+            elapsed = time.perf_counter() - start
+            if elapsed > completionLatencyBudget:
+                logging.debug("Sugestões para '%s' levaram %.1f ms", query, elapsed * 1000)
+
+            if self.completions:
+                self.label.configure(text="  ·  ".join(self.completions))
+            else:
+                self.label.configure(text=defaultLabelText)
+        except Exception as e:
+            self.show_error(f"Erro ao atualizar as sugestões: {e}")
+
+    def accept_completion(self, event=None):
+        """
+        Completa o campo de entrada com a primeira sugestão.
+        """
+        try:
+            if self.completions:
+                self.entry.delete(0, 'end')
+                self.entry.insert(0, self.completions[0])
+                self.update_completion()
+        except Exception as e:
+            self.show_error(f"Erro ao completar o comando: {e}")
+        return "break"  # Impede que o Tab mude o foco do campo de entrada
+
+    def index_command_descriptions(self, command_entries=None):
+        """
+        Adiciona as descrições dos comandos (por padrão, todos os já carregados) ao índice de sugestões em segundo plano.
+        """
+        for command_entry in self.registry.entries() if command_entries is None else command_entries:
+            try:
+                metadata = self.metadata_index.get(command_entry.path, command_entry.stat)
+                self.completion_index.add(command_entry.name, metadata.description)
+            except Exception as e:
+                logging.error(f"Erro ao indexar a descrição do comando '{command_entry.name}': {e}")
+        try:
+            self.metadata_index.save()
+        except Exception as e:
+            logging.error(f"Erro ao salvar o índice de metadados dos comandos: {e}")
+        self.sincronizar_atalhos()  # Os atalhos dos comandos vêm dos metadados recém-indexados
+
+    def sincronizar_atalhos(self):
+        """
+        Associa aos comandos os atalhos globais declarados nos comandos de link e nos arquivos já indexados.
+        """
+        try:
+            bindings = {}
+            for template in self.link_manifest.templates():
+                if template.hotkey:
+                    bindings[template.hotkey] = (template.name, functools.partial(self.executar_atalho, template.name))
+            for command_entry in self.registry.entries():
+                metadata = self.metadata_index.peek(command_entry.path, command_entry.stat)
+                if metadata and metadata.hotkey:
+                    bindings.setdefault(
+                        metadata.hotkey, (command_entry.name, functools.partial(self.executar_atalho, command_entry.name))
+                    )
+            self.hotkeys.replace("comandos", bindings)
+        except Exception as e:
+            logging.error(f"Erro ao sincronizar os atalhos globais: {e}")
+
+    def executar_atalho(self, command, requested_at):
+        """
+        Executa o comando de um atalho global (na thread do Tk) sem passar pela janela.
+        Apenas comandos de link que pedem valores mostram a janela, já com o campo do valor.
+        Retorna o resultado de execute_command (o job, no caso de arquivos de comando).
+        """
+        try:
+            self.mostrar_janela_para_pedidos(command, requested_at)
+            result = self.execute_command(command)
+            if not result:
+                self.show_window()  # Mostra o erro deixado no campo de entrada
+                return result
+            self.completion_index.record_use(command)
+            self.history.record(command)
+            self.agendar_preaquecimento(command)
+            self.hideWindowAfterCommand = True
+            return result
+        except Exception as e:
+            self.show_error(f"Erro ao executar o atalho do comando '{command}': {e}")
+            return None
+
+    def mostrar_janela_para_pedidos(self, command, requested_at=None):
+        """
+        Mostra a janela escondida quando o comando é um link que pede valores,
+        para que o campo do valor fique visível (atalhos globais e outras instâncias).
+        """
+        template = self.link_manifest.get(command)
+        if template is not None and template.prompts and not self.visible:
+            self.show_window(requested_at)
+
+    def navegar_historico(self, step):
+        """
+        Recupera no campo de entrada um comando anterior (seta para cima) ou seguinte (seta para baixo).
+        O texto digitado antes da primeira seta filtra o histórico pelo prefixo, como nos terminais.
+        """
+        try:
+            if self.history_position is None:
+                if step < 0:
+                    return "break"
+                self.history_prefix = self.entry.get()
+                self.history_matches = self.history.recent(self.history_prefix.strip().lower())
+                self.history_position = -1
+            position = self.history_position + step
+            if position >= len(self.history_matches):
+                return "break"
+            self.history_position = position
+            text = self.history_prefix if position < 0 else self.history_matches[position]
+            self.entry.delete(0, 'end')
+            self.entry.insert(0, text)
+            self.entry.icursor('end')
+            self.history_text = text
+            if position < 0:
+                self.history_position = None  # De volta ao texto digitado
+        except Exception as e:
+            self.show_error(f"Erro ao navegar no histórico: {e}")
+        return "break"
+
+    def reiniciar_navegacao_historico(self, event=None):
+        """
+        Encerra a navegação no histórico quando o usuário edita o comando recuperado.
+        """
+        if self.history_position is not None and self.entry.get() != self.history_text:
+            self.history_position = None
+
+    def agendar_preaquecimento(self, last_command=None):
+        """
+        Agenda para quando a interface estiver ociosa a compilação dos comandos mais prováveis.
+        """
+        try:
+            # O histórico guarda os encadeamentos inteiros; são pré-aquecidos os comandos que eles citam
+            commands = []
+            for text in self.history.likely(last_command):
+                commands.extend(name for name in CommandPipeline.names(text) if name not in commands)
+            self.root.after_idle(self.preaquecer_comandos, commands[:historyPrewarmCount])
+        except Exception as e:
+            logging.error(f"Erro ao agendar o pré-aquecimento dos comandos: {e}")
+
+    def preaquecer_comandos(self, commands):
+        """
+        Compila um comando por vez, reagendando o restante para o próximo momento ocioso.
+        """
+        if not commands:
+            return
+        command, remaining = commands[0], commands[1:]
+        try:
+            command_entry = None if self.link_manifest.get(command) else self.registry.lookup(command)
+            if command_entry is not None:
+                self.code_cache.get(command_entry.path, command_entry.stat)
+                self.metadata_index.get(command_entry.path, command_entry.stat)
+                logging.debug("Comando pré-aquecido: %s", command)
+        except Exception as e:
+            logging.debug("Pré-aquecimento de '%s' ignorado: %s", command, e)
+        if remaining:
+            self.root.after_idle(self.preaquecer_comandos, remaining)
+
+    def open_link_with_value(self, base_url, value):
+        """
+        Abre um link no navegador substituindo um valor na URL base.
+        """
+        try:
+            logging.info("Abrindo link com valor: %s", value)
+            self.open_link(LinkTemplate.fill(base_url, value))
+        except Exception as e:
+            self.show_error(f"Erro ao abrir o link: {e}")
+
+    def execute_command(self, command):
+        """
+        Executa o comando especificado.
+        """
+        try:
+            logging.debug("Estado inicial de hideWindowAfterCommand: %s", self.hideWindowAfterCommand)
+
+            if command in self.commands:
+                logging.info("Executando comando interno: %s", command)
+                self.commands[command]()
+                self.hideWindowAfterCommand = True
+                logging.debug("Definir estado de hideWindowAfterCommand: %s", self.hideWindowAfterCommand)
+                return True
+            elif command == "cancelar":
+                self.scheduler.cancel_all()
+                self.hideWindowAfterCommand = False
+                return True
+            elif command == "stats":
+                self.mostrar_estatisticas()
+                self.hideWindowAfterCommand = False
+                return True
+            elif command == "log" or command.startswith("log "):
+                return self.alterar_nivel_log(command[len("log"):].strip())
+            elif command in {"tema", "temas", "theme", "themes"}:
+                self.criar_interface_escolha_tema()
+                
+                self.adjust_window_size()
+                self.hideWindowAfterCommand = False
+                logging.debug("Definir estado de hideWindowAfterCommand: %s", self.hideWindowAfterCommand)
+                self.root.update_idletasks()
+                return True
+            else:
+                self.wait_for_services()
+                if CommandPipeline.matches(command) or self.link_manifest.macro(command):
+                    return self.executar_encadeamento(command)
+                template = self.link_manifest.get(command)
+                if template:
+                    return self.run_link_command(template)
+                command_entry = self.registry.lookup(command)
+
+                if command_entry:
+                    return self.run_command_file(command_entry, command)
+                else:
+                    self.reset_input_placeholder(f"Comando '{command}' não encontrado", "red")
+                    suggestions = self.completion_index.complete(command, limit=1)
+                    if suggestions:
+                        self.label.configure(text=f"Você quis dizer '{suggestions[0]}'?")
+                    return False
+        except Exception as e:
+            self.show_error(f"Erro ao executar o comando: {e}")
+            return False
+
+    def alterar_nivel_log(self, name):
+        """
+        Altera o nível do log em tempo de execução (sem argumento, mostra o nível atual).
+        """
+        try:
+            self.hideWindowAfterCommand = False
+            if not name:
+                level = logging.getLevelName(logging.getLogger().getEffectiveLevel())
+                self.label.configure(text=f"Nível do log: {level}")
+                return True
+            if name not in logLevelNames:
+                self.reset_input_placeholder(f"Nível de log '{name}' inválido", "red")
+                self.label.configure(text=" · ".join(sorted(set(logLevelNames) - {"warning", "error"})))
+                return False
+            level = set_log_level(name)
+            logging.warning("Nível do log alterado para %s", level)
+            self.label.configure(text=f"Nível do log: {level}")
+            return True
+        except Exception as e:
+            self.show_error(f"Erro ao alterar o nível do log: {e}")
+            return False
+
+    def command_exists(self, command):
+        """
+        Verifica se o texto digitado corresponde a um comando interno, de link ou em arquivo.
+        """
+        if command.split(" ", 1)[0] in builtinCommands or command in self.commands:
+            return True
+        if command in {"temas", "theme", "themes"}:
+            return True
+        if CommandPipeline.matches(command):
+            return True  # Os comandos do encadeamento são conferidos ao executá-lo
+        self.wait_for_services()
+        if self.link_manifest.get(command) is not None or self.link_manifest.macro(command) is not None:
+            return True
+        return self.registry.lookup(command) is not None
+
+    def metric_label(self, command):
+        """
+        Retorna o rótulo do comando nas métricas; nomes desconhecidos são agrupados
+        para que o texto digitado não crie uma série nova a cada erro de digitação.
+        """
+        name = command.split(" ", 1)[0]
+        if name in builtinCommands:
+            return name
+        if CommandPipeline.matches(command):
+            return "(encadeamento)"
+        return command if self.command_exists(command) else "(desconhecido)"
+
+    def run_link_command(self, template):
+        """
+        Executa um comando de link: abre a URL ou, se ela tiver campos, pede os valores.
+        """
+        try:
+            logging.info("Executando comando de link: %s", template.name)
+            if not template.prompts:
+                self.open_link(template.render({}))
+                return True
+            self.pedir_valor_link(template, {})
+            self.hideWindowAfterCommand = False
+            return True
+        except Exception as e:
+            self.show_error(f"Erro ao executar o comando de link '{template.name}': {e}")
+            return False
+
+    def pedir_valor_link(self, template, values):
+        """
+        Cria o campo de entrada para o próximo valor pedido pelo comando de link.
+        """
+        prompt = template.prompts[len(values)]
+        label = prompt.label + (" (um ou mais)" if template.bulk else "")
+        widgets = self.create_new_entry(
+            label,
+            prompt.color,
+            lambda value: self.receber_valor_link(template, values, prompt, value, widgets)
+        )
 
-    def setup_interface(self):
+    def receber_valor_link(self, template, values, prompt, value, widgets):
         """
-        Configura a interface inicial da aplicação.
+        Valida o valor digitado e abre o link quando todos os valores foram informados.
+        Valores inválidos são indicados no rótulo do campo, sem abrir o link.
         """
         try:
-            logging.debug("Configurando a interface...")
-            for widget in self.root.winfo_children():
-                widget.destroy()
-
-            self.background_frame = customtkinter.CTkFrame(self.root)#, bg="#646464")
-            self.background_frame.pack(fill="both", expand=True, padx=1, pady=1)
+            if not value:
+                return
+            if template.bulk:
+                self.abrir_links_em_massa(template, value, widgets)
+                return
+            try:
+                value = template.normalize(prompt.name, value)
+            except ValueError as e:
+                logging.info("Valor recusado pelo comando de link '%s': %s", template.name, e)
+                self.mostrar_valores_invalidos(widgets, prompt, "inválido")
+                return
+            values = dict(values, **{prompt.name: value})
+            if len(values) < len(template.prompts):
+                self.pedir_valor_link(template, values)
+                return
+            self.recent_links.add((template.name, tuple(sorted(values.items()))))
+            self.open_link_and_reset(template.render(values))
+        except Exception as e:
+            self.show_error(f"Erro ao abrir o link do comando '{template.name}': {e}")
 
-            self.content_frame = customtkinter.CTkFrame(self.background_frame)#, bg="#1d1f21")
-            self.content_frame.pack(fill="both", expand=True, padx=0, pady=0)
+    def abrir_links_em_massa(self, template, text, widgets):
+        """
+        Abre um link para cada valor colado, descartando os repetidos e os abertos recentemente.
+        Se houver valores inválidos, eles permanecem no campo para correção.
+        """
+        prompt = template.prompts[0]
+        values, invalid = template.split_bulk(text)
+        opened = skipped = 0
+        for value in values:
+            key = (template.name, ((prompt.name, value),))
+            if key in self.recent_links:
+                skipped += 1
+                continue
+            self.recent_links.add(key)
+            self.open_link(template.render({prompt.name: value}))  # O despachante limita a taxa de abertura
+            opened += 1
+        logging.info(
+            "Modo em massa de '%s': %d abertos, %d recentes, %d inválidos", template.name, opened, skipped, len(invalid)
+        )
+        if not invalid:
+            self.reset_after_link()
+            return
+        summary = f"{opened} abertos" + (f", {skipped} já abertos há pouco" if skipped else "")
+        self.mostrar_valores_invalidos(widgets, prompt, f"{summary}; {len(invalid)} inválidos:", invalid)
 
-            self.content_frame.columnconfigure(0, weight=1)
-            self.content_frame.rowconfigure(1, weight=1)
+    def mostrar_valores_invalidos(self, widgets, prompt, message, invalid=None):
+        """
+        Mostra o erro no rótulo do campo e, no modo em massa, deixa apenas os valores inválidos no campo.
+        """
+        if widgets is None:
+            self.show_error(message)
+            return
+        label, entry = widgets
+        label.configure(text=f"{prompt.label}: {message}", text_color="red")
+        if invalid is not None:
+            entry.delete(0, "end")
+            entry.insert(0, ", ".join(invalid))
+        entry.select_range(0, "end")
+        entry.focus_force()
 
-            self.label = customtkinter.CTkLabel(
-                self.content_frame,
-                text="\u00AF\\_(\u30C4)_/\u00AF",
-                font=("Arial", 16)#,
-                #text_color="white"
-            )
-            #if 
-            self.label.grid(row=0, column=0, pady=(10, 5), sticky="ew")
+    def executar_encadeamento(self, text):
+        """
+        Executa um encadeamento (`folgas & plantao ; in 123`) ou uma macro do links.json.
+        A interface é restaurada e a janela escondida uma única vez, ao final de todos os passos.
+        """
+        try:
+            macros = {macro.name: macro.steps for macro in self.link_manifest.macros()}
+            pipeline = CommandPipeline(text, macros)
+        except ValueError as e:
+            self.reset_input_placeholder(f"Encadeamento inválido: {e}", "red")
+            return False
+        logging.info("Executando encadeamento de %s comandos: %s", len(pipeline.steps), text)
+        self.hideWindowAfterCommand = False  # Quem esconde a janela é concluir_encadeamento
+        self.avancar_encadeamento(pipeline)
+        return True
 
-            self.entry_frame = customtkinter.CTkFrame(self.content_frame, height=defaultHeight)#, bg="#1d1f21")
-            self.entry_frame.grid(row=1, column=0, padx=10, pady=(5, 10), sticky="nsew")
-            self.entry_frame.columnconfigure(0, weight=1)
+    def avancar_encadeamento(self, pipeline):
+        """
+        Inicia os passos cujas dependências terminaram e conclui o encadeamento quando não resta nenhum.
+        """
+        while True:
+            ready = pipeline.ready()
+            if not ready:
+                break
+            for step in ready:
+                self.iniciar_passo(pipeline, step)
+        if pipeline.done and not pipeline.reported:
+            pipeline.reported = True
+            self.concluir_encadeamento(pipeline)
 
-            self.entry = customtkinter.CTkEntry(
-                self.entry_frame, placeholder_text="Digite o comando...", fg_color="#282a2e", text_color="white"
+    def iniciar_passo(self, pipeline, step):
+        """
+        Inicia um passo: links são abertos na hora e arquivos de comando vão para o pool de jobs.
+        """
+        started = time.perf_counter()
+        name, _, arguments = step.command.partition(" ")
+        try:
+            template = self.link_manifest.get(name)
+            if template is not None:
+                urls, invalid = template.urls_for(arguments.split())
+                for url in urls:
+                    self.open_link(url)
+                message = f"inválidos: {', '.join(invalid)}" if invalid else ""
+                pipeline.finish(step, "failed" if invalid else "done", time.perf_counter() - started, message)
+                return
+            if name in builtinCommands or step.command in self.commands:
+                raise ValueError("comandos internos não podem ser encadeados")
+            command_entry = self.registry.lookup(step.command)
+            if command_entry is None:
+                raise ValueError("comando não encontrado")
+            job = self.run_command_file(
+                command_entry, step.command, on_done=lambda job: self.concluir_passo(pipeline, step, job)
             )
-            self.entry.grid(row=0, column=0, sticky="nsew")
-            self.entry.bind("<Return>", self.check_exit)
-            self.entry.focus_set()
-
-            self.entry_count = 0  # Initialize/Reset entry count
-
-            self.root.update_idletasks()
-            self.root.geometry(f"{defaultWidth}x{defaultHeight}")
+            if not job:
+                raise ValueError("não foi possível enviar o comando")
         except Exception as e:
-            self.show_error(f"Erro ao configurar a interface: {e}")
+            pipeline.finish(step, "failed", time.perf_counter() - started, str(e))
 
-    def toggle_window(self):
+    def concluir_passo(self, pipeline, step, job):
         """
-        Alterna a visibilidade da janela.
+        Registra, na thread da interface, o resultado do arquivo de comando de um passo e continua o encadeamento.
         """
         try:
-            logging.debug("Alternando a visibilidade da janela...")
-            if self.visible:
-                self.hide_window()
+            if job.state != "cancelled":
+                self.metrics.observe(
+                    "launcher_command_seconds", job.elapsed,
+                    error=job.state in {"failed", "timeout"}, command=job.name
+                )
+            if job.state == "done":
+                if not job.result.hideWindowAfterCommand:
+                    pipeline.hide_window = False
+                pipeline.finish(step, "done", job.elapsed)
             else:
-                self.show_window()
-            logging.debug(f"Estado de visible alternado: {self.visible}")
+                message = str(job.error) if job.error else {"timeout": "tempo limite excedido"}.get(job.state, job.state)
+                pipeline.finish(step, "failed", job.elapsed, message)
         except Exception as e:
-            self.show_error(f"Erro ao alternar a visibilidade da janela: {e}")
+            pipeline.finish(step, "failed", job.elapsed, str(e))
+        self.avancar_encadeamento(pipeline)
 
-    def show_window(self):
+    def concluir_encadeamento(self, pipeline):
         """
-        Mostra a janela e a centraliza na tela.
+        Restaura a interface uma única vez e mostra o resumo com o resultado e a duração de cada passo.
         """
         try:
-            logging.debug("Mostrando a janela...")
-            self.center_window()
-            self.root.deiconify()
-            self.visible = True
-            logging.debug(f"Mostrar janela, estado de visible: {self.visible}")
-            self.entry.focus_force()
+            summary = pipeline.summary()
+            logging.info("Encadeamento concluído: %s", summary)
+            # Não descarta o que o usuário começou a digitar enquanto os comandos rodavam
+            if not self.entry.get():
+                self.setup_interface()
+            self.label.configure(text=summary.splitlines()[0])
+            if pipeline.failed:
+                if not self.visible:
+                    self.show_window()
+                self.show_windows_tooltip(summary)
+                self.entry_bindings.bind("<Key>", "hide_tooltip", self.hide_tooltip, once=True)
+            elif pipeline.hide_window:
+                self.hide_window()
         except Exception as e:
-            self.show_error(f"Erro ao mostrar a janela: {e}")
+            self.show_error(f"Erro ao concluir o encadeamento: {e}")
 
-    def hide_window(self):
+    def mostrar_estatisticas(self):
         """
-        Oculta a janela.
+        Mostra um tooltip com os comandos mais lentos (p50, p95 e p99) desta sessão.
         """
         try:
-            logging.debug("Escondendo a janela...")
-            self.root.withdraw()
-            self.visible = False
-            logging.debug(f"Esconder janela, estado de visible: {self.visible}")
+            rows = {}
+            for metric in ("launcher_dispatch_seconds", "launcher_command_seconds"):
+                # O tempo de execução do arquivo substitui o tempo de envio para o pool
+                for labels, histogram in self.metrics.histograms(metric):
+                    rows[labels["command"]] = histogram
+            slowest = sorted(rows.items(), key=lambda item: item[1].quantile(0.95), reverse=True)[:statsLimit]
+            lines = ["Comandos mais lentos (p50 / p95 / p99):", ""]
+            for name, histogram in slowest:
+                lines.append(
+                    f"{name}: {histogram.quantile(0.5) * 1000:.0f} / {histogram.quantile(0.95) * 1000:.0f} / "
+                    f"{histogram.quantile(0.99) * 1000:.0f} ms ({histogram.count}x, {histogram.errors} erros)"
+                )
+            if not slowest:
+                lines.append("Nenhum comando executado ainda.")
+            for labels, histogram in self.metrics.histograms("launcher_window_seconds"):
+                lines.append(f"janela ({labels['action']}): p95 {histogram.quantile(0.95) * 1000:.0f} ms")
+            for labels, histogram in self.metrics.histograms("launcher_hotkey_seconds"):
+                lines.append(f"atalho {labels['hotkey']} ({labels['action']}): p95 {histogram.quantile(0.95) * 1000:.0f} ms")
+            self.show_windows_tooltip("\n".join(lines))
+            self.entry_bindings.bind("<Key>", "hide_tooltip", self.hide_tooltip, once=True)
         except Exception as e:
-            self.show_error(f"Erro ao esconder a janela: {e}")
+            self.show_error(f"Erro ao mostrar as estatísticas: {e}")
 
-    def check_exit(self, event):
+    def run_command_file(self, command_entry, command, on_done=None):
         """
-        Verifica o comando de saída e executa a ação correspondente.
+        Envia um arquivo de comando para execução fora da thread da interface.
+        `on_done(job)` substitui a conclusão padrão (finish_command_job), como nos encadeamentos.
         """
         try:
-            command = self.entry.get().strip().lower()
-            logging.debug(f"Comando recebido: {command}")
-            if command == "exit":
-                self.cleanup()
-            elif command == "?":
-                self.show_commands_tooltip_handler()
-                self.entry.delete(0, 'end')
-                self.reset_input_placeholder("Digite o comando...", color="lime")
-            else:
-                if self.execute_command(command):
-                    self.entry.delete(0, 'end')
-                    self.entry.configure(placeholder_text="Digite o comando...")
-                    logging.debug(f"hideWindowAfterCommand em check_exit: {self.hideWindowAfterCommand}")
-                    if self.hideWindowAfterCommand:
-                        self.hide_window()
-                    self.hideWindowAfterCommand = True
+            logging.debug("Executando arquivo de comando: %s", command_entry.path)
+            metadata = self.metadata_index.peek(command_entry.path, command_entry.stat)
+            timeout = metadata.timeout if metadata and metadata.timeout else jobDefaultTimeout
+
+            def run(job):
+                proxy = JobAppProxy(self, self.dispatcher, job)
+                isolation = metadata.isolation if metadata else None
+                if metadata is None:
+                    # Ainda não indexado: indexa uma única vez; as próximas execuções usam o peek
+                    try:
+                        isolation = self.metadata_index.get(command_entry.path, command_entry.stat).isolation
+                    except Exception as e:
+                        logging.warning("Metadados de '%s' indisponíveis, usando o isolamento padrão: %s", command, e)
+                if (isolation or commandIsolation) == "processo":
+                    return self.process_pool.run(job, command_entry.path, command, proxy)
+                code = self.code_cache.get(command_entry.path, command_entry.stat)
+                namespace = command_namespace(app=proxy, self=proxy, command=command, __file__=command_entry.path)
+                exec(code, namespace)
+                return proxy
+
+            return self.scheduler.submit(command, run, timeout=timeout, on_done=on_done or self.finish_command_job)
         except Exception as e:
-            self.show_error(f"Erro ao verificar o comando de saída: {e}")
+            self.show_error(f"Erro ao executar comando '{command}': {e}")
+            return False
 
-    def open_link_with_value(self, base_url, value):
+    def finish_command_job(self, job):
         """
-        Abre um link no navegador substituindo um valor na URL base.
+        Conclui, na thread da interface, a execução de um arquivo de comando.
         """
         try:
-            logging.info(f"Abrindo link com valor: {value}")
-            url = base_url.replace("REPLACEME", value)
-            webbrowser.open(url)
+            if job.state != "cancelled":
+                self.metrics.observe(
+                    "launcher_command_seconds", job.elapsed,
+                    error=job.state in {"failed", "timeout"}, command=job.name
+                )
+            if job.state == "done":
+                logging.debug("hideWindowAfterCommand após exec: %s", job.result.hideWindowAfterCommand)
+                # Não descarta o que o usuário começou a digitar enquanto o comando rodava
+                if not self.entry.get():
+                    self.setup_interface()
+                if job.result.hideWindowAfterCommand:
+                    self.hide_window()
+            elif job.state == "failed":
+                self.show_error(f"Erro ao executar comando '{job.name}': {job.error}", job.error)
+            elif job.state == "timeout":
+                self.reset_input_placeholder(f"Comando '{job.name}' excedeu o tempo limite", "orange")
+            elif job.state == "cancelled":
+                self.reset_input_placeholder(f"Comando '{job.name}' cancelado", "orange")
         except Exception as e:
-            self.show_error(f"Erro ao abrir o link: {e}")
+            self.show_error(f"Erro ao concluir o comando '{job.name}': {e}")
 
-    def execute_command(self, command):
+    def update_jobs_indicator(self, jobs):
         """
-        Executa o comando especificado.
+        Atualiza o indicador de comandos em execução.
         """
         try:
-            logging.debug(f"Estado inicial de hideWindowAfterCommand: {self.hideWindowAfterCommand}")
-
-            if command in self.commands:
-                logging.info(f"Executando comando interno: {command}")
-                self.commands[command]()
-                self.hideWindowAfterCommand = True
-                logging.debug(f"Definir estado de hideWindowAfterCommand: {self.hideWindowAfterCommand}")
-                return True
-            elif command == "in":
-                logging.info("Criando nova entrada para comando 'in'")
-                self.create_new_entry(
-                    "CNPJ",
-                    "cyan",
-                    lambda value: self.open_link_with_value_and_reset(
-                        "https://intranet.lzt.com.br/cliente/pesquisar/REPLACEME",
-                        value
-                    )
-                )
-            elif command in {"tema", "temas", "theme", "themes"}:
-                self.criar_interface_escolha_tema()
-                
-                self.adjust_window_size()
-                self.hideWindowAfterCommand = False
-                logging.debug(f"Definir estado de hideWindowAfterCommand: {self.hideWindowAfterCommand}")
-                self.root.update_idletasks()
-                return True
+            if jobs:
+                self.jobs_label.configure(text=f"\u23F3 {len(jobs)}")
+                self.jobs_label.place(relx=1.0, x=-8, y=2, anchor="ne")
             else:
-                accepted_extensions = ["py", "txt"]
-                command_file = None
-                for ext in accepted_extensions:
-                    potential_file = os.path.join(commands_dir, f"{command}.{ext}")
-                    logging.debug(f"Verificando arquivo: {potential_file}")
-                    if os.path.isfile(potential_file):
-                        command_file = potential_file
-                        break
-
-                if command_file:
-                    try:
-                        logging.debug(f"Executando arquivo de comando: {command_file}")
-                        with open(command_file, "r", encoding="utf-8") as file:
-                            exec(file.read().encode().decode('utf-8'))
-                        logging.debug(f"hideWindowAfterCommand após exec: {self.hideWindowAfterCommand}")
-                        self.setup_interface()
-                        return True
-                    except Exception as e:
-                        self.show_error(f"Erro ao executar comando '{command}': {e}")
-                        return False
-                else:
-                    self.reset_input_placeholder(f"Comando '{command}' não encontrado", "red")
-                    return False
+                self.jobs_label.place_forget()
         except Exception as e:
-            self.show_error(f"Erro ao executar o comando: {e}")
-            return False
+            self.show_error(f"Erro ao atualizar o indicador de comandos: {e}")
 
     def criar_interface_escolha_tema(self):
         """
@@ -372,7 +5438,7 @@ class AlwaysOnTopApp:
             )
             botao_sair_tema.pack(pady=(20, 10))
 
-            # Inicia o processo de ancoragem
+            # Ancora a janela de temas à janela principal
             self.ancorar_janela_tema()
             
             self.reset_input_placeholder()
@@ -389,13 +5455,11 @@ class AlwaysOnTopApp:
         try:
             # Verifica se a janela de escolha de temas ainda existe
             if hasattr(self, 'escolha_tema_main_window') and self.escolha_tema_main_window.winfo_exists():
-                # Obtém a posição da janela principal
-                x = self.root.winfo_x() - self.root.winfo_width() + 75 # Deslocamento horizontal
-                y = self.root.winfo_y()  # Mesma posição vertical
-                self.escolha_tema_main_window.geometry(f"+{x}+{y}")
-
-                # Continua atualizando
-                self.root.after(100, self.ancorar_janela_tema)
+                # À esquerda da janela principal, na mesma posição vertical
+                AttachedPopup(
+                    self.root, self.root_bindings, self.escolha_tema_main_window,
+                    lambda root: (root.winfo_x() - root.winfo_width() + 75, root.winfo_y())
+                )
         except Exception as e:
             self.show_error(f"Erro ao ancorar janela de escolha de temas: {e}")
 
@@ -426,12 +5490,8 @@ class AlwaysOnTopApp:
         """
         try:
             logging.debug("Obtendo temas disponíveis...")
-            themes = []
-            for file in os.listdir(theme_dir):
-                if file.endswith(".json"):
-                    themes.append(file.split('.')[0])
-                    
-            return themes
+            self.wait_for_services()
+            return self.theme_cache.custom_names()
         except Exception as e:
             logging.error(f"Erro ao obter temas disponíveis: {e}")
             self.show_error(f"Erro ao obter temas disponíveis: {e}")
@@ -443,36 +5503,82 @@ class AlwaysOnTopApp:
         """
         try:
             
+            logging.debug("Aplicando novo tema: %s", tema)
+            self.wait_for_services()
+            source, theme = self.theme_cache.get(tema)
             self.tema_atual = tema
-            logging.debug(f"Aplicando novo tema: {tema}")
-            if tema == "theme":
-                customtkinter.set_default_color_theme(theme_path)
-            elif tema in {"blue", "green", "dark-blue"}:
-                customtkinter.set_default_color_theme(tema)
-            else:
-                customtkinter.set_default_color_theme(f"{theme_dir}/{tema}.json")
-                
-            self.root.update_idletasks()
-            
-            self.setup_interface()
-            self.criar_interface_escolha_tema()
 
-            logging.debug(f"Tema atual: {ThemeManager._currently_loaded_theme}")
+            previous_theme = ThemeManager.theme
+            ThemeManager.theme = copy.deepcopy(theme)
+            ThemeManager._currently_loaded_theme = source
+
+            # Recolore os widgets existentes em vez de reconstruir a interface
+            self.recolor_widgets(self.root, previous_theme, ThemeManager.theme)
+
+            logging.debug("Tema atual: %s", ThemeManager._currently_loaded_theme)
         except Exception as e:
             self.show_error(f"Erro ao aplicar o novo tema: {e}")
 
+    def recolor_widgets(self, widget, previous_theme, new_theme, parent_frame_key=None):
+        """
+        Aplica as cores do novo tema nos widgets existentes, recursivamente.
+
+        Apenas as opções que ainda estão com o valor do tema anterior são alteradas,
+        preservando as cores definidas explicitamente (ex.: mensagens em vermelho).
+        """
+        section = self.theme_section(widget)
+        frame_key = None
+        if section:
+            for option in themeWidgetOptions[section]:
+                key = option
+                if section == "CTkFrame" and option == "fg_color" and parent_frame_key == "fg_color":
+                    # Frames dentro de outro frame com a cor do tema usam "top_fg_color"
+                    key = "top_fg_color"
+                try:
+                    current = widget.cget(option)
+                except (ValueError, tkinter.TclError):
+                    continue
+                themed = self.same_color(current, previous_theme[section].get(key))
+                if section == "CTkFrame" and option == "fg_color":
+                    frame_key = key if themed else None
+                if themed and key in new_theme[section]:
+                    widget.configure(**{option: new_theme[section][key]})
+
+        if section in {"CTk", "CTkToplevel", "CTkFrame"}:
+            for child in widget.winfo_children():
+                self.recolor_widgets(child, previous_theme, new_theme, frame_key)
+
+    @staticmethod
+    def theme_section(widget):
+        """
+        Retorna a seção do tema correspondente ao widget (ou None).
+        """
+        for section in ("CTkToplevel", "CTk", "CTkFrame", "CTkButton", "CTkLabel", "CTkEntry"):
+            if isinstance(widget, getattr(customtkinter, section)):
+                return section
+        return None
+
+    @staticmethod
+    def same_color(current, theme_value):
+        """
+        Compara uma cor configurada com a cor do tema, ignorando lista ou tupla.
+        """
+        if isinstance(current, (list, tuple)) and isinstance(theme_value, (list, tuple)):
+            return list(current) == list(theme_value)
+        return current == theme_value
+
     def reset_input_placeholder(self, message="", color=None):
         """
         Reseta o placeholder do campo de entrada com uma mensagem.
         """
         try:
-            logging.debug(f"Resetando placeholder do campo de entrada: {message}")
+            logging.debug("Resetando placeholder do campo de entrada: %s", message)
             self.entry.delete(0, 'end')
             if color in {""," ","reset",None}: 
                 self.entry.configure(placeholder_text=message)
             else:
                 self.entry.configure(placeholder_text=message, placeholder_text_color=color)
-            self.entry.bind("<Key>", self.reset_input_handler, add="+")
+            self.entry_bindings.bind("<Key>", "reset_input", self.reset_input_handler, once=True)
         except Exception as e:
             self.show_error(f"Erro ao resetar o placeholder: {e}")
 
@@ -483,9 +5589,11 @@ class AlwaysOnTopApp:
         try:
             logging.debug("Resetando campo de entrada...")
             self.setup_interface()
-            self.entry.insert(0, event.char)
+            if event.char and event.char.isprintable():
+                self.entry.insert('end', event.char)
         except Exception as e:
             self.show_error(f"Erro ao resetar o campo de entrada: {e}")
+        return "break"  # O caractere já foi inserido; evita que o Entry o insira novamente
 
 
 
@@ -494,43 +5602,72 @@ class AlwaysOnTopApp:
         Abre o link especificado no navegador padrão.
         """
         try:
-            logging.info(f"Abrindo link: {url}")
-            webbrowser.open(url)
+            logging.info("Abrindo link: %s", url)
+            requested_at = time.perf_counter()
+            # O navegador é chamado pelo despachante; o resultado volta para a thread da interface
+            self.browser.open(
+                url, lambda url, error: self.dispatcher.post(self.on_link_opened, url, error, requested_at)
+            )
         except Exception as e:
             self.show_error(f"Erro ao abrir o link: {e}")
 
+    def on_link_opened(self, url, error, requested_at):
+        """
+        Recebe, na thread da interface, o resultado da abertura de um link.
+        """
+        self.metrics.observe("launcher_browser_open_seconds", time.perf_counter() - requested_at, error is not None)
+        if error is not None:
+            self.show_error(f"Erro ao abrir o link {url}: {error}", error)
+        else:
+            logging.debug("Link aberto em %.1f ms: %s", (time.perf_counter() - requested_at) * 1000, url)
+
     def open_link_with_value_and_reset(self, base_url, value):
         """
-        Abre um link no navegador substituindo um valor na URL base e reseta a interface.
+        Abre um link no navegador preenchendo o campo da URL base e reseta a interface.
+        """
+        try:
+            logging.info("Abrindo link com valor e resetando: %s", value)
+            self.open_link_and_reset(LinkTemplate.fill(base_url, value))
+        except Exception as e:
+            self.show_error(f"Erro ao abrir o link e resetar a interface: {e}")
+
+    def open_link_and_reset(self, url):
+        """
+        Abre um link no navegador e reseta a interface.
+        """
+        self.open_link(url)
+        self.reset_after_link()
+
+    def reset_after_link(self):
+        """
+        Reseta a interface depois de abrir um link e esconde a janela, se configurado.
         """
         try:
-            logging.info(f"Abrindo link com valor e resetando: {value}")
-            self.open_link_with_value(base_url, value)
             self.setup_interface()
             self.root.geometry(defaultGeometry)
             self.center_window()
             if self.hideWindowAfterCommand:
                 self.hide_window()
-            logging.debug(f"hideWindowAfterCommand em open_link_with_value_and_reset: {self.hideWindowAfterCommand}")
+            logging.debug("hideWindowAfterCommand em reset_after_link: %s", self.hideWindowAfterCommand)
         except Exception as e:
-            self.show_error(f"Erro ao abrir o link e resetar a interface: {e}")
+            self.show_error(f"Erro ao resetar a interface após abrir o link: {e}")
 
     def open_file(self, file_path=script_dir):
         """
         Abre o arquivo especificado.
         """
         try:
-            logging.info(f"Abrindo arquivo: {file_path}")
+            logging.info("Abrindo arquivo: %s", file_path)
             os.startfile(file_path)
         except Exception as e:
             self.show_error(f"Erro ao abrir o arquivo: {e}")
 
     def create_new_entry(self, labelText, labelColor="white", command=None):
         """
-        Cria uma nova entrada com um rótulo especificado.
+        Cria uma nova entrada com um rótulo especificado e retorna o rótulo e o campo criados.
         """
         try:
-            logging.info(f"Criando nova entrada: {labelText}")
+            logging.info("Criando nova entrada: %s", labelText)
             # Create a new label for the entry
             new_label = customtkinter.CTkLabel(
                 self.entry_frame, text=labelText, font=("Arial", 16), text_color=labelColor
@@ -548,14 +5685,17 @@ class AlwaysOnTopApp:
             else:
                 new_entry.bind("<Return>", self.check_exit)
             new_entry.grid(row=self.entry_count * 2 + 2, column=0, padx=10, pady=(5, 10), sticky="ew")
+            self.dynamic_widgets.extend((new_label, new_entry))
 
             self.entry_count += 1  # Increment entry count
             self.adjust_window_size()
             self.entry_frame.rowconfigure(self.entry_count * 2 + 2, weight=1)  # Ensure new row is configured
             self.root.update_idletasks()
             new_entry.focus_force()
+            return new_label, new_entry
         except Exception as e:
             self.show_error(f"Erro ao criar nova entrada: {e}")
+            return None
 
     def adjust_window_size(self):
         """
@@ -586,10 +5726,21 @@ class AlwaysOnTopApp:
         """
         try:
             logging.info("Limpando e encerrando a aplicação...")
+            if self.instance_server is not None:
+                self.instance_server.stop()
+            self.hotkeys.stop()
+            self.history.close()
+            self.scheduler.shutdown()
+            self.process_pool.stop()
+            self.browser.close()
+            self.metrics.stop()
+            self.registry.stop()
+            self.theme_cache.stop()
             self.root.destroy()
-            icon.visible = False
-            icon.stop()
-            logging.debug(f"Limpeza da aplicação, estado de visible: {self.visible}")
+            if icon is not None:
+                icon.visible = False
+                icon.stop()
+            logging.debug("Limpeza da aplicação, estado de visible: %s", self.visible)
         except Exception as e:
             logging.error(f"Erro ao limpar a aplicação: {e}")
 
@@ -599,38 +5750,79 @@ class AlwaysOnTopApp:
         """
         try:
             logging.debug("Listando comandos disponíveis...")
-            commands_list = []
-            for file in os.listdir(commands_dir):
-                if file.endswith(".py") or file.endswith(".txt"):
-                    command_name = file.split('.')[0]
-                    docstring = self.get_command_docstring(os.path.join(commands_dir, file))
-                    commands_list.append(f"{command_name} - {docstring}")
-            return commands_list
+            return [line for _, line in self.command_rows()]
         except Exception as e:
             self.show_error(f"Erro ao listar comandos: {e}")
             return []
 
+    def command_rows(self):
+        """
+        Retorna os pares (nome, linha descritiva) dos comandos do diretório de comandos.
+        """
+        self.wait_for_services()
+        self.registry.load_all()  # A listagem completa inclui os namespaces ainda não usados
+        rows = []
+        for template in self.link_manifest.templates():
+            line = f"{template.name} - {template.description}"
+            if template.prompts:
+                line += f" ({', '.join(prompt.name for prompt in template.prompts)})"
+            if template.tags:
+                line += f" [{', '.join(template.tags)}]"
+            rows.append((template.name, line))
+        for macro in self.link_manifest.macros():
+            rows.append((macro.name, f"{macro.name} - {macro.description} [macro: {macro.steps}]"))
+        for command_entry in self.registry.entries():
+            try:
+                metadata = self.metadata_index.get(command_entry.path, command_entry.stat)
+            except Exception as e:
+                logging.error(f"Erro ao obter os metadados do comando {command_entry.name}: {e}")
+                rows.append((command_entry.name, f"{command_entry.name} - Erro ao obter descrição"))
+                continue
+            line = f"{command_entry.name} - {metadata.description}"
+            if metadata.parameters:
+                line += f" ({', '.join(metadata.parameters)})"
+            if metadata.tags:
+                line += f" [{', '.join(metadata.tags)}]"
+            rows.append((command_entry.name, line))
+        self.metadata_index.save()
+        return rows
+
+    def on_commands_changed(self, added, removed, changed):
+        """
+        Atualiza os caches e o índice de sugestões com os comandos adicionados, removidos ou alterados.
+        Chamado pela thread de monitoramento do registro de comandos ou, quando um namespace
+        é carregado sob demanda, pela thread que fez a busca (possivelmente a da interface).
+        """
+        for command_entry in removed + changed:
+            self.code_cache.invalidate(command_entry.path)
+        self.metadata_index.discard(command_entry.path for command_entry in removed)
+
+        for command_entry in removed:
+            if command_entry.name not in builtinCommands:
+                self.completion_index.remove(command_entry.name)
+        if removed:
+            self.sincronizar_atalhos()
+
+        # Os nomes entram no índice de sugestões imediatamente; as descrições que ainda
+        # não estão no índice de metadados são lidas do disco em segundo plano
+        unindexed = []
+        for command_entry in added + changed:
+            metadata = self.metadata_index.peek(command_entry.path, command_entry.stat)
+            self.completion_index.add(command_entry.name, metadata.description if metadata else "")
+            if metadata is None:
+                unindexed.append(command_entry)
+        if unindexed:
+            threading.Thread(
+                target=self.index_command_descriptions, args=(unindexed,), name="CommandDescriptions", daemon=True
+            ).start()
+
     def get_command_docstring(self, file_path):
         """
         Extrai a docstring do arquivo de comando especificado.
         """
         try:
-            logging.debug(f"Obtendo docstring do comando: {file_path}")
-            with open(file_path, "r", encoding="utf-8") as file:
-                lines = file.readlines()
-                docstring_started = False
-                docstring = ""
-                for line in lines:
-                    if '"""' in line:
-                        if docstring_started:
-                            docstring += line.split('"""')[0].strip()
-                            break
-                        else:
-                            docstring_started = True
-                            docstring = line.split('"""')[1].strip()
-                    elif docstring_started:
-                        docstring += " " + line.strip()
-                return docstring if docstring else "[Sem descrição]"
+            logging.debug("Obtendo docstring do comando: %s", file_path)
+            return self.metadata_index.get(file_path).description
         except Exception as e:
             logging.error(f"Erro ao obter a docstring dos comandos: {e}")
             self.show_error(f"Erro ao obter a docstring: {e}")
@@ -638,18 +5830,42 @@ class AlwaysOnTopApp:
 
     def show_commands_tooltip_handler(self):
         """
-        Mostra um tooltip com a lista de comandos disponíveis.
+        Abre a paleta de comandos disponíveis.
         """
         try:
-            logging.info("Mostrando tooltip de comandos disponíveis...")
-            commands = self.list_commands()
-            tooltip_text = "Comandos disponíveis:\n\n" + "\n".join(commands)
-            self.show_windows_tooltip(tooltip_text)
-            self.entry.bind("<Key>", self.hide_tooltip, add="+")
-            logging.debug(f"Estado de visibilidade do tooltip: {hasattr(self, 'tooltip')}")
+            logging.info("Abrindo a paleta de comandos...")
+            if self.command_palette is not None:
+                self.command_palette.search.focus_force()
+                return
+            with self.metrics.timer("launcher_palette_render_seconds"):
+                entries = [(name, f"{name} - {description}") for name, description in builtinCommands.items()]
+                entries.extend(self.command_rows())
+                self.command_palette = CommandPalette(self, entries)
         except Exception as e:
             self.show_error(f"Erro ao mostrar comandos: {e}")
 
+    def fechar_paleta(self):
+        """
+        Fecha a paleta de comandos, se estiver aberta.
+        """
+        try:
+            if self.command_palette is not None:
+                self.command_palette.close()
+        except Exception as e:
+            self.show_error(f"Erro ao fechar a paleta de comandos: {e}")
+
+    def executar_da_paleta(self, name):
+        """
+        Executa o comando escolhido na paleta como se tivesse sido digitado.
+        """
+        try:
+            logging.debug("Comando escolhido na paleta: %s", name)
+            self.entry.delete(0, 'end')
+            self.entry.insert(0, name)
+            self.check_exit(None)
+        except Exception as e:
+            self.show_error(f"Erro ao executar o comando da paleta: {e}")
+
     def show_windows_tooltip(self, text):
         """
         Mostra um tooltip na janela.
@@ -658,9 +5874,13 @@ class AlwaysOnTopApp:
             #logging.info("Mostrando tooltip na janela...")
             self.tooltip = customtkinter.CTkToplevel(self.root)
             self.tooltip.wm_overrideredirect(True)
-            self.tooltip.geometry(f"+0+0")
             label = customtkinter.CTkLabel(self.tooltip, text=text, justify='left')
             label.pack(ipadx=1)
+            # À direita da janela principal
+            AttachedPopup(
+                self.root, self.root_bindings, self.tooltip,
+                lambda root: (root.winfo_x() + root.winfo_width() + 5, root.winfo_y())
+            )
         except Exception as e:
             self.show_error(f"Erro ao mostrar tooltip: {e}")
 
@@ -673,16 +5893,128 @@ class AlwaysOnTopApp:
             if hasattr(self, 'tooltip'):
                 self.tooltip.destroy()
                 del self.tooltip
-            logging.debug(f"Estado de visibilidade do tooltip: {hasattr(self, 'tooltip')}")
+            logging.debug("Estado de visibilidade do tooltip: %s", hasattr(self, 'tooltip'))
         except Exception as e:
             self.show_error(f"Erro ao esconder tooltip: {e}")
 
+# Módulos que os comandos sempre encontraram no escopo; importados apenas quando usados
+commandLazyModules = {
+    "webbrowser": "webbrowser",
+    "keyboard": "keyboard",
+    "pystray": "pystray",
+    "Image": "PIL.Image",
+    "ImageDraw": "PIL.ImageDraw",
+    "tkinter": "tkinter",
+    "customtkinter": "customtkinter",
+}
+
+
+class LazyModule:
+    """
+    Substituto de um módulo que só o importa no primeiro acesso a um atributo.
+    """
+    def __init__(self, name):
+        """
+        Inicializa o substituto para o módulo especificado.
+        """
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        """
+        Importa o módulo, se necessário, e obtém o atributo.
+        """
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attribute)
+
+    def __repr__(self):
+        """
+        Representa o módulo ainda não importado.
+        """
+        return f"<LazyModule {self._name!r}>"
+
+
+def command_namespace(**names):
+    """
+    Monta o escopo em que um arquivo de comando é executado: as globais deste módulo,
+    os módulos que os comandos esperam encontrar (importados sob demanda) e `names`.
+    """
+    namespace = dict(globals())
+    for name, module_name in commandLazyModules.items():
+        module = sys.modules.get(module_name)
+        if module is None and namespace.get(name) is None:
+            module = LazyModule(module_name)
+        if module is not None:
+            namespace[name] = module
+    namespace.update(names)
+    return namespace
+
+
+def load_interface_modules():
+    """
+    Importa as bibliotecas da interface gráfica.
+    """
+    global tkinter, customtkinter, ThemeManager
+    import tkinter  # Importa a biblioteca tkinter para criar interfaces gráficas
+    import customtkinter  # Importa a biblioteca customtkinter para widgets personalizados
+    from customtkinter.windows.ctk_toplevel import ThemeManager  # Importado para gerenciar temas de cores
+
+def configure_logging():
+    """
+    Configura o logger. As chamadas apenas enfileiram os registros; a gravação fica
+    com a thread do QueueListener, iniciada por attach_file_logging após o primeiro
+    quadro. Até lá, a própria fila guarda as mensagens da inicialização.
+    """
+    logging.basicConfig(level=defaultLogLevel, handlers=[DeferredQueueHandler(log_queue)])
+
+def attach_file_logging():
+    """
+    Abre o arquivo de log e inicia a thread que grava as mensagens da fila.
+    """
+    global log_listener
+    formatter = logging.Formatter(logFormat, logDateFormat)
+    handlers = [logging.StreamHandler()]
+    try:
+        # Cria o diretório de logs se não existir
+        os.makedirs(log_dir, exist_ok=True)
+        handlers.append(CompressingRotatingFileHandler(log_path))
+    except Exception as e:
+        logging.error(f"Erro ao abrir o arquivo de log: {e}")
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    if log_listener is None:
+        log_listener = logging.handlers.QueueListener(log_queue, *handlers)
+        log_listener.start()
+
+def stop_logging():
+    """
+    Grava as mensagens pendentes e encerra a thread de log.
+    """
+    global log_listener
+    if log_listener is None:
+        # A aplicação terminou antes do primeiro quadro; grava o que ficou na fila
+        attach_file_logging()
+    log_listener.stop()
+    for handler in log_listener.handlers:
+        handler.close()
+    log_listener = None
+
+def set_log_level(name):
+    """
+    Altera o nível do log em tempo de execução; retorna o nome do nível aplicado.
+    """
+    level = logLevelNames[name]
+    logging.getLogger().setLevel(level)
+    return logging.getLevelName(level)
+
 def create_image(width, height, color1, color2):
     """
     Cria uma imagem para o ícone da bandeja do sistema. (fallback)
     """
     try:
         logging.info("Criando imagem para ícone da bandeja...")
+        from PIL import Image, ImageDraw  # Importado sob demanda para não atrasar a inicialização
         image = Image.new('RGB', (width, height), color1)
         dc = ImageDraw.Draw(image)
         dc.rectangle(
@@ -711,29 +6043,205 @@ def tray_thread():
     try:
         logging.info("Iniciando thread da bandeja do sistema...")
         global icon
-        icon_image = Image.open(tray_icon_path)
-        icon = pystray.Icon(
-            "App", 
-            icon_image, 
-            menu=pystray.Menu(
-                pystray.MenuItem("Exit", lambda: on_exit())
-            )   
-        )
+        with startup_profiler.phase("bandeja do sistema"):
+            # Importados nesta thread para não atrasar o primeiro quadro
+            import pystray
+            from PIL import Image
+            icon_image = Image.open(tray_icon_path)
+            icon = pystray.Icon(
+                "App", 
+                icon_image, 
+                menu=pystray.Menu(
+                    pystray.MenuItem("Exit", lambda: on_exit())
+                )   
+            )
+        tray_ready.set()
         icon.run()
     except Exception as e:
         logging.error(f"Erro ao iniciar a thread da bandeja: {e}")
 
-if __name__ == "__main__":
-    # Inicializa a aplicação e configura o ícone da bandeja do sistema.
+def register_hotkeys(app):
+    """
+    Registra o atalho global que alterna a visibilidade da janela e os atalhos dos comandos.
+    """
     try:
-        logging.info("Iniciando a aplicação...")
-        app = AlwaysOnTopApp()
+        with startup_profiler.phase("atalho global"):
+            app.hotkeys.bind(hotkeyToggle, "alternar janela", app.toggle_window)
+            app.hotkeys.start()  # Importa o keyboard após o primeiro quadro
+    except Exception as e:
+        logging.error(f"Erro ao registrar o atalho global: {e}")
+
+def on_first_frame(app, args):
+    """
+    Executada quando a janela já foi exibida: carrega o que foi adiado na inicialização.
+    """
+    try:
+        app.root.update_idletasks()
+        startup_profiler.mark("primeiro quadro")
+        logging.info("Primeiro quadro exibido em %.1f ms", startup_profiler.marks['primeiro quadro'] * 1000)
+
+        with startup_profiler.phase("arquivo de log"):
+            attach_file_logging()
+        app.start_services()
+        if app.instance_server is not None:
+            app.instance_server.serve()
 
         tray = threading.Thread(target=tray_thread, daemon=True)
         tray.start()
 
-        keyboard.add_hotkey("ctrl+capslock", app.toggle_window)
+        register_hotkeys(app)
+
+        if args.startup_profile:
+            threading.Thread(target=finish_startup_profile, args=(app,), daemon=True).start()
+    except Exception as e:
+        logging.error(f"Erro ao concluir a inicialização: {e}")
+
+def finish_startup_profile(app):
+    """
+    Aguarda os serviços em segundo plano, mostra o perfil de inicialização e encerra a aplicação.
+    """
+    app.services_ready.wait(servicesStartupTimeout)
+    tray_ready.wait(servicesStartupTimeout)
+    startup_profiler.mark("serviços prontos")
+    print(startup_profiler.report())
+    app.dispatcher.post(app.cleanup)
+
+def read_batch_commands(stream):
+    """
+    Lê os comandos de um arquivo ou da entrada padrão, um por linha, ignorando linhas vazias e comentários.
+    """
+    for line in stream:
+        command = line.strip()
+        if command and not command.startswith("#"):
+            yield command
+
+def run_batch(args):
+    """
+    Executa os comandos em lote, sem interface, e mostra o tempo e o resultado de cada um.
+    Retorna 0 se todos os comandos terminaram com sucesso.
+    """
+    logging.basicConfig(level=logging.ERROR, format=logFormat, datefmt=logDateFormat)
+    try:
+        stream = sys.stdin if args.batch == "-" else open(args.batch, "r", encoding="utf-8")
+    except OSError as e:
+        print(f"Não foi possível abrir o arquivo de comandos '{args.batch}': {e.strerror or e}", file=sys.stderr)
+        return 2
+    runner = BatchRunner(jobs=args.jobs, open_links=not args.no_browser)
+    counts = {}
+    started = time.perf_counter()
+    try:
+        runner.load()
+        for result in runner.run_all(read_batch_commands(stream)):
+            counts[result.status] = counts.get(result.status, 0) + 1
+            print(f"{result.status:<11} {result.elapsed * 1000:9.1f} ms  {result.command}  {result.message}".rstrip(), flush=True)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        runner.close()
+        runner.metadata_index.save()
+    total = sum(counts.values())
+    summary = ", ".join(f"{status}: {count}" for status, count in sorted(counts.items()))
+    print(f"{total} comandos em {time.perf_counter() - started:.3f}s ({summary or 'nenhum'})", file=sys.stderr)
+    return 0 if counts.get("done", 0) == total else 1
+
+def parse_arguments(argv=None):
+    """
+    Lê os argumentos da linha de comando.
+    """
+    parser = argparse.ArgumentParser(description="Launcher de comandos personalizados.")
+    parser.add_argument(
+        "--startup-profile",
+        action="store_true",
+        help="mede o tempo de cada fase da inicialização, mostra o relatório e encerra"
+    )
+    parser.add_argument(
+        "--batch",
+        nargs="?",
+        const="-",
+        metavar="ARQUIVO",
+        help="executa os comandos do arquivo (ou da entrada padrão), um por linha, sem abrir a interface"
+    )
+    parser.add_argument("--jobs", type=int, default=1, help="quantidade de comandos executados em paralelo no modo em lote")
+    parser.add_argument("--no-browser", action="store_true", help="no modo em lote, apenas registra os links em vez de abri-los")
+    actions = parser.add_mutually_exclusive_group()
+    actions.add_argument("--run", metavar="COMANDO", help="executa o comando na instância em execução")
+    actions.add_argument("--show", action="store_true", help="mostra a janela da instância em execução")
+    actions.add_argument("--hide", action="store_true", help="esconde a janela da instância em execução")
+    actions.add_argument("--toggle", action="store_true", help="alterna a janela da instância em execução")
+    return parser.parse_args(argv)
+
+def instance_request(args):
+    """
+    Monta o pedido para a instância em execução a partir dos argumentos.
+    """
+    if args.run:
+        return {"action": "run", "command": args.run}
+    for action in ("hide", "toggle"):
+        if getattr(args, action):
+            return {"action": action}
+    return {"action": "show"}  # Sem argumentos (ou com --show), apenas mostra a janela existente
+
+def main(argv=None):
+    """
+    Inicializa a aplicação e configura o ícone da bandeja do sistema.
+    """
+    global app
+    args = parse_arguments(argv)
+    if args.batch is not None:
+        # O modo em lote não depende da interface nem da instância em execução
+        return run_batch(args)
+    request = instance_request(args)
+
+    # Com uma instância já em execução, apenas encaminha o pedido e encerra,
+    # sem carregar a interface, a bandeja ou o hook do teclado
+    instance_server = None
+    if not args.startup_profile:
+        response = send_to_instance(request)
+        if response is not None:
+            if response.get("message"):
+                print(response["message"])
+            return 0 if response.get("ok") else 1
+
+    configure_logging()
+    try:
+        if not args.startup_profile:
+            instance_server = InstanceServer(lambda received: app.dispatcher.call(
+                app.handle_instance_request, received, timeout=instanceTimeout
+            ))
+            if not instance_server.claim():
+                if instance_server.busy:
+                    print("Outra instância do launcher está em execução, mas não respondeu a tempo", file=sys.stderr)
+                    return 1
+                # Outra instância assumiu entre a tentativa de conexão e agora
+                response = send_to_instance(request)
+                return 0 if response and response.get("ok") else 1
+
+        logging.info("Iniciando a aplicação...")
+        with startup_profiler.phase("aplicação"):
+            app = AlwaysOnTopApp()
+        app.instance_server = instance_server
+
+        # O restante da inicialização roda depois que a janela foi desenhada
+        app.root.after_idle(on_first_frame, app, args)
+        if request["action"] != "show":
+            app.root.after_idle(app.handle_instance_request, request)
 
         app.root.mainloop()
     except Exception as e:
-        logging.error(f"Erro ao iniciar a aplicação: {e}")
\ No newline at end of file
+        logging.error(f"Erro ao iniciar a aplicação: {e}")
+        print(f"Erro ao iniciar a aplicação: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if instance_server is not None:
+            instance_server.stop()
+        stop_logging()
+    return 0
+
+log_queue = queue.SimpleQueue()  # Registros de log aguardando a thread de gravação
+log_listener = None  # Thread que grava os logs, iniciada por attach_file_logging
+icon = None  # Ícone da bandeja do sistema, criado por tray_thread
+tray_ready = threading.Event()  # Sinaliza que o ícone da bandeja foi criado
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Necessário para os processos de comandos no executável do PyInstaller
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Testes do cache de código compilado dos comandos.
+
+Uso:
+    python -m unittest discover -s tests
+"""
+import os  # Importa a biblioteca os para criar os arquivos de comando e alterar o mtime
+import sys  # Importa a biblioteca sys para localizar o main.py
+import logging  # Importa a biblioteca logging para silenciar os logs da aplicação
+import tempfile  # Importa a biblioteca tempfile para os arquivos de comando
+import unittest  # Importa a biblioteca unittest para os casos de teste
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_dir)
+import main  # pylint: disable=wrong-import-position
+
+
+def setUpModule():
+    """
+    Silencia os avisos esperados.
+    """
+    logging.disable(logging.CRITICAL)
+
+
+def tearDownModule():
+    """
+    Restaura os logs.
+    """
+    logging.disable(logging.NOTSET)
+
+
+class CompiledCodeCacheTest(unittest.TestCase):
+    """
+    Invalidação por mtime/tamanho, remoção LRU e reaproveitamento do bytecode em disco.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, source, mtime_ns=None):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(source)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+        return path
+
+    def run_code(self, code):
+        namespace = {}
+        exec(code, namespace)  # pylint: disable=exec-used
+        return namespace["value"]
+
+    def test_hit_until_the_file_changes(self):
+        cache = main.CompiledCodeCache()
+        path = self.write("a.py", "value = 1\n", mtime_ns=1_000_000_000)
+        first = cache.get(path)
+        self.assertIs(cache.get(path), first)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # Mesmo tamanho, mtime diferente
+        self.write("a.py", "value = 2\n", mtime_ns=2_000_000_000)
+        self.assertEqual(self.run_code(cache.get(path)), 2)
+        # Mesmo mtime, tamanho diferente
+        self.write("a.py", "value = 30\n", mtime_ns=2_000_000_000)
+        self.assertEqual(self.run_code(cache.get(path)), 30)
+        self.assertEqual(cache.misses, 3)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = main.CompiledCodeCache(max_entries=2)
+        paths = [self.write(f"{name}.py", "value = 1\n") for name in "abc"]
+        cache.get(paths[0])
+        cache.get(paths[1])
+        cache.get(paths[0])  # "b" passa a ser o menos usado
+        cache.get(paths[2])
+        self.assertEqual(cache.stats()["entries"], 2)
+        misses = cache.misses
+        cache.get(paths[0])
+        self.assertEqual(cache.misses, misses)
+        cache.get(paths[1])
+        self.assertEqual(cache.misses, misses + 1)
+
+    def test_byte_limit(self):
+        paths = [self.write(f"{name}.py", "value = 1\n") for name in "abc"]
+        probe = main.CompiledCodeCache()
+        probe.get(paths[0])
+        size = probe.stats()["bytes"]
+
+        cache = main.CompiledCodeCache(max_bytes=size * 2)
+        for path in paths:
+            cache.get(path)
+        self.assertEqual(cache.stats()["entries"], 2)
+        self.assertEqual(cache.stats()["bytes"], size * 2)
+
+    def test_disk_cache_is_reused_and_invalidated(self):
+        disk_dir = os.path.join(self.directory.name, "bytecode")
+        path = self.write("a.py", "value = 1\n", mtime_ns=1_000_000_000)
+        main.CompiledCodeCache(disk_dir=disk_dir).get(path)
+
+        cache = main.CompiledCodeCache(disk_dir=disk_dir)
+        self.assertEqual(self.run_code(cache.get(path)), 1)
+        self.assertEqual(cache.disk_hits, 1)
+
+        self.write("a.py", "value = 2\n", mtime_ns=2_000_000_000)
+        cache = main.CompiledCodeCache(disk_dir=disk_dir)
+        self.assertEqual(self.run_code(cache.get(path)), 2)
+        self.assertEqual(cache.disk_hits, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
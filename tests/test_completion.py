@@ -0,0 +1,78 @@
+"""
+Testes do índice de sugestões: prefixos, descrições, semelhança e uso.
+
+Uso:
+    python -m unittest discover -s tests
+"""
+import os  # Importa a biblioteca os para montar o caminho do repositório
+import sys  # Importa a biblioteca sys para localizar o main.py
+import logging  # Importa a biblioteca logging para silenciar os logs da aplicação
+import unittest  # Importa a biblioteca unittest para os casos de teste
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_dir)
+import main  # pylint: disable=wrong-import-position
+
+
+def setUpModule():
+    """
+    Silencia os avisos esperados.
+    """
+    logging.disable(logging.CRITICAL)
+
+
+def tearDownModule():
+    """
+    Restaura os logs.
+    """
+    logging.disable(logging.NOTSET)
+
+
+class CompletionIndexTest(unittest.TestCase):
+    """
+    Ordenação das sugestões e atualização incremental do índice.
+    """
+    def setUp(self):
+        self.index = main.CompletionIndex()
+        self.index.add("folgas", "Abre a planilha de folgas da equipe.")
+        self.index.add("plantao", "Abre a planilha de plantões.")
+        self.index.add("rh/ferias", "Consulta as férias.")
+        self.index.add("fol", "Comando curto.")
+
+    def test_name_prefix_ranks_before_description_words(self):
+        self.index.add("abrir", "Comando sem relação.")
+        self.assertEqual(self.index.complete("pla", limit=5)[0], "plantao")
+        # "planilha" só aparece nas descrições: os nomes que começam com o texto vêm antes
+        self.assertEqual(self.index.complete("abr", limit=5)[0], "abrir")
+        self.assertEqual(set(self.index.complete("abr", limit=5)), {"abrir", "folgas", "plantao"})
+
+    def test_shorter_name_wins_a_tie(self):
+        self.assertEqual(self.index.complete("fol", limit=2), ["fol", "folgas"])
+
+    def test_namespace_parts_are_searchable(self):
+        self.assertEqual(self.index.complete("fer"), ["rh/ferias"])
+
+    def test_trigrams_match_typos(self):
+        self.assertIn("plantao", self.index.complete("plantoa"))
+        self.assertEqual(self.index.complete("xyz"), [])
+
+    def test_usage_changes_the_ranking(self):
+        self.index.add("folha", "Abre a folha de pagamento.")
+        self.assertEqual(self.index.complete("fol", limit=3), ["fol", "folha", "folgas"])
+        for _ in range(5):
+            self.index.record_use("folgas")
+        self.assertEqual(self.index.complete("fol", limit=3)[0], "folgas")
+
+    def test_update_and_remove(self):
+        self.index.add("plantao", "Escala de sobreaviso.")
+        self.assertEqual(self.index.complete("sobreaviso"), ["plantao"])
+        self.index.add("plantao", "Lista de contatos.")
+        self.assertEqual(self.index.complete("sobreaviso"), [])
+        self.assertEqual(self.index.complete("contatos"), ["plantao"])
+        self.index.remove("folgas")
+        self.assertNotIn("folgas", self.index.complete("fol", limit=5))
+        self.assertEqual(len(self.index), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
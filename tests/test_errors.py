@@ -0,0 +1,102 @@
+"""
+Testes da fila de erros: agrupamento, limite de atualizações e descarte.
+
+Uso:
+    python -m unittest discover -s tests
+"""
+import os  # Importa a biblioteca os para montar o caminho do repositório
+import sys  # Importa a biblioteca sys para localizar o main.py
+import logging  # Importa a biblioteca logging para silenciar os logs da aplicação
+import unittest  # Importa a biblioteca unittest para os casos de teste
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_dir)
+import main  # pylint: disable=wrong-import-position
+
+
+def setUpModule():
+    """
+    Silencia os avisos esperados.
+    """
+    logging.disable(logging.CRITICAL)
+
+
+def tearDownModule():
+    """
+    Restaura os logs.
+    """
+    logging.disable(logging.NOTSET)
+
+
+class ErrorReporterTest(unittest.TestCase):
+    """
+    Agrupamento dos erros e notificação dos ouvintes.
+    """
+    def setUp(self):
+        self.scheduled = []
+        self.updates = []
+        self.reporter = main.ErrorReporter(
+            lambda delay, callback: self.scheduled.append((delay, callback)), interval=0.5, max_entries=3
+        )
+        self.reporter.add_listener(lambda errors, dropped: self.updates.append((errors, dropped)))
+
+    def run_scheduled(self):
+        scheduled, self.scheduled = self.scheduled, []
+        for _, callback in scheduled:
+            callback()
+
+    def test_burst_schedules_a_single_update(self):
+        for _ in range(100):
+            self.reporter.report("Falha ao abrir o link", ValueError("x"))
+        self.assertEqual(len(self.scheduled), 1)
+        self.assertEqual(self.updates, [])
+        self.run_scheduled()
+        [(errors, dropped)] = self.updates
+        self.assertEqual([(error.message, error.count) for error in errors], [("Falha ao abrir o link", 100)])
+        self.assertEqual(dropped, 0)
+
+    def test_first_occurrence_is_logged_once(self):
+        with self.assertLogs(level="ERROR") as logs:
+            logging.disable(logging.NOTSET)
+            try:
+                self.reporter.report("Falha A", ValueError("a"))
+                self.reporter.report("Falha A", ValueError("a"))
+                self.reporter.report("Falha B", ValueError("b"))
+            finally:
+                logging.disable(logging.CRITICAL)
+        self.assertEqual([record.getMessage() for record in logs.records], ["Falha A", "Falha B"])
+
+    def test_next_update_waits_for_the_interval(self):
+        self.reporter.report("Falha A", ValueError("a"))
+        self.assertEqual(self.scheduled[0][0], 0.0)
+        self.run_scheduled()
+        self.reporter.report("Falha A", ValueError("a"))
+        delay = self.scheduled[0][0]
+        self.assertGreater(delay, 0.4)
+        self.assertLessEqual(delay, 0.5)
+
+    def test_most_recent_error_comes_first(self):
+        self.reporter.report("Falha A", ValueError("a"))
+        self.reporter.report("Falha B", ValueError("b"))
+        self.reporter.report("Falha A", ValueError("a"))
+        self.run_scheduled()
+        errors, _ = self.updates[-1]
+        self.assertEqual([error.message for error in errors], ["Falha A", "Falha B"])
+
+    def test_oldest_errors_are_dropped(self):
+        for name in "ABCDE":
+            self.reporter.report(f"Falha {name}", ValueError(name))
+        self.run_scheduled()
+        errors, dropped = self.updates[-1]
+        self.assertEqual([error.message for error in errors], ["Falha E", "Falha D", "Falha C"])
+        self.assertEqual(dropped, 2)
+
+    def test_clear_forgets_errors(self):
+        self.reporter.report("Falha A", ValueError("a"))
+        self.run_scheduled()
+        self.reporter.clear()
+        self.reporter.report("Falha B", ValueError("b"))
+        self.run_scheduled()
+        errors, dropped = self.updates[-1]
+        self.assertEqual([(error.message, error.count) for error in errors], [("Falha B", 1)])
+        self.assertEqual(dropped, 0)
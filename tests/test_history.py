@@ -0,0 +1,90 @@
+"""
+Testes do histórico de comandos: gravação, compactação e frecência.
+
+Uso:
+    python -m unittest discover -s tests
+"""
+import os  # Importa a biblioteca os para montar o caminho do arquivo de histórico
+import sys  # Importa a biblioteca sys para localizar o main.py
+import logging  # Importa a biblioteca logging para silenciar os logs da aplicação
+import tempfile  # Importa a biblioteca tempfile para o arquivo de histórico
+import unittest  # Importa a biblioteca unittest para os casos de teste
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_dir)
+import main  # pylint: disable=wrong-import-position
+
+
+def setUpModule():
+    """
+    Silencia os avisos esperados.
+    """
+    logging.disable(logging.CRITICAL)
+
+
+def tearDownModule():
+    """
+    Restaura os logs.
+    """
+    logging.disable(logging.NOTSET)
+
+
+class CommandHistoryTest(unittest.TestCase):
+    """
+    Persistência, compactação e frecência do histórico.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "history.log")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read_lines(self):
+        with open(self.path, "r", encoding="utf-8") as file:
+            return file.read().splitlines()
+
+    def test_compaction_keeps_the_latest_entries(self):
+        history = main.CommandHistory(self.path, max_entries=3)
+        for index in range(6):
+            history.record(f"cmd{index}", timestamp=1000 + index)
+        self.assertEqual(len(self.read_lines()), 6)  # Ainda dentro do dobro do limite
+        history.record("cmd6", timestamp=1006)
+        self.assertEqual(self.read_lines(), ["1004\tcmd4", "1005\tcmd5", "1006\tcmd6"])
+        history.record("cmd7", timestamp=1007)  # O arquivo continua recebendo usos após a compactação
+        history.close()
+        self.assertEqual(self.read_lines()[-1], "1007\tcmd7")
+
+    def test_load_ignores_corrupted_lines_and_compacts(self):
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write("1000\ta\nlixo\nabc\tb\n1001\t\n")
+            for index in range(6):
+                file.write(f"{1002 + index}\tc{index}\n")
+        history = main.CommandHistory(self.path, max_entries=3)
+        history.load()
+        history.close()
+        self.assertEqual(history.recent(), ["c5", "c4", "c3"])
+        self.assertEqual(self.read_lines(), ["1005\tc3", "1006\tc4", "1007\tc5"])
+
+    def test_recent_and_frecency(self):
+        history = main.CommandHistory(self.path, half_life=100)
+        history.record("a", timestamp=1000)
+        history.record("b", timestamp=1000)
+        history.record("a", timestamp=1100)
+        history.close()
+        self.assertEqual(history.recent(), ["a", "b"])
+        self.assertEqual(history.recent("b"), ["b"])
+        frecency = history.frecency(now=1100)
+        self.assertAlmostEqual(frecency["a"], 1.5)
+        self.assertAlmostEqual(frecency["b"], 0.5)
+
+    def test_record_normalizes_whitespace(self):
+        history = main.CommandHistory(self.path)
+        history.record("folgas\t&\nplantao", timestamp=1000)
+        history.record("   ", timestamp=1001)
+        history.close()
+        self.assertEqual(self.read_lines(), ["1000\tfolgas & plantao"])
+
+
+if __name__ == "__main__":
+    unittest.main()
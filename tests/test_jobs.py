@@ -0,0 +1,140 @@
+"""
+Testes do pool de comandos: tempo limite, fila e cancelamento.
+
+Uso:
+    python -m unittest discover -s tests
+"""
+import os  # Importa a biblioteca os para montar o caminho do repositório
+import sys  # Importa a biblioteca sys para localizar o main.py
+import time  # Importa a biblioteca time para simular comandos demorados
+import logging  # Importa a biblioteca logging para silenciar os logs da aplicação
+import unittest  # Importa a biblioteca unittest para os casos de teste
+import threading  # Importa a biblioteca threading para simular a thread da interface
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_dir)
+import main  # pylint: disable=wrong-import-position
+
+
+def setUpModule():
+    """
+    Silencia os avisos esperados.
+    """
+    logging.disable(logging.CRITICAL)
+
+
+def tearDownModule():
+    """
+    Restaura os logs.
+    """
+    logging.disable(logging.NOTSET)
+
+
+class FakeRoot:
+    """
+    Substituto da janela do Tk: `after` agenda a chamada em um timer, uma de cada vez.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timers = {}
+        self._ids = 0
+
+    def after(self, delay, callback, *args):
+        self._ids += 1
+        timer_id = self._ids
+
+        def run():
+            self._timers.pop(timer_id, None)
+            with self._lock:
+                callback(*args)
+
+        timer = threading.Timer(delay / 1000, run)
+        timer.daemon = True
+        self._timers[timer_id] = timer
+        timer.start()
+        return timer_id
+
+    def after_cancel(self, timer_id):
+        timer = self._timers.pop(timer_id, None)
+        if timer is not None:
+            timer.cancel()
+
+
+class JobSchedulerTest(unittest.TestCase):
+    """
+    Estados finais dos jobs executados pelo JobScheduler.
+    """
+    def setUp(self):
+        self.dispatcher = main.TkDispatcher(FakeRoot())
+        self.scheduler = main.JobScheduler(self.dispatcher, max_workers=1)
+        self.finished = {}
+        self.addCleanup(self.scheduler.shutdown)
+
+    def submit(self, name, function, timeout=None):
+        done = threading.Event()
+        self.finished[name] = done
+        return self.scheduler.submit(name, function, timeout=timeout, on_done=lambda job: done.set())
+
+    def wait(self, name):
+        self.assertTrue(self.finished[name].wait(5), f"O job '{name}' não terminou")
+
+    @staticmethod
+    def slow(seconds):
+        def function(job):
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                job.check_cancelled()
+                time.sleep(0.01)
+            return "ok"
+
+        return function
+
+    def test_timeout_cancels_running_job(self):
+        job = self.submit("lento", self.slow(5), timeout=0.1)
+        self.wait("lento")
+        self.assertEqual(job.state, "timeout")
+        self.assertIsNone(job.result)
+        self.assertLess(job.elapsed, 2)
+        self.assertEqual(self.scheduler.active, {})
+
+    def test_time_in_queue_does_not_count(self):
+        first = self.submit("primeiro", self.slow(0.3))
+        second = self.submit("segundo", self.slow(0.05), timeout=0.2)
+        self.wait("primeiro")
+        self.wait("segundo")
+        self.assertEqual(first.state, "done")
+        self.assertEqual(second.state, "done")
+        self.assertEqual(second.result, "ok")
+
+    def test_cancel_running_job(self):
+        started = threading.Event()
+
+        def function(job):
+            started.set()
+            return self.slow(5)(job)
+
+        job = self.submit("lento", function)
+        self.assertTrue(started.wait(5))
+        self.scheduler.cancel(job)
+        self.wait("lento")
+        self.assertEqual(job.state, "cancelled")
+        self.assertLess(job.elapsed, 2)
+
+    def test_cancel_queued_job(self):
+        calls = []
+        self.submit("primeiro", self.slow(0.2))
+        queued = self.submit("segundo", calls.append)
+        self.scheduler.cancel(queued)
+        self.wait("segundo")
+        self.wait("primeiro")
+        self.assertEqual(queued.state, "cancelled")
+        self.assertEqual(calls, [])
+
+    def test_failure_is_recorded(self):
+        def function(job):
+            raise ValueError("falhou")
+
+        job = self.submit("erro", function)
+        self.wait("erro")
+        self.assertEqual(job.state, "failed")
+        self.assertIsInstance(job.error, ValueError)
@@ -0,0 +1,134 @@
+"""
+Testes dos comandos de link: validação do CNPJ, valores colados no modo em massa
+e valores abertos recentemente.
+
+Uso:
+    python -m unittest discover -s tests
+"""
+import os  # Importa a biblioteca os para montar o caminho do repositório
+import sys  # Importa a biblioteca sys para localizar o main.py
+import logging  # Importa a biblioteca logging para silenciar os logs da aplicação
+import unittest  # Importa a biblioteca unittest para os casos de teste
+from unittest import mock  # Importa mock para controlar o relógio do prazo de validade
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_dir)
+import main  # pylint: disable=wrong-import-position
+
+
+def setUpModule():
+    """
+    Silencia os avisos esperados.
+    """
+    logging.disable(logging.CRITICAL)
+
+
+def tearDownModule():
+    """
+    Restaura os logs.
+    """
+    logging.disable(logging.NOTSET)
+
+
+class NormalizeCnpjTest(unittest.TestCase):
+    """
+    Validação e normalização do CNPJ numérico e alfanumérico.
+    """
+    def test_numeric_with_and_without_punctuation(self):
+        self.assertEqual(main.normalize_cnpj("11.222.333/0001-81"), "11222333000181")
+        self.assertEqual(main.normalize_cnpj(" 11222333000181 "), "11222333000181")
+
+    def test_alphanumeric(self):
+        self.assertEqual(main.normalize_cnpj("12.ABC.345/01DE-35"), "12ABC34501DE35")
+        self.assertEqual(main.normalize_cnpj("12abc34501de35"), "12ABC34501DE35")
+
+    def test_wrong_check_digits(self):
+        for value in ("11.222.333/0001-82", "11.222.333/0001-91", "12.ABC.345/01DE-36"):
+            with self.assertRaises(ValueError):
+                main.normalize_cnpj(value)
+
+    def test_repeated_digits_and_bad_shapes(self):
+        for value in ("00000000000000", "11111111111111", "1122233300018", "112223330001811", "12ABC34501DEAB", ""):
+            with self.assertRaises(ValueError):
+                main.normalize_cnpj(value)
+
+
+class SplitBulkTest(unittest.TestCase):
+    """
+    Separação dos valores colados no modo em massa.
+    """
+    def setUp(self):
+        self.template = main.LinkTemplate(
+            "in", "https://exemplo/{cnpj}", prompts=[main.LinkPrompt("cnpj", "CNPJ", "cyan", "cnpj")], bulk=True
+        )
+
+    def test_separators_duplicates_and_invalid(self):
+        text = "11.222.333/0001-81\n12.ABC.345/01DE-35, 11222333000181;\t123 ,, 11.222.333/0001-82"
+        values, invalid = self.template.split_bulk(text)
+        self.assertEqual(values, ["11222333000181", "12ABC34501DE35"])
+        self.assertEqual(invalid, ["123", "11.222.333/0001-82"])
+
+    def test_empty_text(self):
+        self.assertEqual(self.template.split_bulk(" \n ,; "), ([], []))
+
+    def test_untyped_prompt_keeps_values(self):
+        template = main.LinkTemplate("busca", "https://exemplo/{termo}", prompts=[main.LinkPrompt("termo", "Termo", "cyan")])
+        self.assertEqual(template.split_bulk("a b a c"), (["a", "b", "c"], []))
+
+
+class FillTest(unittest.TestCase):
+    """
+    URLs base de open_link_with_value, com campos nomeados ou o antigo REPLACEME.
+    """
+    def test_named_fields_are_encoded(self):
+        self.assertEqual(main.LinkTemplate.fill("https://exemplo/{cnpj}?q={cnpj}", "1/2"), "https://exemplo/1%2F2?q=1%2F2")
+
+    def test_replaceme_keeps_literal_braces(self):
+        self.assertEqual(main.LinkTemplate.fill("https://exemplo/{}/REPLACEME", "a b"), "https://exemplo/{}/a%20b")
+
+    def test_legacy_url_with_stray_braces(self):
+        self.assertEqual(main.LinkTemplate.fill("https://exemplo/a}b", "v"), "https://exemplo/a}b")
+        self.assertEqual(main.LinkTemplate.fill("https://exemplo/{a", "v"), "https://exemplo/{a")
+        self.assertEqual(main.LinkTemplate.fill("https://exemplo/{a-b}", "v"), "https://exemplo/{a-b}")
+
+    def test_template_is_compiled_once(self):
+        template = main.LinkTemplate.single_value("https://exemplo/{termo}")
+        self.assertIs(main.LinkTemplate.single_value("https://exemplo/{termo}"), template)
+        self.assertEqual([prompt.name for prompt in template.prompts], ["termo"])
+
+
+class RecentValuesTest(unittest.TestCase):
+    """
+    Conjunto LRU com prazo de validade.
+    """
+    def test_ttl_expiry(self):
+        recent = main.RecentValues(max_entries=10, ttl=60)
+        with mock.patch.object(main.time, "monotonic", return_value=1000.0):
+            recent.add("a")
+        with mock.patch.object(main.time, "monotonic", return_value=1059.9):
+            self.assertIn("a", recent)
+        with mock.patch.object(main.time, "monotonic", return_value=1060.0):
+            self.assertNotIn("a", recent)
+
+    def test_add_again_renews_the_ttl(self):
+        recent = main.RecentValues(max_entries=10, ttl=60)
+        with mock.patch.object(main.time, "monotonic", return_value=1000.0):
+            recent.add("a")
+        with mock.patch.object(main.time, "monotonic", return_value=1050.0):
+            recent.add("a")
+        with mock.patch.object(main.time, "monotonic", return_value=1100.0):
+            self.assertIn("a", recent)
+
+    def test_least_recently_used_is_evicted(self):
+        recent = main.RecentValues(max_entries=2, ttl=60)
+        recent.add("a")
+        recent.add("b")
+        recent.add("a")  # "b" passa a ser o mais antigo
+        recent.add("c")
+        self.assertIn("a", recent)
+        self.assertNotIn("b", recent)
+        self.assertIn("c", recent)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Testes do índice persistente de metadados dos comandos.
+
+Uso:
+    python -m unittest discover -s tests
+"""
+import os  # Importa a biblioteca os para criar os arquivos de comando e alterar o mtime
+import sys  # Importa a biblioteca sys para localizar o main.py
+import json  # Importa a biblioteca json para alterar a versão do índice gravado
+import logging  # Importa a biblioteca logging para silenciar os logs da aplicação
+import tempfile  # Importa a biblioteca tempfile para os arquivos de comando e o índice
+import unittest  # Importa a biblioteca unittest para os casos de teste
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_dir)
+import main  # pylint: disable=wrong-import-position
+
+
+def setUpModule():
+    """
+    Silencia os avisos esperados.
+    """
+    logging.disable(logging.CRITICAL)
+
+
+def tearDownModule():
+    """
+    Restaura os logs.
+    """
+    logging.disable(logging.NOTSET)
+
+
+commandSource = '''"""
+Abre a planilha de folgas.
+
+Parâmetros: mes, ano
+Tags: rh, planilhas
+Timeout: 5s
+"""
+__tags__ = ["equipe"]
+'''
+
+
+class CommandMetadataIndexTest(unittest.TestCase):
+    """
+    Extração dos metadados, reaproveitamento entre execuções e invalidação por versão.
+    """
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.index_path = os.path.join(self.temp.name, "cache", "commands_index.json")
+        self.path = os.path.join(self.temp.name, "folgas.py")
+        self.write(commandSource, mtime_ns=1_000_000_000)
+
+    def tearDown(self):
+        self.temp.cleanup()
+
+    def write(self, source, mtime_ns):
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write(source)
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def test_parse(self):
+        metadata = main.CommandMetadataIndex().get(self.path)
+        self.assertEqual(metadata.description, "Abre a planilha de folgas.")
+        self.assertEqual(metadata.parameters, ("mes", "ano"))
+        self.assertEqual(metadata.tags, ("equipe", "rh", "planilhas"))
+        self.assertEqual(metadata.timeout, 5.0)
+
+    def test_invalid_values_are_ignored(self):
+        metadata = main.CommandMetadataIndex.parse('"""Doc."""\n__tags__ = None\n__parametros__ = 5\n')
+        self.assertEqual((metadata.description, metadata.parameters, metadata.tags), ("Doc.", (), ()))
+
+    def test_saved_index_is_reused_without_parsing(self):
+        index = main.CommandMetadataIndex(self.index_path)
+        index.get(self.path)
+        index.save()
+
+        reloaded = main.CommandMetadataIndex(self.index_path)
+        reloaded.load()
+        self.assertEqual(reloaded.get(self.path).description, "Abre a planilha de folgas.")
+        self.assertEqual(reloaded.parsed, 0)
+
+        # Mesmo conteúdo com outro mtime: só a assinatura é atualizada
+        os.utime(self.path, ns=(2_000_000_000, 2_000_000_000))
+        reloaded.get(self.path)
+        self.assertEqual(reloaded.parsed, 0)
+
+        self.write(commandSource.replace("folgas", "férias"), mtime_ns=3_000_000_000)
+        self.assertEqual(reloaded.get(self.path).description, "Abre a planilha de férias.")
+        self.assertEqual(reloaded.parsed, 1)
+
+    def test_index_from_another_version_is_ignored(self):
+        index = main.CommandMetadataIndex(self.index_path)
+        index.get(self.path)
+        index.save()
+        with open(self.index_path, "r", encoding="utf-8") as file:
+            payload = json.load(file)
+        payload["version"] = main.commandIndexVersion - 1
+        with open(self.index_path, "w", encoding="utf-8") as file:
+            json.dump(payload, file)
+
+        reloaded = main.CommandMetadataIndex(self.index_path)
+        reloaded.load()
+        stat_result = os.stat(self.path)
+        self.assertIsNone(reloaded.peek(self.path, stat_result))
+        reloaded.get(self.path, stat_result)
+        self.assertEqual(reloaded.parsed, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
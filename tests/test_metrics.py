@@ -0,0 +1,115 @@
+"""
+Testes das métricas de latência: limites, quantis e formato do Prometheus.
+
+Uso:
+    python -m unittest discover -s tests
+"""
+import os  # Importa a biblioteca os para montar o caminho do repositório
+import sys  # Importa a biblioteca sys para localizar o main.py
+import logging  # Importa a biblioteca logging para silenciar os logs da aplicação
+import tempfile  # Importa a biblioteca tempfile para gravar as métricas em uma pasta temporária
+import unittest  # Importa a biblioteca unittest para os casos de teste
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_dir)
+import main  # pylint: disable=wrong-import-position
+
+
+def setUpModule():
+    """
+    Silencia os avisos esperados.
+    """
+    logging.disable(logging.CRITICAL)
+
+
+def tearDownModule():
+    """
+    Restaura os logs.
+    """
+    logging.disable(logging.NOTSET)
+
+
+class LatencyHistogramTest(unittest.TestCase):
+    """
+    Contagem por limite e interpolação dos quantis.
+    """
+    def setUp(self):
+        self.histogram = main.LatencyHistogram(buckets=(0.1, 0.2, 0.4))
+        for seconds in (0.05, 0.05, 0.05, 0.05, 0.15, 0.15, 0.15, 0.15, 0.3, 0.3):
+            self.histogram.observe(seconds)
+
+    def test_counts_per_bucket(self):
+        self.assertEqual(self.histogram.counts, [4, 4, 2, 0])
+        self.assertEqual(self.histogram.count, 10)
+        self.assertAlmostEqual(self.histogram.sum, 1.4)
+
+    def test_bound_is_inclusive(self):
+        histogram = main.LatencyHistogram(buckets=(0.1, 0.2))
+        histogram.observe(0.1)
+        histogram.observe(0.2)
+        self.assertEqual(histogram.counts, [1, 1, 0])
+
+    def test_quantiles_interpolate_inside_the_bucket(self):
+        self.assertAlmostEqual(self.histogram.quantile(0.5), 0.125)
+        self.assertAlmostEqual(self.histogram.quantile(0.95), 0.35)
+        self.assertAlmostEqual(self.histogram.quantile(0.99), 0.39)
+
+    def test_quantile_above_largest_bound(self):
+        self.histogram.observe(5.0)
+        self.assertEqual(self.histogram.quantile(0.99), 0.4)
+
+    def test_empty_histogram(self):
+        histogram = main.LatencyHistogram()
+        self.assertEqual(histogram.quantile(0.5), 0.0)
+
+    def test_errors_are_counted(self):
+        self.histogram.observe(0.05, error=True)
+        self.assertEqual(self.histogram.errors, 1)
+        self.assertEqual(self.histogram.count, 11)
+
+
+class MetricsRegistryTest(unittest.TestCase):
+    """
+    Séries por rótulo e arquivo no formato de texto do Prometheus.
+    """
+    def setUp(self):
+        temporary = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary.cleanup)
+        self.path = os.path.join(temporary.name, "metrics", "launcher.prom")
+        self.metrics = main.MetricsRegistry(path=self.path)
+
+    def test_series_are_separated_by_labels(self):
+        self.metrics.observe("launcher_command_seconds", 0.01, command="folgas")
+        self.metrics.observe("launcher_command_seconds", 0.02, command="folgas")
+        self.metrics.observe("launcher_command_seconds", 0.03, True, command="plantao")
+        series = {labels["command"]: histogram for labels, histogram in
+                  self.metrics.histograms("launcher_command_seconds")}
+        self.assertEqual(series["folgas"].count, 2)
+        self.assertEqual(series["plantao"].errors, 1)
+
+    def test_timer_counts_exceptions_as_errors(self):
+        with self.assertRaises(ValueError):
+            with self.metrics.timer("launcher_command_seconds", command="erro"):
+                raise ValueError("falhou")
+        [(labels, histogram)] = self.metrics.histograms("launcher_command_seconds")
+        self.assertEqual(labels, {"command": "erro"})
+        self.assertEqual((histogram.count, histogram.errors), (1, 1))
+
+    def test_render_uses_cumulative_buckets(self):
+        self.metrics.observe("launcher_command_seconds", 0.003, command='a"b')
+        self.metrics.observe("launcher_command_seconds", 60.0, command='a"b')
+        lines = self.metrics.render().splitlines()
+        self.assertIn('launcher_command_seconds_bucket{command="a\\"b",le="0.001"} 0', lines)
+        self.assertIn('launcher_command_seconds_bucket{command="a\\"b",le="0.005"} 1', lines)
+        self.assertIn('launcher_command_seconds_bucket{command="a\\"b",le="30.0"} 1', lines)
+        self.assertIn('launcher_command_seconds_bucket{command="a\\"b",le="+Inf"} 2', lines)
+        self.assertIn('launcher_command_seconds_count{command="a\\"b"} 2', lines)
+        self.assertIn('launcher_command_errors_total{command="a\\"b"} 0', lines)
+
+    def test_flush_writes_only_when_dirty(self):
+        self.metrics.flush()
+        self.assertFalse(os.path.exists(self.path))
+        self.metrics.observe("launcher_command_seconds", 0.01, command="folgas")
+        self.metrics.flush()
+        with open(self.path, "r", encoding="utf-8") as file:
+            self.assertEqual(file.read(), self.metrics.render())
@@ -0,0 +1,119 @@
+"""
+Testes dos encadeamentos de comandos e das macros.
+
+Uso:
+    python -m unittest discover -s tests
+"""
+import os  # Importa a biblioteca os para montar o caminho do repositório
+import sys  # Importa a biblioteca sys para localizar o main.py
+import logging  # Importa a biblioteca logging para silenciar os logs da aplicação
+import unittest  # Importa a biblioteca unittest para os casos de teste
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_dir)
+import main  # pylint: disable=wrong-import-position
+
+
+def setUpModule():
+    """
+    Silencia os avisos esperados.
+    """
+    logging.disable(logging.CRITICAL)
+
+
+def tearDownModule():
+    """
+    Restaura os logs.
+    """
+    logging.disable(logging.NOTSET)
+
+
+class CommandPipelineTest(unittest.TestCase):
+    """
+    Expansão das macros e execução dos passos do encadeamento.
+    """
+    def dependencies(self, pipeline):
+        return [(step.command, sorted(step.depends_on)) for step in pipeline.steps]
+
+    def run_all(self, pipeline, failing=()):
+        """
+        Executa os passos na ordem em que ficam prontos; retorna os lotes iniciados juntos.
+        """
+        batches = []
+        while not pipeline.done:
+            ready = pipeline.ready()
+            if not ready:
+                break
+            batches.append([step.command for step in ready])
+            for step in ready:
+                pipeline.finish(step, "failed" if step.command in failing else "done", 0.0)
+        return batches
+
+    def test_split(self):
+        self.assertEqual(main.CommandPipeline.split(" a  x & b ; c "), [["a x", "b"], ["c"]])
+        for text in ("a ;", "& b", "a ;; b"):
+            with self.assertRaises(ValueError):
+                main.CommandPipeline.split(text)
+
+    def test_stages_depend_on_the_previous_stage(self):
+        pipeline = main.CommandPipeline("a & b ; c ; d & e")
+        self.assertEqual(
+            self.dependencies(pipeline),
+            [("a", []), ("b", []), ("c", [0, 1]), ("d", [2]), ("e", [2])]
+        )
+        self.assertEqual(self.run_all(pipeline), [["a", "b"], ["c"], ["d", "e"]])
+        self.assertFalse(pipeline.failed)
+
+    def test_sequential_macro_inside_a_parallel_stage(self):
+        pipeline = main.CommandPipeline("m & c ; d", {"m": "a ; b"})
+        self.assertEqual(
+            self.dependencies(pipeline),
+            [("a", []), ("b", [0]), ("c", []), ("d", [1, 2])]
+        )
+        self.assertEqual(self.run_all(pipeline), [["a", "c"], ["b"], ["d"]])
+
+    def test_nested_macros(self):
+        pipeline = main.CommandPipeline("m1", {"m1": "m2 ; c", "m2": "a & b"})
+        self.assertEqual([step.command for step in pipeline.steps], ["a", "b", "c"])
+
+    def test_macro_cycles(self):
+        for macros in ({"m": "a ; m"}, {"m1": "m2", "m2": "m1"}):
+            with self.assertRaisesRegex(ValueError, "usa a si mesma"):
+                main.CommandPipeline("m" if "m" in macros else "m1", macros)
+
+    def test_macro_reused_in_parallel_is_not_a_cycle(self):
+        pipeline = main.CommandPipeline("m & m", {"m": "a"})
+        self.assertEqual([step.command for step in pipeline.steps], ["a", "a"])
+
+    def nested_macros(self, depth):
+        """
+        Retorna `depth` macros aninhadas (m0 usa m1, que usa m2...), a última com o comando "a".
+        """
+        macros = {f"m{level}": f"m{level + 1}" for level in range(depth - 1)}
+        macros[f"m{depth - 1}"] = "a"
+        return macros
+
+    def test_depth_and_step_limits(self):
+        pipeline = main.CommandPipeline("m0", self.nested_macros(main.pipelineMaxDepth))
+        self.assertEqual([step.command for step in pipeline.steps], ["a"])
+        with self.assertRaisesRegex(ValueError, "aninhadas"):
+            main.CommandPipeline("m0", self.nested_macros(main.pipelineMaxDepth + 1))
+        with self.assertRaisesRegex(ValueError, "comandos"):
+            main.CommandPipeline(" & ".join(["a"] * (main.pipelineMaxSteps + 1)))
+
+    def test_failure_skips_dependents_only(self):
+        pipeline = main.CommandPipeline("m & c ; d", {"m": "a ; b"})
+        self.assertEqual(self.run_all(pipeline, failing={"a"}), [["a", "c"]])
+        self.assertTrue(pipeline.done)
+        self.assertTrue(pipeline.failed)
+        states = {pipeline.steps[step].command: state for step, (state, _, _) in pipeline.results.items()}
+        self.assertEqual(states, {"a": "failed", "b": "skipped", "c": "done", "d": "skipped"})
+
+    def test_names(self):
+        self.assertEqual(main.CommandPipeline.names("folgas & in 1 ; in 2 & manha"), ["folgas", "in", "manha"])
+        self.assertEqual(main.CommandPipeline.names("folgas"), ["folgas"])
+        self.assertEqual(main.CommandPipeline.names("a ;"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
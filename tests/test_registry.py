@@ -0,0 +1,154 @@
+"""
+Testes do registro de comandos: varredura, notificações de mudança, namespaces e raízes extras.
+
+Uso:
+    python -m unittest discover -s tests
+"""
+import os  # Importa a biblioteca os para criar os arquivos de comando
+import sys  # Importa a biblioteca sys para localizar o main.py
+import logging  # Importa a biblioteca logging para silenciar os logs da aplicação
+import tempfile  # Importa a biblioteca tempfile para os diretórios de comandos
+import unittest  # Importa a biblioteca unittest para os casos de teste
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_dir)
+import main  # pylint: disable=wrong-import-position
+
+
+def setUpModule():
+    """
+    Silencia os avisos esperados.
+    """
+    logging.disable(logging.CRITICAL)
+
+
+def tearDownModule():
+    """
+    Restaura os logs.
+    """
+    logging.disable(logging.NOTSET)
+
+
+class RegistryTestCase(unittest.TestCase):
+    """
+    Base com um diretório temporário e funções para criar os arquivos de comando.
+    """
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.directory = self.temp.name
+
+    def tearDown(self):
+        self.temp.cleanup()
+
+    def write(self, relative_path, source="pass\n", mtime_ns=None):
+        path = os.path.join(self.directory, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(source)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+        return path
+
+
+class CommandRegistryTest(RegistryTestCase):
+    """
+    Montagem do índice e notificação de comandos adicionados, removidos e alterados.
+    """
+    def test_build_prefers_py_over_txt(self):
+        self.write("folgas.txt")
+        self.write("folgas.py")
+        self.write("Plantao.TXT")  # Extensão fora da lista (comparação exata)
+        self.write("leia.md")
+        registry = main.CommandRegistry(self.directory)
+        registry.build()
+        self.assertEqual(registry.names(), ("folgas",))
+        self.assertTrue(registry.lookup("folgas").path.endswith("folgas.py"))
+        self.assertIsNone(registry.lookup("leia"))
+
+    def test_listeners_receive_added_removed_and_changed(self):
+        self.write("a.py", mtime_ns=1_000_000_000)
+        self.write("b.py")
+        registry = main.CommandRegistry(self.directory)
+        registry.build()
+        events = []
+        registry.add_listener(lambda added, removed, changed: events.append((
+            [entry.name for entry in added], [entry.name for entry in removed], [entry.name for entry in changed]
+        )))
+
+        self.write("a.py", "value = 1\n", mtime_ns=2_000_000_000)
+        os.remove(os.path.join(self.directory, "b.py"))
+        self.write("c.txt")
+        registry._on_directory_changed(self.directory)  # pylint: disable=protected-access
+        self.assertEqual(events, [(["c"], ["b"], ["a"])])
+        self.assertEqual(registry.names(), ("a", "c"))
+
+        registry._on_directory_changed(self.directory)  # pylint: disable=protected-access
+        self.assertEqual(len(events), 1)  # Sem mudanças, nenhuma notificação
+
+    def test_removing_the_py_falls_back_to_the_txt(self):
+        self.write("a.py")
+        self.write("a.txt")
+        registry = main.CommandRegistry(self.directory)
+        registry.build()
+        events = []
+        registry.add_listener(lambda added, removed, changed: events.append([entry.path for entry in changed]))
+        os.remove(os.path.join(self.directory, "a.py"))
+        registry._on_directory_changed(self.directory)  # pylint: disable=protected-access
+        self.assertEqual(len(events), 1)
+        self.assertTrue(events[0][0].endswith("a.txt"))
+
+
+
+class NamespacedRegistryTest(RegistryTestCase):
+    """
+    Namespaces carregados sob demanda e raízes extras com prioridade da primeira.
+    """
+    def test_namespaces_are_loaded_on_demand(self):
+        self.write("raiz.py")
+        self.write(os.path.join("rh", "ferias.py"))
+        self.write(os.path.join("rh", "folha", "holerite.py"))
+        self.write(os.path.join("__pycache__", "ignorado.py"))
+        registry = main.CommandRegistry(self.directory)
+        registry.build()
+        self.assertEqual(registry.names(), ("raiz",))
+        self.assertEqual(registry.namespaces(), ["rh"])
+
+        self.assertEqual(registry.lookup("rh/folha/holerite").name, "rh/folha/holerite")
+        self.assertEqual(registry.names(), ("raiz", "rh/ferias", "rh/folha/holerite"))
+        self.assertIsNone(registry.lookup("rh/inexistente"))
+
+    def test_removed_subdirectory_drops_its_commands(self):
+        self.write(os.path.join("rh", "ferias.py"))
+        registry = main.CommandRegistry(self.directory)
+        registry.build()
+        registry.load_all()
+        removed = []
+        registry.add_listener(lambda added, gone, changed: removed.extend(entry.name for entry in gone))
+        os.remove(os.path.join(self.directory, "rh", "ferias.py"))
+        os.rmdir(os.path.join(self.directory, "rh"))
+        registry._on_directory_changed(self.directory)  # pylint: disable=protected-access
+        self.assertEqual(removed, ["rh/ferias"])
+        self.assertEqual(registry.namespaces(), [])
+
+    def test_first_root_wins_and_extra_root_is_the_fallback(self):
+        extra = tempfile.TemporaryDirectory()
+        self.addCleanup(extra.cleanup)
+        main_path = self.write("comum.py")
+        extra_path = os.path.join(extra.name, "comum.py")
+        with open(extra_path, "w", encoding="utf-8") as file:
+            file.write("pass\n")
+        with open(os.path.join(extra.name, "extra.py"), "w", encoding="utf-8") as file:
+            file.write("pass\n")
+
+        registry = main.CommandRegistry(self.directory, extra_directories=[extra.name])
+        registry.build()
+        self.assertEqual(registry.names(), ("comum", "extra"))
+        self.assertEqual(registry.lookup("comum").path, main_path)
+
+        os.remove(main_path)
+        registry._on_directory_changed(self.directory)  # pylint: disable=protected-access
+        self.assertEqual(registry.lookup("comum").path, extra_path)
+
+
+if __name__ == "__main__":
+    unittest.main()